@@ -2,10 +2,20 @@ import argparse
 import sys
 import os
 import json
+from itertools import chain
 from core.config import set_story_root, get_schemas_dir, STORY_LORD_ROOT, ensure_global_root, CATEGORIES
-from core.models import StoryMetadata, StorySpec
-from core.metadata import load_all_metadata, parse_header_from_file, save_all_metadata
-from core.generator import generate_spec
+# Everything else (the registry, pydantic models, generator) is imported by the verb that
+# uses it, so parsing the arguments and the lighter verbs never pay for it
+
+def write_stream(chunks):
+    """Writes chunks to stdout as they are produced; a closed pipe (e.g. `| head`) ends it quietly."""
+    try:
+        for chunk in chunks:
+            sys.stdout.write(chunk)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # Keep the interpreter from complaining about the closed stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
 
 def main():
     parser = argparse.ArgumentParser(description="Story Lord v3 CLI", formatter_class=argparse.RawTextHelpFormatter)
@@ -13,6 +23,7 @@ def main():
     # Global Flags
     parser.add_argument("--story", help="Explicitly set the story name or path.")
     parser.add_argument("--json", action="store_true", help="Output results in JSON format.")
+    parser.add_argument("--startup-profile", action="store_true", help="Print a per-module import-time breakdown to stderr on exit.")
     
     subparsers = parser.add_subparsers(dest="noun", help="The object to manipulate.")
     
@@ -32,23 +43,53 @@ def main():
     spec_subs = spec_parser.add_subparsers(dest="verb", help="Action to perform.")
     
     # spec list
-    spec_subs.add_parser("list", help="List specs in the current story.")
+    list_spec = spec_subs.add_parser("list", help="List specs in the current story.")
+    list_spec.add_argument("--category", help="Only list this category.")
+    list_spec.add_argument("--title-glob", help="Only list titles matching this glob (case-sensitive, e.g. 'The *').")
+    list_spec.add_argument("--limit", type=int, help="List at most this many specs.")
+    list_spec.add_argument("--offset", type=int, default=0, help="Skip this many specs first.")
+    list_spec.add_argument("--ndjson", action="store_true", help="Stream one JSON record (with its path) per line.")
     
     # spec create
-    create_spec = spec_subs.add_parser("create", help="Create a new spec file.")
-    create_spec.add_argument("category", help=f"Category: {', '.join(CATEGORIES)}")
-    create_spec.add_argument("title", help="Title of the spec.")
+    create_spec = spec_subs.add_parser("create", help="Create a new spec file (or many, with --from).")
+    create_spec.add_argument("category", nargs="?", help=f"Category: {', '.join(CATEGORIES)}")
+    create_spec.add_argument("title", nargs="?", help="Title of the spec.")
     create_spec.add_argument("--desc", default="", help="Description.")
+    create_spec.add_argument("--from", dest="manifest", metavar="MANIFEST",
+                             help="Create one spec per row of a .jsonl or .csv manifest\n(fields: title, category, version, description, body).")
+    create_spec.add_argument("--workers", type=int, help="Threads writing files with --from (default 8).")
+    
+    # spec export
+    export_spec = spec_subs.add_parser("export", help="Export the metadata registry as a single JSON document.")
+    export_spec.add_argument("--out", help="Write to this file instead of stdout.")
+    
+    # spec search
+    search_spec = spec_subs.add_parser("search", help="Full-text search over spec titles, descriptions and bodies.")
+    search_spec.add_argument("query", nargs="+", help="Words to find (all must match; end a word with * for a prefix).")
+    search_spec.add_argument("--category", help="Only search this category.")
+    search_spec.add_argument("--limit", type=int, default=20, help="Maximum number of results (default 20).")
+    
+    # spec links
+    links_spec = spec_subs.add_parser("links", help="Show the links of a spec and its backlinks, or report dangling links.")
+    links_spec.add_argument("path", nargs="?", help="Relative path to spec (e.g. Lore/MySpec.md).")
+    links_spec.add_argument("--dangling", action="store_true", help="List every link whose target does not exist.")
     
     # spec read
     read_spec = spec_subs.add_parser("read", help="Read a spec content.")
     read_spec.add_argument("path", help="Relative path to spec (e.g. Lore/MySpec.md).")
     
     # --- TREE COMMAND ---
-    subparsers.add_parser("tree", help="Visual tree content of specs.")
+    tree_parser = subparsers.add_parser("tree", help="Visual tree content of specs.")
+    tree_parser.add_argument("--max-depth", type=int, help="Don't expand directories more than this many levels below the root.")
+    tree_parser.add_argument("--dirs-only", action="store_true", help="Only show directories.")
+    tree_parser.add_argument("--counts", action="store_true",
+                             help="Show each directory's file count and size, and the totals.\nWith --json: one record per directory instead of the nested tree.")
     
     # --- ANALYZE COMMAND ---
-    subparsers.add_parser("analyze", help="Show statistics.")
+    analyze_parser = subparsers.add_parser("analyze", help="Show statistics.")
+    analyze_parser.add_argument("--by", choices=["category"], help="Also break the totals down by category.")
+    analyze_parser.add_argument("--top", type=int, default=5, help="Length of the largest/stalest/least complete lists (default 5).")
+    analyze_parser.add_argument("--workers", type=int, help="Parallel workers for files not in the cache (default: CPU count).")
 
     args = parser.parse_args()
     
@@ -100,24 +141,118 @@ def main():
                 
     elif args.noun == "spec":
         if args.verb == "list":
-            data = load_all_metadata()
-            if args.json:
-                print(json.dumps([s.model_dump() for s in data.specs.values()]))
+            from core.metadata import query_specs
+            # Streamed straight from the backend: nothing is collected, so memory stays flat
+            specs = query_specs(category=args.category, title_glob=args.title_glob, limit=args.limit, offset=args.offset)
+            if args.ndjson:
+                lines = (json.dumps({"path": path, **spec.model_dump()}) + "\n" for path, spec in specs)
+            elif args.json:
+                # Same document as json.dumps of the whole list, written item by item
+                items = (json.dumps(spec.model_dump()) for _, spec in specs)
+                lines = chain("[", (text if i == 0 else ", " + text for i, text in enumerate(items)), "]\n")
             else:
-                for path, spec in data.specs.items():
-                    print(f"[{spec.category}] {spec.title} ({path})")
+                lines = (f"[{spec.category}] {spec.title} ({path})\n" for path, spec in specs)
+            write_stream(lines)
+                    
+        elif args.verb == "export":
+            from core.metadata import export_metadata_json
+            text = export_metadata_json(args.out)
+            if not args.out:
+                print(text)
+            elif not args.json:
+                print(f"Exported registry to {args.out}")
                     
+        elif args.verb == "create" and args.manifest:
+            from core.generator import read_manifest, create_specs_bulk
+            try:
+                rows = read_manifest(args.manifest)
+            except OSError as e:
+                print(f"Error: Cannot read manifest: {e}")
+                sys.exit(1)
+            result = create_specs_bulk(rows, workers=args.workers, categories=CATEGORIES)
+            if args.json:
+                print(json.dumps({"success": not result.errors, **result._asdict()}))
+            else:
+                for error in result.errors:
+                    print(error)
+                if result.created or not result.errors:
+                    print(f"Created {len(result.created)} spec(s)"
+                          + (f" ({result.renamed} renamed to avoid a collision)." if result.renamed else "."))
+                else:
+                    print("Nothing was created.")
+            if result.errors:
+                sys.exit(1)
+                
         elif args.verb == "create":
+            if not args.category or not args.title:
+                print("Error: Give a category and a title, or --from <manifest>.")
+                sys.exit(1)
             if args.category not in CATEGORIES:
                 print(f"Invalid category. Options: {CATEGORIES}")
                 sys.exit(1)
             
+            from core.generator import generate_spec
             success, msg = generate_spec(args.category, args.title, description=args.desc)
             if args.json:
                 print(json.dumps({"success": success, "message": msg}))
             else:
                 print(msg)
                 
+        elif args.verb == "search":
+            from core.search import search_specs
+            try:
+                hits = search_specs(" ".join(args.query), limit=args.limit, category=args.category)
+            except RuntimeError as e:
+                if args.json:
+                    print(json.dumps({"error": str(e)}))
+                else:
+                    print(f"Error: {e}")
+                sys.exit(1)
+            if args.json:
+                print(json.dumps([hit._asdict() for hit in hits]))
+            else:
+                if not hits:
+                    print("No matches.")
+                for hit in hits:
+                    print(f"{hit.score:10.4g}  [{hit.category}] {hit.title} ({hit.path})")
+                    if hit.snippet:
+                        print(f"            {hit.snippet}")
+                
+        elif args.verb == "links":
+            from core.links import outgoing_links, backlinks, dangling_links
+            if args.dangling:
+                dangling = dangling_links()
+                if args.json:
+                    print(json.dumps([link._asdict() for link in dangling]))
+                else:
+                    if not dangling:
+                        print("No dangling links.")
+                    for link in dangling:
+                        print(f"{link.source}:{link.line}: [{link.text}] -> {link.target} (missing)")
+            elif not args.path:
+                print("Error: Give a spec path or --dangling.")
+                sys.exit(1)
+            else:
+                outgoing, incoming = outgoing_links(args.path), backlinks(args.path)
+                if args.json:
+                    print(json.dumps({
+                        "path": args.path,
+                        "links": [link._asdict() for link in outgoing],
+                        "backlinks": [link._asdict() for link in incoming],
+                    }))
+                else:
+                    print(f"Links from {args.path}:")
+                    if not outgoing:
+                        print("  (none)")
+                    for link in outgoing:
+                        target = ", ".join(link.resolved) if link.resolved else f"{link.target} (missing)"
+                        print(f"  line {link.line}: [{link.text}] -> {target}")
+                    print(f"Backlinks to {args.path}:")
+                    if not incoming:
+                        print("  (none)")
+                    for link in incoming:
+                        print(f"  {link.source} line {link.line}: [{link.text}]")
+                
         elif args.verb == "read":
             full_path = os.path.join(get_schemas_dir(), args.path)
             if os.path.exists(full_path):
@@ -131,38 +266,53 @@ def main():
                 print("File not found.")
                 
     elif args.noun == "tree":
-        # Simple tree
+        from core.walker import tree_lines, tree_dict, tree_records
         root = get_schemas_dir()
-        if args.json:
-             # Recursive dict
-             def dirtree(p):
-                 return {d.name: dirtree(d) for d in os.scandir(p) if d.is_dir()} | {f.name: None for f in os.scandir(p) if f.is_file()}
-             print(json.dumps(dirtree(root)))
+        if args.json and args.counts:
+            records = (json.dumps(record) for record in tree_records(root, args.max_depth, args.dirs_only))
+            write_stream(chain("[", (text if i == 0 else ", " + text for i, text in enumerate(records)), "]\n"))
+        elif args.json:
+            print(json.dumps(tree_dict(root, args.max_depth, args.dirs_only)))
         else:
-            for root, dirs, files in os.walk(root):
-                level = root.replace(get_schemas_dir(), '').count(os.sep)
-                indent = ' ' * 4 * (level)
-                print(f'{indent}{os.path.basename(root)}/')
-                subindent = ' ' * 4 * (level + 1)
-                for f in files:
-                    print(f'{subindent}{f}')
+            write_stream(tree_lines(root, args.max_depth, args.dirs_only, args.counts))
                     
     elif args.noun == "analyze":
-        data = load_all_metadata()
-        stats = {
-            "total_specs": len(data.specs),
-            "categories": {}
-        }
-        for s in data.specs.values():
-            stats["categories"][s.category] = stats["categories"].get(s.category, 0) + 1
+        from core.analyze import analyze_story
+        from core.walker import format_size
+        stats = analyze_story(top=args.top, by=args.by, workers=args.workers)
             
         if args.json:
             print(json.dumps(stats, indent=2))
         else:
+            def completeness(totals):
+                c = totals["completeness"]
+                if c["ratio"] is None:
+                    return "n/a"
+                return f"{c['ratio']:.0%} ({c['sections_filled']}/{c['sections_expected']} template sections filled)"
+
             print("Analysis:")
             print(f" Total Specs: {stats['total_specs']}")
             print(" Categories:")
             for k, v in stats["categories"].items():
                 print(f"  - {k}: {v}")
+            print(f" Words: {stats['words']:,}  Lines: {stats['lines']:,}  Size: {format_size(stats['bytes'])}")
+            print(" Versions:")
+            for k, v in stats["versions"].items():
+                print(f"  - {k}: {v}")
+            print(f" Section Completeness: {completeness(stats)}")
+            print(" Largest:")
+            for item in stats["largest"]:
+                print(f"  - {format_size(item['bytes']):>9}  {item['title']} ({item['path']})")
+            print(" Stalest:")
+            for item in stats["stalest"]:
+                print(f"  - {item['modified'][:10]}  {item['title']} ({item['path']})")
+            print(" Least Complete:")
+            for item in stats["least_complete"]:
+                print(f"  - {item['filled']}/{item['expected']}  {item['title']} ({item['path']}), missing: {', '.join(item['missing'])}")
+            if "by_category" in stats:
+                print(" By Category:")
+                for name, totals in stats["by_category"].items():
+                    print(f"  - {name}: {totals['total_specs']} specs, {totals['words']:,} words, "
+                          f"{format_size(totals['bytes'])}, {completeness(totals)}")
 
     return True # CLI handled execution
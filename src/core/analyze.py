@@ -0,0 +1,251 @@
+import os
+import re
+import json
+import heapq
+import hashlib
+from functools import lru_cache
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from .config import get_schemas_dir
+from .fileio import atomic_write_text
+from .parallel import parallel_map
+from .walker import FileStat, iter_spec_files
+
+# Below this many files to (re)compute, a process pool costs more than it saves
+PROCESS_MIN_FILES = 512
+
+# Words of prose: markdown markers ("##", "-", "...") are not counted
+_WORD = re.compile(r"\w+(?:['’-]\w+)*", re.UNICODE)
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+
+def get_analyze_cache_file():
+    return os.path.join(get_schemas_dir(), "_analyze.json")
+
+def _templates() -> Dict[str, str]:
+    from .generator import TEMPLATES_BODY
+    return TEMPLATES_BODY
+
+def normalize_heading(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+@lru_cache(maxsize=None)
+def template_sections(category: str) -> Tuple[str, ...]:
+    """The "## " headings a spec of category starts with (empty for categories without a template)."""
+    body = _templates().get(category, "")
+    return tuple(m.group(2) for m in map(_HEADING.match, body.splitlines()) if m and len(m.group(1)) == 2)
+
+@lru_cache(maxsize=None)
+def _placeholders() -> frozenset:
+    # Template filler ("...", "(Rules)", "1. ...") doesn't make a section filled
+    return frozenset(line.strip() for body in _templates().values() for line in body.splitlines()
+                     if line.strip() and not _HEADING.match(line))
+
+def _templates_digest() -> str:
+    raw = json.dumps(_templates(), sort_keys=True)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+def sections(body: str, placeholders: Iterable[str] = ()) -> Dict[str, bool]:
+    """
+    normalized "## " heading -> whether the section holds more than template placeholders.
+    A section runs to the next heading of any level; fenced code counts as content.
+    """
+    placeholders = frozenset(placeholders)
+    found = {}
+    current = None
+    in_fence = False
+    for line in body.splitlines():
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else _HEADING.match(line)
+        if match:
+            current = normalize_heading(match.group(2)) if len(match.group(1)) == 2 else None
+            if current is not None:
+                found.setdefault(current, False)
+            continue
+        text = line.strip()
+        if current is not None and text and text not in placeholders:
+            found[current] = True
+    return found
+
+def file_stats(filepath: str) -> Optional[dict]:
+    """
+    Words, lines and sections of the spec body at filepath (the header is not counted).
+    Module-level so it can run in a process pool; None if the file can't be read.
+    """
+    from .metadata import read_header
+    try:
+        _, offset = read_header(filepath)
+        with open(filepath, "rb") as f:
+            f.seek(offset)
+            body = f.read().decode("utf-8", errors="replace")
+    except (OSError, UnicodeDecodeError):
+        return None
+    return {
+        "words": len(_WORD.findall(body)),
+        "lines": body.count("\n") + (1 if body and not body.endswith("\n") else 0),
+        "sections": sections(body, _placeholders()),
+    }
+
+class StatsCache:
+    """
+    Persistent map of rel_path -> per-file stats (_analyze.json), each stored with
+    the (mtime_ns, size, inode) fingerprint of the file it was computed from.
+    Entries whose file still has that fingerprint are reused without opening it.
+    The whole cache is dropped when the templates change (placeholders decide completeness).
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_analyze_cache_file()
+        self.entries: Dict[str, dict] = {}
+        self.dirty = False
+
+    def load(self) -> "StatsCache":
+        self.entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    raw = json.load(f)
+                if raw.get("version") == self.VERSION and raw.get("templates") == _templates_digest():
+                    self.entries = raw.get("files", {})
+            except Exception as e:
+                # A broken cache only costs a recount
+                print(f"Warning: Failed to load analyze cache: {e}")
+        self.dirty = False
+        return self
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        raw = {"version": self.VERSION, "templates": _templates_digest(), "files": self.entries}
+        atomic_write_text(self.path, json.dumps(raw, separators=(",", ":")))
+        self.dirty = False
+
+    def get(self, rel_path: str, st: FileStat) -> Optional[dict]:
+        entry = self.entries.get(rel_path)
+        if entry and entry["sig"] == [st.st_mtime_ns, st.st_size, st.st_ino]:
+            return entry
+        return None
+
+    def update(self, rel_path: str, st: FileStat, stats: dict) -> dict:
+        entry = {"sig": [st.st_mtime_ns, st.st_size, st.st_ino], **stats}
+        self.entries[rel_path] = entry
+        self.dirty = True
+        return entry
+
+    def prune(self, keep: Iterable[str]) -> None:
+        keep = set(keep)
+        for rel_path in [p for p in self.entries if p not in keep]:
+            del self.entries[rel_path]
+            self.dirty = True
+
+def collect_stats(root: Optional[str] = None, workers: Optional[int] = None,
+                  cache: Optional[StatsCache] = None) -> Tuple[Dict[str, dict], int]:
+    """
+    Stats of every spec file below root, from the cache where the file is unchanged
+    and computed in parallel otherwise (a process pool for big batches).
+    Returns (rel_path -> {"sig": [mtime_ns, size, inode], "words", "lines", "sections"},
+    number of files computed).
+    """
+    cache = cache or StatsCache().load()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    stats, pending = {}, []
+    for entry in iter_spec_files(root or get_schemas_dir()):
+        found = cache.get(entry.rel_path, entry.stat)
+        if found is None:
+            pending.append(entry)
+        else:
+            stats[entry.rel_path] = found
+    results = parallel_map(file_stats, [entry.path for entry in pending],
+                           workers=workers, processes=len(pending) >= PROCESS_MIN_FILES)
+    for entry, result in zip(pending, results):
+        if result is not None:
+            stats[entry.rel_path] = cache.update(entry.rel_path, entry.stat, result)
+    cache.prune(stats)
+    cache.save()
+    return stats, len(pending)
+
+def _completeness(category: str, found: Dict[str, bool]) -> Tuple[int, List[str]]:
+    """(expected sections filled, names of the missing or empty ones) for a spec of category."""
+    expected = template_sections(category)
+    missing = [name for name in expected if not found.get(normalize_heading(name))]
+    return len(expected) - len(missing), missing
+
+class _Totals:
+    def __init__(self):
+        self.specs = 0
+        self.words = 0
+        self.lines = 0
+        self.bytes = 0
+        self.versions: Dict[str, int] = {}
+        self.sections_expected = 0
+        self.sections_filled = 0
+
+    def add(self, version: str, entry: Optional[dict], expected: int, filled: int) -> None:
+        self.specs += 1
+        self.versions[version] = self.versions.get(version, 0) + 1
+        if entry is not None:
+            self.words += entry["words"]
+            self.lines += entry["lines"]
+            self.bytes += entry["sig"][1]
+            self.sections_expected += expected
+            self.sections_filled += filled
+
+    def as_dict(self) -> dict:
+        ratio = self.sections_filled / self.sections_expected if self.sections_expected else None
+        return {
+            "total_specs": self.specs,
+            "words": self.words,
+            "lines": self.lines,
+            "bytes": self.bytes,
+            "versions": dict(sorted(self.versions.items())),
+            "completeness": {
+                "sections_expected": self.sections_expected,
+                "sections_filled": self.sections_filled,
+                "ratio": round(ratio, 4) if ratio is not None else None,
+            },
+        }
+
+def analyze_story(top: int = 5, by: Optional[str] = None, workers: Optional[int] = None) -> dict:
+    """
+    Statistics of the active story: counts per category (from the registry), words,
+    lines and bytes (spec bodies), version distribution, the largest and stalest
+    specs and section completeness against the category templates.
+    by="category" adds the same totals per category.
+    """
+    from .metadata import query_specs
+    stats, computed = collect_stats(workers=workers)
+    overall = _Totals()
+    per_category: Dict[str, _Totals] = {}
+    categories: Dict[str, int] = {}
+    rows = [] # (path, title, stats, filled, missing) of the specs on disk, in path order
+    for path, spec in query_specs():
+        entry = stats.get(path)
+        filled, missing = _completeness(spec.category, entry["sections"]) if entry else (0, [])
+        categories[spec.category] = categories.get(spec.category, 0) + 1
+        overall.add(spec.version, entry, filled + len(missing), filled)
+        if by == "category":
+            per_category.setdefault(spec.category, _Totals()).add(spec.version, entry, filled + len(missing), filled)
+        if entry is not None:
+            rows.append((path, spec.title, entry, filled, missing))
+
+    # nlargest/nsmallest keep input order on ties, so equal keys list the smaller path first
+    result = overall.as_dict()
+    result["categories"] = categories
+    result["largest"] = [{"path": p, "title": t, "bytes": e["sig"][1], "words": e["words"]}
+                         for p, t, e, _, _ in heapq.nlargest(top, rows, key=lambda r: r[2]["sig"][1])]
+    result["stalest"] = [{"path": p, "title": t, "modified": _iso(e["sig"][0])}
+                         for p, t, e, _, _ in heapq.nsmallest(top, rows, key=lambda r: r[2]["sig"][0])]
+    incomplete = (r for r in rows if r[4])
+    result["least_complete"] = [{"path": p, "title": t, "filled": f, "expected": f + len(m), "missing": m}
+                                for p, t, _, f, m in heapq.nlargest(top, incomplete, key=lambda r: len(r[4]) / (r[3] + len(r[4])))]
+    if by == "category":
+        result["by_category"] = {name: totals.as_dict() for name, totals in sorted(per_category.items())}
+    result["cache"] = {"files": len(stats), "computed": computed}
+    return result
+
+def _iso(mtime_ns: int) -> str:
+    return datetime.fromtimestamp(mtime_ns / 1e9, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
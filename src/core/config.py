@@ -1,5 +1,4 @@
 import os
-from pathlib import Path
 
 # System Globals
 STORY_LORD_ROOT = os.path.expanduser("~/Documents/StoryLord")
@@ -12,6 +11,20 @@ _SCHEMAS_DIR = os.path.join(APP_DATA_ROOT, "schemas")
 
 CATEGORIES = ["Canon", "Characters", "Rules", "Lore", "Composition", "Episodes"]
 
+# Worker count for header parsing during scans (1 = serial).
+# Raise it when the registry lives on a network share where per-file latency dominates.
+def _env_workers(name: str) -> int:
+    # Like an unknown backend, a value that isn't a count falls back to the default (serial)
+    try:
+        return max(1, int(os.environ.get(name, "1") or 1))
+    except ValueError:
+        return 1
+
+SCAN_WORKERS = _env_workers("STORYLORD_SCAN_WORKERS")
+
+# Metadata registry backend: "json" (sharded _metadata.json files) or "sqlite" (_schemas.db)
+METADATA_BACKEND = os.environ.get("STORYLORD_METADATA_BACKEND", "json").lower()
+
 def ensure_global_root():
     if not os.path.exists(STORY_LORD_ROOT):
         os.makedirs(STORY_LORD_ROOT)
@@ -58,6 +71,12 @@ def get_schemas_dir() -> str:
     # return Global Schemas Dir
     return _SCHEMAS_DIR
 
+def get_scan_workers() -> int:
+    return SCAN_WORKERS
+
+def get_metadata_backend() -> str:
+    return METADATA_BACKEND
+
 def is_story_set() -> bool:
     return _ACTIVE_STORY_ROOT is not None
 
@@ -67,11 +86,15 @@ def get_story_name() -> str:
     return "Unknown"
 
 # Versioning
-from core.version_manager import VersionManager
-_VERSION_MANAGER = VersionManager(os.path.join(APP_DATA_ROOT, "config", "config.json"))
+# Resolved on first use: building the manager reads the git tags, which most CLI verbs never need
+_VERSION_MANAGER = None
 
-def get_app_version() -> str:
-    return _VERSION_MANAGER.get_version()
-
-def get_version_manager() -> VersionManager:
+def get_version_manager():
+    global _VERSION_MANAGER
+    if _VERSION_MANAGER is None:
+        from core.version_manager import VersionManager
+        _VERSION_MANAGER = VersionManager(os.path.join(APP_DATA_ROOT, "config", "config.json"))
     return _VERSION_MANAGER
+
+def get_app_version() -> str:
+    return get_version_manager().get_version()
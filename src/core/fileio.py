@@ -0,0 +1,34 @@
+import os
+import shutil
+import tempfile
+
+# Read once at import (os.umask can only be read by setting it, which races with other threads)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def atomic_write_text(path: str, content: str, encoding: str = "utf-8", newline: str = None) -> None:
+    """
+    Writes content to a temp file in the same directory and swaps it in with os.replace.
+    Readers either see the old file or the new one, never a partial write.
+    newline is passed to open(); use "\n" when the exact bytes matter (e.g. checksummed files).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding=encoding, newline=newline) as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            # Keep the permissions of the file we are replacing
+            shutil.copymode(path, tmp_path)
+        else:
+            # mkstemp creates 0600 files; a new file gets what open() would have given it
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
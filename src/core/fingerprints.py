@@ -0,0 +1,103 @@
+import os
+import json
+import hashlib
+from typing import Dict, Iterable, Optional
+from .config import get_schemas_dir
+from .fileio import atomic_write_text
+
+HEADER_KEYS = ["title", "description", "category", "version"]
+
+def get_fingerprint_file():
+    return os.path.join(get_schemas_dir(), "_fingerprints.json")
+
+def header_digest(meta: dict) -> str:
+    """
+    Stable hash of the header fields of a spec.
+    Used to tell whether the registry entry still matches what was on disk
+    when the file was last scanned.
+    """
+    raw = "\x1f".join(str(meta.get(k, "") or "") for k in HEADER_KEYS)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+def body_digest(body: bytes) -> str:
+    """
+    Hash of a spec's body (everything after the header), used to recognise a
+    file that was moved or renamed. Empty bodies hash to "" (never matched).
+    """
+    body = body.replace(b"\r\n", b"\n")
+    if not body.strip():
+        return ""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+class FingerprintCache:
+    """
+    Persistent map of rel_path -> (mtime_ns, size, inode, header hash, body hash).
+    Lets scan_and_sync skip files that have not changed since the last scan.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_fingerprint_file()
+        self.entries: Dict[str, dict] = {}
+        self.dirty = False
+
+    def load(self) -> "FingerprintCache":
+        self.entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    raw = json.load(f)
+                if raw.get("version") == self.VERSION:
+                    self.entries = raw.get("files", {})
+            except Exception as e:
+                # A broken cache only costs a full rescan
+                print(f"Warning: Failed to load fingerprint cache: {e}")
+        self.dirty = False
+        return self
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        raw = {"version": self.VERSION, "files": self.entries}
+        atomic_write_text(self.path, json.dumps(raw, separators=(",", ":")))
+        self.dirty = False
+
+    def get(self, rel_path: str) -> Optional[dict]:
+        return self.entries.get(rel_path)
+
+    def matches(self, rel_path: str, st: os.stat_result) -> bool:
+        """True if the file stat is identical to the one recorded for rel_path."""
+        fp = self.entries.get(rel_path)
+        if not fp:
+            return False
+        if fp["mtime_ns"] != st.st_mtime_ns or fp["size"] != st.st_size:
+            return False
+        # Some stat sources (e.g. DirEntry on Windows) report inode 0
+        if fp["ino"] and st.st_ino and fp["ino"] != st.st_ino:
+            return False
+        return True
+
+    def update(self, rel_path: str, st: os.stat_result, header_hash: str, body_hash: str = "") -> None:
+        self.entries[rel_path] = {
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "ino": st.st_ino,
+            "header_hash": header_hash,
+            "body_hash": body_hash,
+        }
+        self.dirty = True
+
+    def body_hash(self, rel_path: str) -> str:
+        """The body hash recorded for rel_path ("" if unknown, e.g. cached before body hashes existed)."""
+        return (self.entries.get(rel_path) or {}).get("body_hash", "")
+
+    def remove(self, rel_path: str) -> None:
+        if self.entries.pop(rel_path, None) is not None:
+            self.dirty = True
+
+    def prune(self, keep: Iterable[str]) -> None:
+        """Drops every entry whose path is not in keep."""
+        keep = set(keep)
+        for rel_path in [p for p in self.entries if p not in keep]:
+            self.remove(rel_path)
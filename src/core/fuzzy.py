@@ -0,0 +1,214 @@
+import re
+import heapq
+from collections import Counter
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from .models import StorySpec
+
+# Share of the query's trigrams a title must contain to count as a (typo-tolerant) match
+MIN_OVERLAP = 0.6
+# Most docs a query scores (shortest titles first), so a query common to every title
+# still answers within a frame; the ones past it could only rank below equal matches
+MAX_CANDIDATES = 2000
+
+class FuzzyMatch(NamedTuple):
+    path: str
+    title: str
+    score: float
+
+_SEPARATORS = re.compile(r"[\W_]+", re.UNICODE)
+
+def normalize(text: str) -> str:
+    """Lowercase, with punctuation, underscores and runs of spaces folded to one space."""
+    return _SEPARATORS.sub(" ", text.lower()).strip()
+
+def grams(key: str) -> set:
+    """
+    Trigrams of a normalized key, plus a " x" bigram for each word start
+    (so one- and two-letter queries can use the index too).
+    """
+    padded = f" {key} "
+    found = {padded[i:i + 3] for i in range(len(padded) - 2)}
+    found.update(padded[i:i + 2] for i in range(len(padded) - 1) if padded[i] == " ")
+    return found
+
+def _folder(path: str) -> Optional[str]:
+    # The posting of a top-level folder ("Lore/"); the "/" keeps it apart from the grams
+    return path.split("/", 1)[0] + "/" if "/" in path else None
+
+def _key(path: str, title: str) -> str:
+    # What a query is matched against: the title, then the file name (the category is not worth matching)
+    name = path.rsplit("/", 1)[-1]
+    if name.endswith(".md"):
+        name = name[:-3]
+    return f"{normalize(title)} | {normalize(name)}"
+
+class FuzzyIndex:
+    """
+    In-memory trigram index over spec titles and paths, for type-to-filter.
+
+    Postings are kept sorted by title length. A query walks the posting of its
+    rarest trigram, shortest titles first, and ranks the docs holding the whole
+    query: title word start > title substring > file name, shorter titles first.
+    The walk stops once `limit` docs start with the query (no later, longer
+    title can beat them) or after MAX_CANDIDATES docs. With a folder prefix,
+    the folder's own (length-sorted) docs are walked when there are fewer of them. If that leaves fewer than
+    `limit` docs, docs sharing at least MIN_OVERLAP of the trigrams are added,
+    so typos still match. Queries shorter than three characters only match word starts.
+
+    sync() applies only the titles that changed; removed docs are tombstoned
+    and their posting ids skipped until the index is rebuilt.
+    """
+
+    def __init__(self, specs: Optional[Dict[str, StorySpec]] = None):
+        self.paths: List[Optional[str]] = [] # doc id -> path (None once removed)
+        self.titles: List[str] = []
+        self.keys: List[str] = []
+        self.ids: Dict[str, int] = {} # path -> doc id
+        self.postings: Dict[str, List[int]] = {}
+        self.removed = 0
+        self._unsorted = set() # grams whose posting got a doc shorter than its last one
+        if specs:
+            self.sync(specs)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, path: str, title: str) -> None:
+        if path in self.ids:
+            self.remove(path)
+        doc_id = len(self.paths)
+        self.paths.append(path)
+        self.titles.append(title)
+        key = _key(path, title)
+        self.keys.append(key)
+        self.ids[path] = doc_id
+        postings = self.postings
+        titles = self.titles
+        length = len(title)
+        folder = _folder(path)
+        for gram in (*grams(key), folder) if folder else grams(key):
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = [doc_id]
+            else:
+                if length < len(titles[posting[-1]]):
+                    self._unsorted.add(gram)
+                posting.append(doc_id)
+
+    def remove(self, path: str) -> None:
+        doc_id = self.ids.pop(path, None)
+        if doc_id is not None:
+            self.paths[doc_id] = None
+            self.keys[doc_id] = ""
+            self.removed += 1
+
+    def sync(self, specs: Dict[str, StorySpec]) -> int:
+        """Brings the index in line with specs (path -> spec). Returns the number of docs touched."""
+        if self.removed > len(self.ids):
+            # Mostly tombstones: a rebuild is cheaper than skipping them on every query
+            self.__init__()
+        touched = 0
+        for path in [p for p in self.ids if p not in specs]:
+            self.remove(path)
+            touched += 1
+        changed = [(path, spec.title) for path, spec in specs.items()
+                   if path not in self.ids or self.titles[self.ids[path]] != spec.title]
+        # Added shortest first, a fresh build leaves every posting sorted as it goes
+        for path, title in sorted(changed, key=lambda item: len(item[1])):
+            self.add(path, title)
+        touched += len(changed)
+        self._sort_postings()
+        return touched
+
+    def _sort_postings(self) -> None:
+        # Sorting is stable and the postings are mostly sorted runs already, so this stays cheap
+        length = lambda i: len(self.titles[i])
+        for gram in self._unsorted:
+            self.postings[gram].sort(key=length)
+        self._unsorted.clear()
+
+    def _score(self, doc_id: int, query: str) -> float:
+        key = self.keys[doc_id]
+        pos = key.find(query)
+        if pos < 0:
+            return 0.0
+        if key.find(" | ", 0, pos + len(query)) < 0:
+            # In the title: a match at a word start beats one mid-word
+            return (3.0 if pos == 0 else 2.5 if key[pos - 1] == " " else 2.0) - pos / 1000.0
+        return 1.0 - pos / 1000.0
+
+    def _live(self, ids: Iterable[int], prefix: Optional[str]) -> Iterator[int]:
+        paths = self.paths
+        if prefix:
+            return (i for i in ids if paths[i] is not None and paths[i].startswith(prefix))
+        return (i for i in ids if paths[i] is not None)
+
+    def _rank(self, ids: Iterable[int], score: Callable[[int], float], limit: int, prefix: Optional[str]) -> List[FuzzyMatch]:
+        """
+        The `limit` best docs of ids (a length-sorted posting), scoring at most MAX_CANDIDATES
+        of them and stopping early once `limit` docs have the top score (3.0, a title start).
+        """
+        scored = []
+        top = 0
+        for i in islice(self._live(ids, prefix), MAX_CANDIDATES):
+            value = score(i)
+            if value > 0:
+                scored.append((value, i))
+                if value >= 3.0:
+                    top += 1
+                    if top >= limit:
+                        break
+        return self._top(scored, limit)
+
+    def search(self, query: str, limit: Optional[int] = 50, prefix: Optional[str] = None) -> List[FuzzyMatch]:
+        """
+        Best matches first; an empty query returns nothing.
+        prefix restricts the matches to paths starting with it (e.g. "Lore/").
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        limit = limit if limit is not None else len(self.paths)
+        if self._unsorted:
+            self._sort_postings()
+        keys = self.keys
+        # Within a folder smaller than the query's posting, its docs are the candidates instead
+        folder = self.postings.get(_folder(prefix), ()) if prefix and "/" in prefix else None
+        if len(query) < 3:
+            # Too short for trigrams: word starts only, through the " x" / " xy" grams.
+            # Titles starting with the query come first, shortest first.
+            word = " " + query
+            ids = self.postings.get(word, ())
+            if folder is not None and len(folder) < len(ids):
+                ids = folder
+            return self._rank(ids, lambda i: 3.0 if keys[i].startswith(query) else 2.5 if word in keys[i] else 0.0, limit, prefix)
+
+        # Unpadded: the query may start or end mid-word. Every doc holding the whole
+        # query is in the posting of its rarest trigram; the substring test checks the rest.
+        query_grams = sorted({query[i:i + 3] for i in range(len(query) - 2)}, key=lambda g: len(self.postings.get(g, ())))
+        ids = self.postings.get(query_grams[0], ())
+        if folder is not None and len(folder) < len(ids):
+            ids = folder
+        results = self._rank(ids, lambda i: self._score(i, query), limit, prefix)
+        if len(results) >= limit or len(query) < 4:
+            return results
+
+        # Typo tolerance: docs holding most of the query's trigrams (the shortest titles of each posting)
+        seen = {self.ids[m.path] for m in results}
+        needed = max(2, int(len(query_grams) * MIN_OVERLAP + 0.999))
+        counts = Counter()
+        if folder is not None and len(folder) <= MAX_CANDIDATES:
+            for i in folder:
+                padded = f" {keys[i]} "
+                counts[i] = sum(gram in padded for gram in query_grams)
+        else:
+            for gram in query_grams:
+                counts.update(islice(self.postings.get(gram, ()), MAX_CANDIDATES))
+        close = self._live((i for i, shared in counts.items() if shared >= needed and i not in seen), prefix)
+        fuzzy = ((counts[i] / len(query_grams) * 0.9, i) for i in close)
+        return results + self._top(fuzzy, limit - len(results))
+
+    def _top(self, scored: Iterable[Tuple[float, int]], limit: int) -> List[FuzzyMatch]:
+        best = heapq.nlargest(limit, scored, key=lambda item: (item[0], -len(self.titles[item[1]])))
+        return [FuzzyMatch(self.paths[i], self.titles[i], round(score, 4)) for score, i in best]
@@ -1,8 +1,13 @@
 import os
 import re
-from .metadata import update_file_header
+import csv
+import json
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from .metadata import render_header, sync_paths, register_written, load_all_metadata
 from .config import get_schemas_dir, is_story_set
+from .fingerprints import body_digest
 from .models import StorySpec
+from .parallel import parallel_map
 
 TEMPLATES_BODY = {
     "Lore": "\n## Summary\n(One line explanation)\n\n## Mechanics\n(Rules)\n",
@@ -13,11 +18,34 @@ TEMPLATES_BODY = {
     "Episodes": "\n## Logline\n...\n\n## Acts\n...\n"
 }
 
+# Bulk creation writes files on this many threads by default
+BULK_WORKERS = 8
+
 def sanitize_filename(title):
     clean = re.sub(r'[^a-zA-Z0-9\s]', '', title)
     return clean.replace(' ', '_').lower()
 
-from typing import Tuple
+def template_body(category: str) -> str:
+    """The body (below the header) a new spec of category starts with."""
+    body = TEMPLATES_BODY.get(category, "\n# Content\n")
+    # The template's leading blank line is the one that ends the header
+    return body[1:] if body.startswith("\n") else body
+
+def write_new_spec(filepath: str, spec: StorySpec, body: str) -> Tuple[os.stat_result, str]:
+    """
+    Writes a new spec, header and body, in one go. Never overwrites: raises
+    FileExistsError if filepath exists. Returns its stat and body hash.
+    """
+    meta = {
+        "title": spec.title,
+        "category": spec.category,
+        "version": spec.version,
+        "description": spec.description or ""
+    }
+    data = body.encode("utf-8")
+    with open(filepath, "xb") as f:
+        f.write(render_header(meta).encode("utf-8") + data)
+    return os.stat(filepath), body_digest(data)
 
 def generate_spec(category: str, title: str, version: str = "0.1", description: str = "") -> Tuple[bool, str]:
     """
@@ -46,19 +74,138 @@ def generate_spec(category: str, title: str, version: str = "0.1", description:
     filename = f"{sanitize_filename(title)}.md"
     filepath = os.path.join(cat_dir, filename)
     
-    if os.path.exists(filepath):
+    try:
+        write_new_spec(filepath, spec, template_body(category))
+    except FileExistsError:
         return False, f"File '{filename}' already exists."
-        
-    with open(filepath, "w", encoding="utf-8") as f:
-        body = TEMPLATES_BODY.get(category, "\n# Content\n")
-        f.write(body)
-        
-    meta = {
-        "title": title,
-        "category": category,
-        "version": version,
-        "description": description
-    }
-    update_file_header(filepath, meta)
+    
+    # Registers (and indexes for search) just this file instead of waiting for the next full scan
+    sync_paths([f"{category}/{filename}"])
     
     return True, filepath
+
+# --- Bulk creation ---
+
+MANIFEST_FIELDS = ["title", "category", "version", "description", "body"]
+
+class BulkResult(NamedTuple):
+    created: List[str] # Relative paths, in manifest order
+    errors: List[str] # "line N: message"
+    renamed: int # Specs whose file name was suffixed to avoid a collision
+
+def read_manifest(path: str) -> List[Tuple[int, dict]]:
+    """
+    Rows of a bulk manifest as (line number, fields): JSON Lines (one object per
+    line) or, for a .csv file, CSV with a header row. Fields are MANIFEST_FIELDS.
+    """
+    rows = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            reader = csv.DictReader(f)
+            for row in reader:
+                rows.append((reader.line_num, {k.strip().lower(): v for k, v in row.items() if k}))
+        else:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    row = e
+                rows.append((number, row))
+    return rows
+
+def _validate_row(row, categories: Optional[Iterable[str]]) -> Tuple[Optional[StorySpec], str]:
+    """(spec, "") for a valid manifest row, else (None, reason)."""
+    if isinstance(row, Exception):
+        return None, f"Invalid JSON: {row}"
+    if not isinstance(row, dict):
+        return None, "Expected an object"
+    unknown = set(row) - set(MANIFEST_FIELDS)
+    if unknown:
+        return None, f"Unknown field(s): {', '.join(sorted(unknown))}"
+    values = {k: ("" if row.get(k) is None else str(row[k])).strip() for k in ["title", "category", "version", "description"]}
+    if not values["title"] or not values["category"]:
+        return None, "title and category are required"
+    if any("\n" in v or "\r" in v for v in values.values()):
+        return None, "Header fields must fit on one line"
+    if categories is not None and values["category"] not in categories:
+        return None, f"Invalid category '{values['category']}'"
+    if not sanitize_filename(values["title"]):
+        return None, f"Title '{values['title']}' makes an empty file name"
+    try:
+        return StorySpec(title=values["title"], category=values["category"],
+                         version=values["version"] or "0.1", description=values["description"]), ""
+    except Exception as e:
+        return None, f"Validation Error: {e}"
+
+def _unique_name(stem: str, taken: Set[str]) -> str:
+    name = f"{stem}.md"
+    n = 1
+    while name.lower() in taken:
+        n += 1
+        name = f"{stem}_{n}.md"
+    taken.add(name.lower())
+    return name
+
+def _write_job(job: Tuple[str, StorySpec, str]) -> Tuple[Optional[os.stat_result], str, str]:
+    filepath, spec, body = job
+    try:
+        st, body_hash = write_new_spec(filepath, spec, body)
+        return st, body_hash, ""
+    except FileExistsError:
+        return None, "", "already exists"
+    except OSError as e:
+        return None, "", str(e)
+
+def create_specs_bulk(rows: List[Tuple[int, dict]], workers: Optional[int] = None,
+                      categories: Optional[Iterable[str]] = None) -> BulkResult:
+    """
+    Creates one spec per manifest row (see read_manifest).
+
+    Every row is validated first; if any is invalid nothing is written.
+    File names are made unique against an in-memory set of the names already
+    on disk or in the registry (case-insensitive: "_2", "_3", ... suffixes).
+    Each file is then written once, header and body together, on a thread
+    pool, and the registry gets a single commit for the whole batch.
+    """
+    planned = []
+    errors = []
+    for number, row in rows:
+        spec, error = _validate_row(row, categories)
+        if error:
+            errors.append(f"line {number}: {error}")
+        else:
+            body = (row.get("body") or "") if isinstance(row, dict) else ""
+            planned.append((number, spec, str(body) or template_body(spec.category)))
+    if errors:
+        return BulkResult([], errors, 0)
+
+    specs_dir = get_schemas_dir()
+    taken: Dict[str, Set[str]] = {} # category -> lowercased file names in use
+    for path in load_all_metadata().specs:
+        folder, _, name = path.rpartition("/")
+        taken.setdefault(folder, set()).add(name.lower())
+    for category in {spec.category for _, spec, _ in planned}:
+        cat_dir = os.path.join(specs_dir, category)
+        os.makedirs(cat_dir, exist_ok=True)
+        taken.setdefault(category, set()).update(name.lower() for name in os.listdir(cat_dir))
+
+    jobs = []
+    renamed = 0
+    for number, spec, body in planned:
+        stem = sanitize_filename(spec.title)
+        name = _unique_name(stem, taken[spec.category])
+        renamed += name != f"{stem}.md"
+        jobs.append((number, f"{spec.category}/{name}", spec, body))
+
+    results = parallel_map(_write_job, [(os.path.join(specs_dir, *rel_path.split("/")), spec, body) for _, rel_path, spec, body in jobs],
+                           workers=BULK_WORKERS if workers is None else workers)
+    written = []
+    for (number, rel_path, spec, _), (st, body_hash, error) in zip(jobs, results):
+        if error:
+            errors.append(f"line {number}: {rel_path}: {error}")
+        else:
+            written.append((rel_path, spec, st, body_hash))
+    register_written(written)
+    return BulkResult([rel_path for rel_path, _, _, _ in written], errors, renamed)
@@ -0,0 +1,229 @@
+import os
+import re
+import sqlite3
+import posixpath
+from contextlib import closing
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote
+from .config import get_schemas_dir
+from .models import StorySpec
+
+# [[Title]], [[Title#Section]], [[Title|shown text]]; a target with a "/" is a spec path ([[Lore/Dragons]])
+_WIKI_LINK = re.compile(r"\[\[([^\[\]|#\n]+)(?:#[^\[\]|\n]*)?(?:\|([^\[\]\n]*))?\]\]")
+# [text](relative/path.md#anchor "tooltip"), but not images
+_MD_LINK = re.compile(r"(?<!!)\[([^\]\n]*)\]\(\s*<?([^)\s>]+)>?(?:\s+\"[^\"\n]*\")?\s*\)")
+_URL_SCHEME = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*:")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    sig TEXT
+);
+CREATE TABLE IF NOT EXISTS links (
+    source TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    target TEXT NOT NULL,
+    text TEXT NOT NULL,
+    line INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_links_source ON links(source);
+CREATE INDEX IF NOT EXISTS idx_links_target ON links(kind, target);
+"""
+
+class LinkRef(NamedTuple):
+    kind: str # "title" (target is a normalized title) or "path" (target is a spec path)
+    target: str
+    text: str
+    line: int # 1-based, within the body
+
+class Link(NamedTuple):
+    source: str
+    kind: str
+    target: str
+    text: str
+    line: int
+    resolved: List[str] # The spec paths the link points to (empty if dangling)
+
+def get_link_db():
+    return os.path.join(get_schemas_dir(), "_links.db")
+
+def normalize_title(title: str) -> str:
+    return " ".join(title.casefold().split())
+
+def _spec_path(target: str) -> str:
+    return target if target.endswith(".md") else target + ".md"
+
+def extract_links(body: str, source: str) -> List[LinkRef]:
+    """
+    Links in a spec body: [[Title]] wiki links and relative markdown links to
+    .md files (resolved against the folder of source). URLs, anchors within
+    the page and fenced code blocks are ignored.
+    """
+    refs = []
+    source_dir = posixpath.dirname(source)
+    in_fence = False
+    for number, line in enumerate(body.splitlines(), 1):
+        if _FENCE.match(line):
+            in_fence = not in_fence
+            continue
+        if in_fence or "[" not in line:
+            continue
+        found = [] # (column, ref), so the links of a line keep their order
+        for match in _WIKI_LINK.finditer(line):
+            target, text = match.group(1).strip(), (match.group(2) or "").strip()
+            if "/" in target:
+                found.append((match.start(), LinkRef("path", posixpath.normpath(_spec_path(target)), text or target, number)))
+            elif target:
+                found.append((match.start(), LinkRef("title", normalize_title(target), text or target, number)))
+        for match in _MD_LINK.finditer(line):
+            url = match.group(2)
+            if _URL_SCHEME.match(url) or url.startswith(("/", "#")):
+                continue
+            url = unquote(url.split("#", 1)[0].split("?", 1)[0])
+            if url.endswith(".md"):
+                target = posixpath.normpath(posixpath.join(source_dir, url))
+                found.append((match.start(), LinkRef("path", target, match.group(1).strip(), number)))
+        refs.extend(ref for _, ref in sorted(found, key=lambda item: item[0]))
+    return refs
+
+def titles_index(specs: Dict[str, StorySpec]) -> Dict[str, List[str]]:
+    """normalized title -> spec paths with that title (sorted)."""
+    by_title = {}
+    for path in sorted(specs):
+        by_title.setdefault(normalize_title(specs[path].title), []).append(path)
+    return by_title
+
+def resolve(kind: str, target: str, specs: Dict[str, StorySpec], by_title: Dict[str, List[str]]) -> List[str]:
+    if kind == "title":
+        return list(by_title.get(target, ()))
+    return [target] if target in specs else []
+
+def _body_sig(fingerprint: Optional[dict]) -> Optional[str]:
+    # Links only depend on the body; None (always re-extract) without a fingerprint
+    if not fingerprint:
+        return None
+    return fingerprint.get("body_hash") or f"{fingerprint['mtime_ns']}-{fingerprint['size']}"
+
+class LinkIndex:
+    """
+    Adjacency index of the links between specs, kept in a stdlib sqlite3
+    database next to the registry (_links.db): one row per link, indexed by
+    source (outgoing links) and by target (backlinks).
+
+    Links are stored unresolved (a title or a path) and resolved against the
+    registry when queried, so renaming a title never needs a re-extraction.
+    refresh() only re-extracts the specs whose body changed.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, root: Optional[str] = None):
+        self.db_path = db_path or get_link_db()
+        self.root = root or os.path.dirname(self.db_path)
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def exists(self) -> bool:
+        return os.path.exists(self.db_path)
+
+    def refresh(self, specs: Dict[str, StorySpec], fingerprints: Dict[str, dict], paths: Optional[Iterable[str]] = None) -> int:
+        """
+        Brings the index in line with the registry (specs) for the given paths,
+        or for every path when paths is None. Returns the number of specs (re)extracted.
+        """
+        from .metadata import read_body
+        extracted = 0
+        with closing(self.connect()) as conn, conn:
+            if paths is None:
+                known = dict(conn.execute("SELECT path, sig FROM sources"))
+                paths = set(known) | set(specs)
+            else:
+                paths = set(paths)
+                known = {}
+                for path in paths:
+                    row = conn.execute("SELECT sig FROM sources WHERE path = ?", (path,)).fetchone()
+                    if row:
+                        known[path] = row[0]
+            for path in sorted(paths):
+                if path not in specs:
+                    if path in known:
+                        conn.execute("DELETE FROM links WHERE source = ?", (path,))
+                        conn.execute("DELETE FROM sources WHERE path = ?", (path,))
+                    continue
+                sig = _body_sig(fingerprints.get(path))
+                if sig is not None and path in known and known[path] == sig:
+                    continue
+                try:
+                    refs = extract_links(read_body(os.path.join(self.root, *path.split("/"))), path)
+                except OSError:
+                    refs = []
+                conn.execute("DELETE FROM links WHERE source = ?", (path,))
+                conn.executemany("INSERT INTO links VALUES (?, ?, ?, ?, ?)",
+                                 ((path, ref.kind, ref.target, ref.text, ref.line) for ref in refs))
+                conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?)", (path, sig))
+                extracted += 1
+        return extracted
+
+    def _rows(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with closing(self.connect()) as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def outgoing(self, path: str) -> List[tuple]:
+        """(source, kind, target, text, line) rows of the links in path, in body order."""
+        return self._rows("SELECT source, kind, target, text, line FROM links WHERE source = ? ORDER BY line, rowid", (path,))
+
+    def incoming(self, path: str, title: Optional[str] = None) -> List[tuple]:
+        """Rows of the links pointing at path, by path or (if given) by title."""
+        sql = "SELECT source, kind, target, text, line FROM links WHERE (kind = 'path' AND target = ?)"
+        params = [path]
+        if title is not None:
+            sql += " OR (kind = 'title' AND target = ?)"
+            params.append(normalize_title(title))
+        return self._rows(sql + " ORDER BY source, line", tuple(params))
+
+    def all_links(self) -> List[tuple]:
+        return self._rows("SELECT source, kind, target, text, line FROM links ORDER BY source, line")
+
+def refresh_link_index(specs: Dict[str, StorySpec], fingerprints: Dict[str, dict], paths: Optional[Iterable[str]] = None) -> None:
+    """Keeps _links.db current after a sync; a broken index only warns (queries rebuild it)."""
+    try:
+        LinkIndex().refresh(specs, fingerprints, paths)
+    except Exception as e:
+        print(f"Warning: Failed to update link index: {e}")
+
+def _open_index() -> Tuple[LinkIndex, Dict[str, StorySpec]]:
+    """
+    The link index as syncs (and the watcher) left it, and the registry; queries only
+    read them. The index is built from the registry if it has never been built.
+    """
+    from .metadata import load_all_metadata
+    specs = load_all_metadata().specs
+    index = LinkIndex()
+    if not index.exists():
+        from .fingerprints import FingerprintCache
+        index.refresh(specs, FingerprintCache().load().entries)
+    return index, specs
+
+def _resolved(rows: List[tuple], specs: Dict[str, StorySpec], by_title: Dict[str, List[str]]) -> List[Link]:
+    return [Link(source, kind, target, text, line, resolve(kind, target, specs, by_title))
+            for source, kind, target, text, line in rows]
+
+def outgoing_links(path: str) -> List[Link]:
+    index, specs = _open_index()
+    return _resolved(index.outgoing(path), specs, titles_index(specs))
+
+def backlinks(path: str) -> List[Link]:
+    """Links from other specs (or itself) that resolve to path."""
+    index, specs = _open_index()
+    spec = specs.get(path)
+    return _resolved(index.incoming(path, spec.title if spec else None), specs, titles_index(specs))
+
+def dangling_links() -> List[Link]:
+    """Links whose target is not in the registry."""
+    index, specs = _open_index()
+    by_title = titles_index(specs)
+    return [link for link in _resolved(index.all_links(), specs, by_title) if not link.resolved]
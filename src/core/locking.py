@@ -0,0 +1,77 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+class LockTimeout(TimeoutError):
+    pass
+
+class _HeldLock:
+    def __init__(self):
+        self.rlock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+
+_HELD: Dict[str, _HeldLock] = {}
+_HELD_GUARD = threading.Lock()
+
+def _try_lock(fd: int) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+@contextmanager
+def file_lock(path: str, timeout: float = 10.0, poll: float = 0.01):
+    """
+    Exclusive lock shared between processes (flock on POSIX, msvcrt.locking on Windows),
+    held on `path` (created if needed; its content is never used).
+    Re-entrant within a thread; other threads of the same process wait like other processes do.
+    Raises LockTimeout if it cannot be taken within timeout seconds.
+    """
+    path = os.path.abspath(path)
+    with _HELD_GUARD:
+        held = _HELD.setdefault(path, _HeldLock())
+    if not held.rlock.acquire(timeout=timeout):
+        raise LockTimeout(f"Timed out waiting for {path}")
+    try:
+        if held.depth == 0:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            deadline = time.monotonic() + timeout
+            while not _try_lock(fd):
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise LockTimeout(f"Timed out waiting for {path}")
+                time.sleep(poll)
+            held.fd = fd
+        held.depth += 1
+        try:
+            yield
+        finally:
+            held.depth -= 1
+            if held.depth == 0:
+                fd, held.fd = held.fd, None
+                try:
+                    _unlock(fd)
+                finally:
+                    os.close(fd)
+    finally:
+        held.rlock.release()
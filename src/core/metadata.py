@@ -1,129 +1,511 @@
 import os
 import json
 import re
-from typing import Dict
-from .config import get_schemas_dir
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .config import get_schemas_dir, get_scan_workers, get_metadata_backend
 from .models import StoryMetadata, StorySpec
+from .fileio import atomic_write_text
+from .store import JsonShardStore, RegistryConflict
+from .sqlite_store import SqliteStore
+from .fingerprints import FingerprintCache, header_digest, body_digest
+from .parallel import parallel_map
+from .walker import iter_spec_files
 
 def get_metadata_file():
     return os.path.join(get_schemas_dir(), "_schemas.json")
 
-def load_all_metadata() -> StoryMetadata:
-    meta_file = get_metadata_file()
-    if os.path.exists(meta_file):
+def get_metadata_db():
+    return os.path.join(get_schemas_dir(), "_schemas.db")
+
+def get_store():
+    """Returns the registry backend selected in config (JsonShardStore or SqliteStore)."""
+    json_store = JsonShardStore(get_schemas_dir(), get_metadata_file())
+    if get_metadata_backend() != "sqlite":
+        return json_store
+    store = SqliteStore(get_metadata_db())
+    if not store.exists() and os.path.exists(get_metadata_file()):
+        # First use of the SQLite backend: import the existing JSON registry
+        store.save_all(json_store.load())
+    return store
+
+# Process-wide cache of parsed registries: (store, categories) -> (stamp, generation, specs).
+# An entry is served while the (mtime_ns, size) of every registry file is unchanged.
+# Cached dicts are never mutated (updates replace them), so loads can hand them out as a base.
+_METADATA_CACHE: Dict[tuple, Tuple[tuple, int, Dict[str, StorySpec]]] = {}
+_CACHE_LOCK = threading.RLock()
+
+def _store_key(store) -> str:
+    return getattr(store, "manifest_path", None) or store.db_path
+
+def _registry_stamp(store) -> tuple:
+    stamp = []
+    for path in store.state_files():
         try:
-            with open(meta_file, "r", encoding="utf-8") as f:
-                raw_data = json.load(f)
-                return StoryMetadata(**raw_data)
-        except Exception as e:
-            # If load fails, return empty
-            print(f"Warning: Failed to load metadata: {e}")
-            return StoryMetadata()
-    return StoryMetadata()
+            st = os.stat(path)
+            stamp.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.append((path, None, None))
+    return tuple(stamp)
+
+def invalidate_metadata_cache() -> None:
+    """
+    Drops every cached registry, so the next load re-reads it from disk.
+    Only needed when the files may have changed without their mtime or size moving.
+    """
+    with _CACHE_LOCK:
+        _METADATA_CACHE.clear()
+
+def _cached(store, categories: Optional[frozenset]) -> Optional[Tuple[int, Dict[str, StorySpec]]]:
+    stamp = _registry_stamp(store)
+    key = _store_key(store)
+    with _CACHE_LOCK:
+        full = _METADATA_CACHE.get((key, None))
+        hit = _METADATA_CACHE.get((key, categories))
+    if full and full[0] == stamp:
+        if categories is None:
+            return full[1], full[2]
+        return full[1], {path: spec for path, spec in full[2].items() if spec.category in categories}
+    if hit and hit[0] == stamp:
+        return hit[1], hit[2]
+    return None
+
+def _drop_cached(store) -> None:
+    key = _store_key(store)
+    with _CACHE_LOCK:
+        for cache_key in [k for k in _METADATA_CACHE if k[0] == key]:
+            del _METADATA_CACHE[cache_key]
+
+def load_all_metadata(categories: Optional[Iterable[str]] = None) -> StoryMetadata:
+    """
+    Loads the registry. Pass categories to read only the entries of those categories.
+    Repeated loads are served from the in-process cache while the registry files are unchanged;
+    the StoryMetadata is a fresh shallow copy, but the StorySpec objects are shared.
+    Never waits for writers.
+    """
+    if categories is not None:
+        categories = frozenset(categories)
+    try:
+        store = get_store()
+        hit = _cached(store, categories)
+        if hit is None:
+            stamp = _registry_stamp(store)
+            hit = store.snapshot(categories)
+            with _CACHE_LOCK:
+                _METADATA_CACHE[(_store_key(store), categories)] = (stamp,) + hit
+        generation, specs = hit
+        data = StoryMetadata.model_construct(specs=dict(specs))
+        if categories is None:
+            # Lets save_all_metadata detect and merge a concurrent commit
+            data._generation = generation
+            data._base = specs
+        return data
+    except Exception as e:
+        # If load fails, return empty
+        print(f"Warning: Failed to load metadata: {e}")
+        return StoryMetadata()
 
 def save_all_metadata(data: StoryMetadata) -> None:
     """
-    Saves the full StoryMetadata object to _schemas.json.
+    Saves the full StoryMetadata object (only shards whose content changed are rewritten).
+    If data came from load_all_metadata and another writer (thread or process) committed
+    since, nothing of theirs is overwritten: the changes made to data are applied on top
+    of the registry instead, and data is refreshed to the merged result.
+    The in-process cache is updated in place rather than dropped.
     """
-    with open(get_metadata_file(), "w", encoding="utf-8") as f:
-        # Use mode='json' (pydantic v2) or .dict() (v1)
-        # Using model_dump for v2 compatibility layer if needed, assuming v2
-        try:
-            json.dump(data.model_dump(), f, indent=4, sort_keys=True)
-        except AttributeError:
-             # Fallback for Pydantic v1 if installed
-            json.dump(data.dict(), f, indent=4, sort_keys=True)
+    store = get_store()
+    base = data._base
+    try:
+        generation = store.save_all(data.specs, expected_generation=data._generation)
+    except RegistryConflict:
+        if base is None:
+            raise
+        upserts = {path: spec for path, spec in data.specs.items() if base.get(path) != spec}
+        deletes = [path for path in base if path not in data.specs]
+        update_metadata(upserts, deletes)
+        merged = load_all_metadata()
+        data.specs = merged.specs
+        data._generation, data._base = merged._generation, merged._base
+        return
+    committed = dict(data.specs)
+    _drop_cached(store)
+    with _CACHE_LOCK:
+        _METADATA_CACHE[(_store_key(store), None)] = (_registry_stamp(store), generation, committed)
+    data._generation, data._base = generation, committed
 
-def parse_header_from_file(filepath: str) -> StorySpec:
+def update_metadata(upserts: Optional[Dict[str, StorySpec]] = None, deletes: Iterable[str] = (),
+                    expected_generation: Optional[int] = None) -> int:
     """
-    Reads the first 20 lines of a file to extract YAML-like headers.
-    Returns a StorySpec object with defaults for missing fields.
+    Applies individual upserts/deletes to the registry, touching only the affected shards.
+    Safe to run concurrently from several processes (writers take the registry lock).
+    Raises RegistryConflict if expected_generation is given and another commit happened since.
+    A fresh cached full registry gets the same changes applied; returns the new generation.
+    """
+    store = get_store()
+    deletes = list(deletes)
+    key = _store_key(store)
+    with _CACHE_LOCK:
+        full = _METADATA_CACHE.get((key, None))
+    fresh = full is not None and full[0] == _registry_stamp(store)
+    generation = store.apply(upserts, deletes, expected_generation=expected_generation)
+    _drop_cached(store)
+    if fresh and generation == full[1] + 1:
+        # Nobody else committed in between: patch a copy of the cached registry
+        specs = dict(full[2])
+        for path in deletes:
+            specs.pop(path, None)
+        specs.update(upserts or {})
+        with _CACHE_LOCK:
+            _METADATA_CACHE[(key, None)] = (_registry_stamp(store), generation, specs)
+    return generation
+
+def query_specs(category: Optional[str] = None, title_glob: Optional[str] = None, path_prefix: Optional[str] = None,
+                limit: Optional[int] = None, offset: int = 0) -> Iterator[Tuple[str, StorySpec]]:
+    """
+    Yields (path, spec) ordered by path, filtered by the backend
+    (indexed SQL on the SQLite backend, only the needed shards on JSON).
+    """
+    yield from get_store().query(category=category, title_glob=title_glob, path_prefix=path_prefix, limit=limit, offset=offset)
+
+def count_by_category() -> Dict[str, int]:
+    return get_store().count_by_category()
+
+def export_metadata_json(path: Optional[str] = None) -> str:
     """
+    Dumps the registry in the single-file {"specs": {...}} format, whatever the backend.
+    Writes it to path if given; always returns the JSON text (stable, diff-friendly).
+    """
+    specs = get_store().load()
+    text = json.dumps({"specs": {p: s.model_dump() for p, s in specs.items()}}, indent=4, sort_keys=True)
+    if path:
+        atomic_write_text(path, text)
+    return text
+
+# The header ends at the first blank line (or the first line without a key).
+# Never read past HEADER_MAX_BYTES looking for it, however large the body is.
+HEADER_MAX_BYTES = 16 * 1024
+_HEADER_CHUNK = 512
+_HEADER_LINE = re.compile(r"^(title|description|category|version):(.*)$", re.IGNORECASE)
+
+def _iter_header_lines(f):
+    """Yields raw lines (terminator included) from the start of binary file f, up to HEADER_MAX_BYTES."""
+    buf = b""
+    consumed = 0
+    while True:
+        nl = buf.find(b"\n")
+        if nl != -1:
+            yield buf[:nl + 1]
+            buf = buf[nl + 1:]
+            continue
+        if consumed >= HEADER_MAX_BYTES:
+            return
+        chunk = f.read(_HEADER_CHUNK)
+        if not chunk:
+            if buf:
+                yield buf
+            return
+        consumed += len(chunk)
+        buf += chunk
+
+def read_header(filepath: str) -> Tuple[Dict[str, str], int]:
+    """
+    Reads only the header block at the top of a spec.
+    Returns (fields, body_offset): the header keys found (lowercased) and the
+    byte offset where the body starts.
+    """
+    fields = {}
+    offset = 0
+    with open(filepath, "rb") as f:
+        for raw in _iter_header_lines(f):
+            # A stray non-UTF-8 byte must not stop a scan; the offset stays in bytes either way
+            line = raw.decode("utf-8", errors="replace")
+            if not line.strip():
+                offset += len(raw)
+                break
+            if ":" not in line:
+                break
+            match = _HEADER_LINE.match(line)
+            if match:
+                fields.setdefault(match.group(1).lower(), match.group(2).strip())
+            offset += len(raw)
+    return fields, offset
+
+def _spec_from_fields(filepath: str, fields: Dict[str, str]) -> StorySpec:
     meta = {}
     # Defaults
     meta["title"] = os.path.basename(filepath).replace(".md","").replace("_", " ")
     meta["category"] = "Unknown"
     meta["version"] = "0.1"
     meta["description"] = ""
-    
+    meta.update(fields)
+    return StorySpec(**meta)
+
+def parse_header_from_file(filepath: str) -> StorySpec:
+    """
+    Reads the header block of a file to extract YAML-like headers.
+    Returns a StorySpec object with defaults for missing fields.
+    """
+    fields = {}
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-            head = lines[:20]
-        content = "".join(head)
-        for key in ["Title", "Description", "Category", "Version"]:
-            match = re.search(fr"^{key}:\s*(.*)$", content, re.MULTILINE | re.IGNORECASE)
-            if match:
-                meta[key.lower()] = match.group(1).strip()
+        fields, _ = read_header(filepath)
     except Exception as e:
         print(f"Error parsing {filepath}: {e}")
         
-    return StorySpec(**meta)
+    return _spec_from_fields(filepath, fields)
 
-def update_file_header(filepath, new_meta):
+def render_header(meta: dict) -> str:
+    """Builds the header block (keys + terminating blank line) written at the top of a spec."""
+    header_lines = []
+    for key in ["Title", "Description", "Category", "Version"]:
+         val = meta.get(key.lower(), "")
+         header_lines.append(f"{key}: {val}\n")
+    header_lines.append("\n")
+    return "".join(header_lines)
+
+def _split_spec(filepath: str, body_offset: int) -> Tuple[bytes, bytes]:
+    """(header, body) bytes of the spec at filepath, split at body_offset (see read_header)."""
+    with open(filepath, "rb") as f:
+        return f.read(body_offset), f.read()
+
+def _write_header(filepath: str, new_meta: dict, old_header: bytes, body: bytes) -> bool:
+    """update_file_header for a spec already split by _split_spec."""
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-        
-        body_start_idx = 0
-        for i, line in enumerate(lines):
-            if not line.strip(): 
-                body_start_idx = i + 1
-                break
-            if ":" not in line: 
-                body_start_idx = i
-                break
-        
-        body = lines[body_start_idx:]
-        header_lines = []
-        for key in ["Title", "Description", "Category", "Version"]:
-             val = new_meta.get(key.lower(), "")
-             header_lines.append(f"{key}: {val}\n")
-        header_lines.append("\n") 
-        
-        new_content = "".join(header_lines) + "".join(body)
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(new_content)
+        new_header = render_header(new_meta)
+        if old_header.decode("utf-8").replace("\r\n", "\n") == new_header:
+            return True
+        atomic_write_text(filepath, new_header + body.decode("utf-8").replace("\r\n", "\n"))
         return True
     except Exception as e:
         print(f"Failed to update file {filepath}: {e}")
         return False
 
-def scan_and_sync():
-    specs_dir = get_schemas_dir()
+def update_file_header(filepath, new_meta):
+    """
+    Rewrites the header of filepath from new_meta, keeping the body.
+    Does nothing if the header on disk is already identical; otherwise the
+    file is replaced atomically so an interrupted write never leaves half a spec.
+    """
+    try:
+        _, body_offset = read_header(filepath)
+        old_header, body = _split_spec(filepath, body_offset)
+    except Exception as e:
+        print(f"Failed to update file {filepath}: {e}")
+        return False
+    return _write_header(filepath, new_meta, old_header, body)
+
+def read_body(filepath: str) -> str:
+    """The text of the spec at filepath below its header."""
+    _, body_offset = read_header(filepath)
+    with open(filepath, "rb") as f:
+        f.seek(body_offset)
+        return f.read().decode("utf-8", errors="replace")
+
+def read_body_hash(filepath: str) -> str:
+    """body_digest of the spec at filepath (see fingerprints.body_digest)."""
+    _, body_offset = read_header(filepath)
+    with open(filepath, "rb") as f:
+        f.seek(body_offset)
+        return body_digest(f.read())
+
+def _sync_one(job: Tuple[str, str]) -> Tuple[dict, Optional[os.stat_result], str]:
+    """
+    Parses and heals a single spec. Module-level so it can run in a process pool.
+    Returns the header meta (category forced to the folder), the post-heal stat and the body hash.
+    """
+    filepath, category = job
+    # One header parse and one read of the file: the body read for the heal also gives the hash
+    try:
+        fields, body_offset = read_header(filepath)
+        old_header, body = _split_spec(filepath, body_offset)
+    except OSError as e:
+        print(f"Error parsing {filepath}: {e}")
+        fields, old_header, body = {}, None, b""
+    # Defaults filled in for missing fields
+    meta = _spec_from_fields(filepath, fields).model_dump()
+    # Override category based on folder, just in case file header is wrong/missing
+    # We trust the folder structure for category
+    meta["category"] = category
+    # Auto-Heal: only writes when the header actually differs
+    if old_header is not None:
+        _write_header(filepath, meta, old_header, body)
+    try:
+        return meta, os.stat(filepath), body_digest(body)
+    except OSError:
+        return meta, None, ""
+
+# Called with [(old_path, new_path), ...] whenever a sync recognises moved or renamed
+# specs, so caches keyed by path can re-key their entries instead of rebuilding them.
+_RENAME_LISTENERS = []
+
+def add_rename_listener(callback) -> None:
+    if callback not in _RENAME_LISTENERS:
+        _RENAME_LISTENERS.append(callback)
+
+def remove_rename_listener(callback) -> None:
+    if callback in _RENAME_LISTENERS:
+        _RENAME_LISTENERS.remove(callback)
+
+def match_renames(gone: Dict[str, str], added: Dict[str, str]) -> List[Tuple[str, str]]:
+    """
+    Pairs disappeared paths with new ones by body hash ({path: body_hash} each).
+    Only one-to-one matches count: a hash shared by several gone or added files
+    (or an empty body) stays a plain delete + add.
+    """
+    def unique(paths: Dict[str, str]) -> Dict[str, str]:
+        by_hash = {}
+        for path, digest in paths.items():
+            if digest:
+                by_hash.setdefault(digest, []).append(path)
+        return {digest: found[0] for digest, found in by_hash.items() if len(found) == 1}
+    
+    gone_by_hash = unique(gone)
+    return sorted((gone_by_hash[digest], path) for digest, path in unique(added).items() if digest in gone_by_hash)
+
+def _apply_sync(results, specs: Dict[str, StorySpec], fingerprints: FingerprintCache) -> Tuple[Dict[str, StorySpec], Dict[str, str]]:
+    """
+    Folds (rel_path, _sync_one result) pairs into fingerprints.
+    Returns the upserts (entries that differ from specs) and the body hashes of paths new to specs.
+    """
+    upserts = {}
+    added = {}
+    for rel_path, (meta, st, body_hash) in results:
+        if st is not None:
+            fingerprints.update(rel_path, st, header_digest(meta), body_hash)
+        else:
+            fingerprints.remove(rel_path)
+        if rel_path not in specs:
+            added[rel_path] = body_hash
+        file_spec = StorySpec(**meta)
+        if specs.get(rel_path) != file_spec:
+            upserts[rel_path] = file_spec
+    return upserts, added
+
+def _commit_sync(upserts: Dict[str, StorySpec], deletes: List[str], added: Dict[str, str],
+                 fingerprints: FingerprintCache, touched: Iterable[str], force: bool = False) -> List[Tuple[str, str]]:
+    """
+    One registry commit for a sync; deletes matching an added file by body hash are reported as renames.
+    The search, link and storyboard indexes are then refreshed for the touched paths (the files
+    re-read and the deletes, which include both sides of every rename); nothing is reloaded
+    or refreshed when no path was touched.
+    """
+    renames = match_renames({path: fingerprints.body_hash(path) for path in deletes}, added)
+    for path in deletes:
+        fingerprints.remove(path)
+    if upserts or deletes or force:
+        update_metadata(upserts, deletes)
+    fingerprints.save()
+    if renames:
+        for callback in list(_RENAME_LISTENERS):
+            try:
+                callback(renames)
+            except Exception as e:
+                print(f"Warning: Rename listener failed: {e}")
+    touched = sorted(set(touched))
+    if not touched:
+        return renames
+    # Imported here: the index modules are only needed when a sync changed something
+    from .search import refresh_search_index
+    from .links import refresh_link_index
+    from .storyboard import refresh_storyboard_index
+    specs = load_all_metadata().specs
+    refresh_search_index(specs, fingerprints.entries, touched, renames)
+    refresh_link_index(specs, fingerprints.entries, touched)
+    refresh_storyboard_index(specs, touched, renames)
+    return renames
+
+def register_written(written: Iterable[Tuple[str, StorySpec, os.stat_result, str]]) -> None:
+    """
+    Registers specs the caller has just written, as (rel_path, spec, stat, body_hash),
+    in one registry commit without reading them back: the fingerprints are taken
+    from the given stats, so the next scan skips these files.
+    """
+    fingerprints = FingerprintCache().load()
+    upserts, added = {}, {}
+    for rel_path, spec, st, body_hash in written:
+        fingerprints.update(rel_path, st, header_digest(spec.model_dump()), body_hash)
+        upserts[rel_path] = spec
+        added[rel_path] = body_hash
+    if upserts:
+        _commit_sync(upserts, [], added, fingerprints, touched=list(upserts))
+
+def scan_and_sync(workers: Optional[int] = None, use_processes: bool = False):
+    """
+    Brings _schemas.json in line with the .md files on disk.
+    Files whose stat matches the fingerprint cache (and whose registry entry
+    still matches the recorded header) are skipped without being opened.
+    A spec that vanished while a file with the same body appeared is a rename
+    (see add_rename_listener).
+    
+    Args:
+        workers: Parallel header parsers (defaults to config SCAN_WORKERS, 1 = serial).
+        use_processes: Use a process pool instead of threads (CPU-bound parsing).
+    """
     data = load_all_metadata() # StoryMetadata object
+    fingerprints = FingerprintCache().load()
+    if workers is None:
+        workers = get_scan_workers()
     
     on_disk_paths = set()
+    pending = [] # (rel_path, filepath, category) needing a parse
     
-    for root, dirs, files in os.walk(specs_dir):
-        if root == specs_dir: continue
-        category = os.path.basename(root)
-        for file in files:
-            if not file.endswith(".md"): continue
-            filepath = os.path.join(root, file)
-            rel_path = os.path.relpath(filepath, specs_dir).replace("\\", "/")
-            on_disk_paths.add(rel_path)
-            
-            # This returns a StorySpec object with defaults filled
-            file_spec = parse_header_from_file(filepath)
-            
-            # Override category based on folder, just in case file header is wrong/missing
-            # We trust the folder structure for category
-            file_spec.category = category
-            
-            # Check if we need to write back (Auto-Heal) - Naive check: if header was empty, we filled defaults
-            # A better way is to check the RAW headers again, but let's assume if we are creating a fresh Spec,
-            # we should update the file if the existing file lacks headers.
-            # For efficiency, update_file_header checks if content changes.
-            update_file_header(filepath, file_spec.model_dump())
-            
-            data.specs[rel_path] = file_spec
+    for entry in iter_spec_files(get_schemas_dir()):
+        rel_path = entry.rel_path
+        on_disk_paths.add(rel_path)
+        existing = data.specs.get(rel_path)
+        if existing is not None and existing.category == entry.category and fingerprints.matches(rel_path, entry.stat):
+            if header_digest(existing.model_dump()) == fingerprints.get(rel_path)["header_hash"]:
+                continue
+        pending.append((rel_path, entry.path, entry.category))
+
+    # Fan the I/O out, then merge in walk order so the result is deterministic
+    results = parallel_map(_sync_one, [(fp, cat) for _, fp, cat in pending], workers=workers, processes=use_processes)
+    upserts, added = _apply_sync(zip([rel_path for rel_path, _, _ in pending], results), data.specs, fingerprints)
+    data.specs.update(upserts)
 
     # Clean missing
-    existing_keys = list(data.specs.keys())
-    for key in existing_keys:
-        if key not in on_disk_paths:
-            del data.specs[key]
-            
-    save_all_metadata(data)
+    deletes = [key for key in data.specs if key not in on_disk_paths]
+    for key in deletes:
+        del data.specs[key]
+    
+    _commit_sync(upserts, deletes, added, fingerprints, touched=[rel_path for rel_path, _, _ in pending] + deletes,
+                 force=not get_store().exists())
+    # Drops entries of files that were never registered
+    fingerprints.prune(on_disk_paths)
+    fingerprints.save()
     return data
+
+def sync_paths(rel_paths: Iterable[str], workers: Optional[int] = None) -> Tuple[Dict[str, StorySpec], List[str]]:
+    """
+    Incremental scan_and_sync for just these spec paths (relative, "/"-separated):
+    each is re-read (and its header healed) if it exists, or dropped from the
+    registry if it doesn't. Files unchanged since their last scan are skipped.
+    All changes land in one update_metadata call; renames are detected as in scan_and_sync.
+    Returns (upserts, deletes) as applied.
+    """
+    specs = load_all_metadata().specs
+    fingerprints = FingerprintCache().load()
+    specs_dir = get_schemas_dir()
+    if workers is None:
+        workers = get_scan_workers()
+    
+    jobs = [] # (rel_path, (filepath, category))
+    deletes = []
+    for rel_path in sorted(set(rel_paths)):
+        filepath = os.path.join(specs_dir, *rel_path.split("/"))
+        if not os.path.isfile(filepath):
+            if rel_path in specs:
+                deletes.append(rel_path)
+            else:
+                fingerprints.remove(rel_path)
+            continue
+        category = os.path.basename(os.path.dirname(filepath))
+        existing = specs.get(rel_path)
+        if existing is not None and existing.category == category and fingerprints.matches(rel_path, os.stat(filepath)):
+            if header_digest(existing.model_dump()) == fingerprints.get(rel_path)["header_hash"]:
+                continue
+        jobs.append((rel_path, (filepath, category)))
+    
+    results = parallel_map(_sync_one, [job for _, job in jobs], workers=workers)
+    upserts, added = _apply_sync(zip([rel_path for rel_path, _ in jobs], results), specs, fingerprints)
+    _commit_sync(upserts, deletes, added, fingerprints, touched=[rel_path for rel_path, _ in jobs] + deletes)
+    return upserts, deletes
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from typing import Dict, Optional
 
 class StorySpec(BaseModel):
@@ -11,3 +11,8 @@ class StorySpec(BaseModel):
     
 class StoryMetadata(BaseModel):
     specs: Dict[str, StorySpec] = Field(default_factory=dict, description="Map of relative file paths to Spec data")
+
+    # Set by load_all_metadata: the registry generation and entries this copy was read from,
+    # so save_all_metadata can merge rather than overwrite a commit made in the meantime
+    _generation: Optional[int] = PrivateAttr(default=None)
+    _base: Optional[Dict[str, StorySpec]] = PrivateAttr(default=None)
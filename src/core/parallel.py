@@ -0,0 +1,22 @@
+from typing import Callable, Iterable, List, Optional
+
+def parallel_map(fn: Callable, items: Iterable, workers: Optional[int] = None, processes: bool = False) -> List:
+    """
+    Maps fn over items and returns the results in input order.
+    Runs inline when workers <= 1 so callers don't need a separate serial path.
+    With processes=True, fn and its arguments must be picklable (module-level function).
+    """
+    items = list(items)
+    if not workers or workers <= 1 or len(items) < 2:
+        return [fn(item) for item in items]
+    
+    workers = min(workers, len(items))
+    # Imported here: the process pool pulls in multiprocessing, which serial runs never need
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+    if processes:
+        # Batch items so per-task IPC overhead doesn't eat the gain
+        chunksize = max(1, len(items) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            return list(ex.map(fn, items, chunksize=chunksize))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(fn, items))
@@ -0,0 +1,211 @@
+import os
+import re
+import sqlite3
+from contextlib import closing
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from .config import get_schemas_dir
+from .models import StorySpec
+
+# bm25 weight of each indexed column: a word in the title counts as much as three in the body
+FIELD_WEIGHTS = {"title": 3.0, "description": 2.0, "body": 1.0}
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    category TEXT NOT NULL,
+    sig TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS fts USING fts5(title, description, body, tokenize='unicode61');
+"""
+
+def get_search_db():
+    return os.path.join(get_schemas_dir(), "_search.db")
+
+_FTS5 = None
+
+def fts5_available() -> bool:
+    """True if the sqlite3 module was built with FTS5 (nearly every CPython build is)."""
+    global _FTS5
+    if _FTS5 is None:
+        try:
+            with closing(sqlite3.connect(":memory:")) as conn:
+                conn.execute("CREATE VIRTUAL TABLE t USING fts5(x)")
+            _FTS5 = True
+        except sqlite3.OperationalError:
+            _FTS5 = False
+    return _FTS5
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens, split the way the index splits them."""
+    return _TOKEN.findall(text.lower())
+
+def build_match_query(query: str) -> str:
+    """
+    Turns free text into an FTS5 query: every word must match (quoted, so
+    user input can never be a syntax error); a trailing "*" makes a word a prefix.
+    """
+    terms = []
+    for raw in query.split():
+        tokens = tokenize(raw)
+        for i, token in enumerate(tokens):
+            term = '"' + token.replace('"', '""') + '"'
+            if raw.endswith("*") and i == len(tokens) - 1:
+                term += "*"
+            terms.append(term)
+    return " ".join(terms)
+
+class SearchHit(NamedTuple):
+    path: str
+    title: str
+    category: str
+    score: float
+    snippet: str
+
+def _doc_sig(spec: StorySpec, fingerprint: Optional[dict]) -> Optional[str]:
+    """
+    What the indexed text of a doc depends on: its title, description and body.
+    None (always reindex) when the file has no fingerprint yet.
+    """
+    if not fingerprint:
+        return None
+    body = fingerprint.get("body_hash") or f"{fingerprint['mtime_ns']}-{fingerprint['size']}"
+    return f"{body}\x1f{spec.title}\x1f{spec.description or ''}"
+
+class SearchIndex:
+    """
+    Inverted full-text index over spec titles, descriptions and bodies, kept in
+    a stdlib sqlite3 database next to the registry (_search.db), using SQLite's
+    FTS5 (inverted index + bm25 ranking).
+
+    Each doc keeps a signature (body hash + title + description) so refresh()
+    only re-reads the specs that changed; moved specs are re-keyed, not re-read.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, root: Optional[str] = None):
+        self.db_path = db_path or get_search_db()
+        self.root = root or os.path.dirname(self.db_path)
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def exists(self) -> bool:
+        return os.path.exists(self.db_path)
+
+    def _index_doc(self, conn: sqlite3.Connection, doc_id: Optional[int], path: str, spec: StorySpec, sig: Optional[str]) -> None:
+        from .metadata import read_body
+        try:
+            body = read_body(os.path.join(self.root, *path.split("/")))
+        except OSError:
+            body = ""
+        if doc_id is None:
+            doc_id = conn.execute("INSERT INTO docs (path, category, sig) VALUES (?, ?, ?)", (path, spec.category, sig)).lastrowid
+        else:
+            conn.execute("DELETE FROM fts WHERE rowid = ?", (doc_id,))
+            conn.execute("UPDATE docs SET category = ?, sig = ? WHERE id = ?", (spec.category, sig, doc_id))
+        conn.execute("INSERT INTO fts (rowid, title, description, body) VALUES (?, ?, ?, ?)",
+                     (doc_id, spec.title, spec.description or "", body))
+
+    def _remove_doc(self, conn: sqlite3.Connection, doc_id: int) -> None:
+        conn.execute("DELETE FROM fts WHERE rowid = ?", (doc_id,))
+        conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+
+    def rename(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        """Re-keys the docs of moved specs, so they are not re-read from scratch."""
+        with closing(self.connect()) as conn, conn:
+            for old_path, new_path in pairs:
+                row = conn.execute("SELECT id FROM docs WHERE path = ?", (new_path,)).fetchone()
+                if row:
+                    self._remove_doc(conn, row[0])
+                conn.execute("UPDATE docs SET path = ? WHERE path = ?", (new_path, old_path))
+
+    def refresh(self, specs: Dict[str, StorySpec], fingerprints: Dict[str, dict], paths: Optional[Iterable[str]] = None) -> int:
+        """
+        Brings the index in line with the registry (specs) for the given paths,
+        or for every path when paths is None. Returns the number of docs (re)indexed.
+        fingerprints maps path -> fingerprint entry (see FingerprintCache.entries).
+        """
+        indexed = 0
+        with closing(self.connect()) as conn, conn:
+            if paths is None:
+                known = {path: (doc_id, category, sig) for doc_id, path, category, sig in conn.execute("SELECT id, path, category, sig FROM docs")}
+                paths = set(known) | set(specs)
+            else:
+                paths = set(paths)
+                known = {}
+                for path in paths:
+                    row = conn.execute("SELECT id, category, sig FROM docs WHERE path = ?", (path,)).fetchone()
+                    if row:
+                        known[path] = row
+            for path in sorted(paths):
+                spec = specs.get(path)
+                doc_id, category, old_sig = known.get(path, (None, None, None))
+                if spec is None:
+                    if doc_id is not None:
+                        self._remove_doc(conn, doc_id)
+                    continue
+                sig = _doc_sig(spec, fingerprints.get(path))
+                if sig is not None and sig == old_sig:
+                    # Text unchanged; only the category can have moved
+                    if category != spec.category:
+                        conn.execute("UPDATE docs SET category = ? WHERE id = ?", (spec.category, doc_id))
+                    continue
+                self._index_doc(conn, doc_id, path, spec, sig)
+                indexed += 1
+        return indexed
+
+    def search(self, query: str, limit: Optional[int] = 20, category: Optional[str] = None) -> List[SearchHit]:
+        """
+        Ranked (bm25) search. Every query word must match; a word ending in "*" matches as a prefix.
+        Higher scores are better (bm25, sign flipped).
+        """
+        match = build_match_query(query)
+        if not match:
+            return []
+        weights = ", ".join(str(FIELD_WEIGHTS[field]) for field in ("title", "description", "body"))
+        sql = (f"SELECT d.path, f.title, d.category, bm25(fts, {weights}) AS rank, snippet(fts, 2, '', '', '...', 12) "
+               "FROM fts f JOIN docs d ON d.id = f.rowid WHERE fts MATCH ?")
+        params = [match]
+        if category is not None:
+            sql += " AND d.category = ?"
+            params.append(category)
+        sql += " ORDER BY rank, d.path LIMIT ?"
+        params.append(-1 if limit is None else limit)
+        with closing(self.connect()) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [SearchHit(path, title, cat, -rank, " ".join(snippet.split())) for path, title, cat, rank, snippet in rows]
+
+def refresh_search_index(specs: Dict[str, StorySpec], fingerprints: Dict[str, dict],
+                         paths: Optional[Iterable[str]] = None, renames: Iterable[Tuple[str, str]] = ()) -> None:
+    """Keeps _search.db current after a sync; a broken index only warns (search rebuilds it)."""
+    if not fts5_available():
+        return
+    try:
+        index = SearchIndex()
+        renames = list(renames)
+        if renames:
+            index.rename(renames)
+        index.refresh(specs, fingerprints, paths)
+    except Exception as e:
+        print(f"Warning: Failed to update search index: {e}")
+
+def search_specs(query: str, limit: Optional[int] = 20, category: Optional[str] = None) -> List[SearchHit]:
+    """
+    Searches the index as it is: syncs (and the watcher) keep it current, a query
+    only reads it. It is built from the registry if it has never been built.
+    Raises RuntimeError if SQLite has no FTS5.
+    """
+    if not fts5_available():
+        raise RuntimeError("Full-text search needs an SQLite build with FTS5.")
+    index = SearchIndex()
+    if not index.exists():
+        from .metadata import load_all_metadata
+        from .fingerprints import FingerprintCache
+        index.refresh(load_all_metadata().specs, FingerprintCache().load().entries)
+    return index.search(query, limit=limit, category=category)
@@ -0,0 +1,145 @@
+import os
+import sqlite3
+from contextlib import closing
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from .models import StorySpec
+from .store import RegistryConflict
+
+FIELDS = ["title", "category", "version", "description"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS specs (
+    path TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    category TEXT NOT NULL,
+    version TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_specs_category ON specs(category, path);
+CREATE INDEX IF NOT EXISTS idx_specs_title ON specs(title);
+CREATE INDEX IF NOT EXISTS idx_specs_version ON specs(version);
+CREATE TABLE IF NOT EXISTS registry_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+def _row(path: str, spec: StorySpec) -> tuple:
+    return (path, spec.title, spec.category, spec.version, spec.description or "")
+
+class SqliteStore:
+    """
+    Metadata registry kept in a stdlib sqlite3 database (WAL mode).
+    Same load/save_all/apply interface as JsonShardStore, plus indexed queries
+    so callers can filter and count without materialising the whole registry.
+    Writers serialise on BEGIN IMMEDIATE and bump the generation counter in
+    registry_meta; WAL readers never wait for them.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def exists(self) -> bool:
+        return os.path.exists(self.db_path)
+
+    def state_files(self):
+        # Committed transactions land in the WAL until a checkpoint moves them to the db
+        return [self.db_path, self.db_path + "-wal"]
+
+    def _specs(self, rows) -> Iterator[Tuple[str, StorySpec]]:
+        for path, title, category, version, description in rows:
+            yield path, StorySpec(title=title, category=category, version=version, description=description)
+
+    @staticmethod
+    def _generation(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT value FROM registry_meta WHERE key = 'generation'").fetchone()
+        return row[0] if row else 0
+
+    def generation(self) -> int:
+        with closing(self.connect()) as conn:
+            return self._generation(conn)
+
+    def snapshot(self, categories: Optional[Iterable[str]] = None) -> Tuple[int, Dict[str, StorySpec]]:
+        """Entries and the generation they were read at, from one read transaction."""
+        sql = "SELECT path, title, category, version, description FROM specs"
+        params = []
+        if categories is not None:
+            params = list(categories)
+            sql += f" WHERE category IN ({','.join('?' * len(params))})"
+        with closing(self.connect()) as conn:
+            conn.execute("BEGIN")
+            try:
+                return self._generation(conn), dict(self._specs(conn.execute(sql, params)))
+            finally:
+                conn.rollback()
+
+    def load(self, categories: Optional[Iterable[str]] = None) -> Dict[str, StorySpec]:
+        return self.snapshot(categories)[1]
+
+    def get(self, path: str) -> Optional[StorySpec]:
+        """Point lookup by relative path."""
+        with closing(self.connect()) as conn:
+            rows = conn.execute("SELECT path, title, category, version, description FROM specs WHERE path = ?", (path,)).fetchall()
+        return next((spec for _, spec in self._specs(rows)), None)
+
+    def query(self, category: Optional[str] = None, title_glob: Optional[str] = None, path_prefix: Optional[str] = None,
+              limit: Optional[int] = None, offset: int = 0) -> Iterator[Tuple[str, StorySpec]]:
+        """Yields (path, spec) ordered by path. title_glob uses GLOB (case-sensitive) semantics."""
+        where, params = [], []
+        if category is not None:
+            where.append("category = ?")
+            params.append(category)
+        if title_glob:
+            where.append("title GLOB ?")
+            params.append(title_glob)
+        if path_prefix:
+            # Range scan on the primary key
+            where.append("path >= ? AND path < ?")
+            params += [path_prefix, path_prefix + "\U0010ffff"]
+        sql = "SELECT path, title, category, version, description FROM specs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY path LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset]
+        with closing(self.connect()) as conn:
+            yield from self._specs(conn.execute(sql, params))
+
+    def count_by_category(self) -> Dict[str, int]:
+        with closing(self.connect()) as conn:
+            return dict(conn.execute("SELECT category, COUNT(*) FROM specs GROUP BY category"))
+
+    def _begin_write(self, conn: sqlite3.Connection, expected_generation: Optional[int]) -> int:
+        # Takes the write lock up front so the generation check and the write are atomic
+        conn.execute("BEGIN IMMEDIATE")
+        generation = self._generation(conn)
+        if expected_generation is not None and expected_generation != generation:
+            raise RegistryConflict(expected_generation, generation)
+        generation += 1
+        conn.execute("INSERT OR REPLACE INTO registry_meta VALUES ('generation', ?)", (generation,))
+        return generation
+
+    def save_all(self, specs: Dict[str, StorySpec], expected_generation: Optional[int] = None) -> int:
+        with closing(self.connect()) as conn, conn:
+            generation = self._begin_write(conn, expected_generation)
+            conn.execute("DELETE FROM specs")
+            conn.executemany("INSERT INTO specs VALUES (?, ?, ?, ?, ?)", (_row(p, s) for p, s in specs.items()))
+        return generation
+
+    def apply(self, upserts: Optional[Dict[str, StorySpec]] = None, deletes: Iterable[str] = (),
+              expected_generation: Optional[int] = None) -> int:
+        deletes = list(deletes)
+        if not upserts and not deletes and expected_generation is None:
+            return self.generation()
+        with closing(self.connect()) as conn, conn:
+            generation = self._begin_write(conn, expected_generation)
+            conn.executemany("DELETE FROM specs WHERE path = ?", ((p,) for p in deletes))
+            conn.executemany("INSERT OR REPLACE INTO specs VALUES (?, ?, ?, ?, ?)", (_row(p, s) for p, s in (upserts or {}).items()))
+        return generation
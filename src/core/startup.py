@@ -0,0 +1,105 @@
+import sys
+import time
+from typing import List, NamedTuple, Optional, TextIO
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_ms: float # Executing the module's own code
+    cumulative_ms: float # Including the modules it imported
+    depth: int
+
+class _TimedLoader:
+    """Wraps a module loader so exec_module is timed; everything else is passed through."""
+
+    def __init__(self, loader, profiler: "ImportProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        # The span opens here, so extension modules (initialized in create_module) are counted too
+        self._profiler._enter()
+        try:
+            create = getattr(self._loader, "create_module", None)
+            return create(spec) if create else None
+        except BaseException:
+            self._profiler._leave(spec.name)
+            raise
+
+    def exec_module(self, module):
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave(module.__name__)
+
+class ImportProfiler:
+    """
+    Per-module import times for `--startup-profile`, gathered by a finder at the
+    front of sys.meta_path that wraps the loader of every module imported after
+    install() (the same self/cumulative split as `python -X importtime`, but it
+    works in the frozen build and can be summarized by the CLI itself).
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings: List[ImportTiming] = []
+        self._stack: List[list] = [] # [start, time spent in nested imports]
+        self._finding = False
+
+    def install(self) -> "ImportProfiler":
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path=None, target=None):
+        if self._finding:
+            return None
+        # Ask the finders behind this one, then time whatever they found
+        self._finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self)
+        return spec
+
+    def _enter(self) -> None:
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def _leave(self, name: str) -> None:
+        start, nested = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        if self._stack:
+            self._stack[-1][1] += elapsed
+        self.timings.append(ImportTiming(name, (elapsed - nested) * 1000, elapsed * 1000, len(self._stack)))
+
+    def total_ms(self) -> float:
+        """Time spent importing, top-level imports only (nested ones are inside them)."""
+        return sum(t.cumulative_ms for t in self.timings if t.depth == 0)
+
+    def report(self, out: Optional[TextIO] = None, limit: Optional[int] = 30) -> None:
+        """Prints the slowest imports (by cumulative time) and the totals, to stderr by default."""
+        out = out or sys.stderr
+        elapsed = (time.perf_counter() - self.started) * 1000
+        ranked = sorted(self.timings, key=lambda t: t.cumulative_ms, reverse=True)
+        print(f"Startup profile: {len(self.timings)} modules imported in {self.total_ms():.1f} ms "
+              f"({elapsed:.1f} ms since start)", file=out)
+        print(f"{'cumulative ms':>14} {'self ms':>9}  module", file=out)
+        for timing in ranked[:limit]:
+            print(f"{timing.cumulative_ms:14.2f} {timing.self_ms:9.2f}  {timing.module}", file=out)
+        if limit is not None and len(ranked) > limit:
+            print(f"{'':>14} {'':>9}  ... {len(ranked) - limit} more", file=out)
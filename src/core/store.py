@@ -0,0 +1,472 @@
+import os
+import json
+import heapq
+import hashlib
+import threading
+from fnmatch import fnmatchcase
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from pydantic import BaseModel
+from .fileio import atomic_write_text
+from .locking import file_lock
+from .models import StorySpec
+
+try:
+    # Optional faster JSON decoder
+    import orjson
+except ImportError:
+    orjson = None
+
+SHARD_FILENAME = "_metadata.json"
+MANIFEST_FORMAT = 2
+
+# Once the change journal grows past this, it is folded into the shards in the background
+JOURNAL_COMPACT_BYTES = 256 * 1024
+
+# Guards the shards + manifest (snapshot) and the journal files within this process
+_SNAPSHOT_LOCK = threading.RLock()
+_JOURNAL_LOCK = threading.RLock()
+
+class RegistryConflict(Exception):
+    """A commit expected the registry at a generation it has since moved past."""
+
+    def __init__(self, expected: int, current: int):
+        super().__init__(f"Registry is at generation {current}, expected {expected}")
+        self.expected = expected
+        self.current = current
+
+def shard_of(rel_path: str) -> str:
+    """The shard a spec lives in: its top-level (category) folder, "" for root files."""
+    folder, sep, _ = rel_path.partition("/")
+    return folder if sep else ""
+
+def _spec_dict(spec: StorySpec) -> dict:
+    try:
+        return spec.model_dump()
+    except AttributeError:
+        # Fallback for Pydantic v1 if installed
+        return spec.dict()
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _loads(data: bytes):
+    return orjson.loads(data) if orjson else json.loads(data)
+
+class _ShardFile(BaseModel):
+    files: Dict[str, StorySpec] = {}
+
+# Pydantic v2 parses + validates a whole shard in pydantic-core, which measured faster
+# than any skip-validation path built in Python, so trusted shards only take a
+# shortcut (construct without validation) on pydantic v1.
+_CORE_JSON = hasattr(_ShardFile, "model_validate_json")
+
+def _validate_shard(data: bytes) -> Dict[str, StorySpec]:
+    if _CORE_JSON:
+        return _ShardFile.model_validate_json(data).files
+    return {name: StorySpec(**spec) for name, spec in _loads(data).get("files", {}).items()}
+
+def _replay(specs: Dict[str, StorySpec], records: List[dict]) -> None:
+    for rec in records:
+        if rec["op"] == "upsert":
+            specs[rec["path"]] = StorySpec(**rec["spec"])
+        else:
+            specs.pop(rec["path"], None)
+
+class JsonShardStore:
+    """
+    Metadata registry sharded per category folder.
+
+    Each folder keeps its entries in <folder>/_metadata.json ({"files": {name: spec}}),
+    and the root manifest (_schemas.json) only lists the shards with their entry
+    count, per-category counts and a digest of their content. Reads can load just
+    the shards they need.
+
+    Individual changes (apply) are appended to _schemas.journal as upsert/delete
+    records and replayed on load; once the journal passes JOURNAL_COMPACT_BYTES
+    it is rotated to _schemas.journal.compacting and folded into the shards on a
+    background thread. save_all writes a fresh snapshot and drops the journal.
+
+    A legacy monolithic _schemas.json ({"specs": {...}}) is read as-is and
+    migrated to shards on the next write.
+
+    Every commit (save_all / apply) bumps a generation counter, kept in the
+    manifest and in each journal record. Writers (and compaction) take a
+    cross-process lock on _schemas.lock and may pass the generation they read
+    to detect a concurrent commit (RegistryConflict). Readers never lock: files
+    are replaced atomically and a load retries if the manifest moved under it.
+    """
+
+    def __init__(self, root: str, manifest_path: Optional[str] = None):
+        self.root = root
+        self.manifest_path = manifest_path or os.path.join(root, "_schemas.json")
+        self.journal_path = os.path.splitext(self.manifest_path)[0] + ".journal"
+        self.compacting_path = self.journal_path + ".compacting"
+        self.lock_path = os.path.splitext(self.manifest_path)[0] + ".lock"
+
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    def shard_path(self, shard: str) -> str:
+        return os.path.join(self.root, shard, SHARD_FILENAME) if shard else os.path.join(self.root, SHARD_FILENAME)
+
+    def read_manifest(self) -> dict:
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            if "specs" in raw:
+                return raw # Legacy monolithic registry
+            raw.setdefault("shards", {})
+            return raw
+        return {"format": MANIFEST_FORMAT, "shards": {}}
+
+    def state_files(self) -> List[str]:
+        """Every file the registry's content lives in (for callers caching a load by stat)."""
+        paths = [self.manifest_path, self.journal_path, self.compacting_path]
+        try:
+            manifest = self.read_manifest()
+        except (OSError, ValueError):
+            return paths
+        return paths + [self.shard_path(shard) for shard in sorted(manifest.get("shards", {}))]
+
+    @staticmethod
+    def _generation_of(manifest: dict, records: List[dict]) -> int:
+        return max([manifest.get("generation", 0)] + [rec.get("gen", 0) for rec in records])
+
+    def generation(self) -> int:
+        """The number of commits made to the registry (0 for a new or legacy one)."""
+        return self._generation_of(self.read_manifest(), self.journal_records())
+
+    def _check(self, expected: Optional[int], current: int) -> None:
+        if expected is not None and expected != current:
+            raise RegistryConflict(expected, current)
+
+    def _manifest_stamp(self):
+        try:
+            st = os.stat(self.manifest_path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _read_shard(self, shard: str, digest: Optional[str] = None) -> Dict[str, StorySpec]:
+        """
+        Reads one shard. A shard whose bytes still match the digest recorded in the
+        manifest was written by us and is trusted; one edited by hand is always
+        fully validated.
+        """
+        prefix = f"{shard}/" if shard else ""
+        try:
+            with open(self.shard_path(shard), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return {}
+        if not _CORE_JSON and digest is not None and _digest(data) == digest:
+            files = {name: StorySpec.construct(**spec) for name, spec in _loads(data).get("files", {}).items()}
+        else:
+            files = _validate_shard(data)
+        return {prefix + name: spec for name, spec in files.items()}
+
+    # --- Journal ---
+
+    def _read_journal_file(self, path: str) -> List[dict]:
+        records = []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # Torn line from an interrupted append: the records after it still count
+                        continue
+        except FileNotFoundError:
+            pass
+        return records
+
+    def journal_records(self) -> List[dict]:
+        """Pending changes not yet folded into the shards, oldest first."""
+        return self._read_journal_file(self.compacting_path) + self._read_journal_file(self.journal_path)
+
+    @staticmethod
+    def _drop_torn_tail(f) -> None:
+        """Truncates binary file f after its last newline (an interrupted append left the rest)."""
+        size = f.seek(0, os.SEEK_END)
+        if not size:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        f.seek(0)
+        f.truncate(f.read().rfind(b"\n") + 1)
+
+    def _append(self, records: List[dict]) -> int:
+        """Appends records in one write; returns the journal size afterwards."""
+        text = "".join(json.dumps(rec, separators=(",", ":"), sort_keys=True) + "\n" for rec in records)
+        # Callers hold the store lock, so no other process is appending meanwhile
+        with _JOURNAL_LOCK:
+            with open(self.journal_path, "a+b") as f:
+                # Otherwise the first new record would be glued onto the torn line
+                self._drop_torn_tail(f)
+                f.write(text.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+                return f.tell()
+
+    def compact(self, background: bool = False) -> Optional[threading.Thread]:
+        """
+        Folds the journal into the shards. The active journal is rotated first,
+        so appends keep going to a fresh file while the fold runs.
+        """
+        # Rotating under the writers' lock: no other process is halfway through an append
+        with file_lock(self.lock_path), _JOURNAL_LOCK:
+            # A leftover .compacting (interrupted fold) is folded before rotating again
+            if not os.path.exists(self.compacting_path):
+                if not os.path.exists(self.journal_path):
+                    return None
+                os.replace(self.journal_path, self.compacting_path)
+        if background:
+            # Not a daemon: a short-lived CLI process waits for the fold instead of killing it
+            thread = threading.Thread(target=self._fold, name="storylord-compact")
+            thread.start()
+            return thread
+        self._fold()
+        return None
+
+    def _fold(self) -> None:
+        with file_lock(self.lock_path), _SNAPSHOT_LOCK:
+            records = self._read_journal_file(self.compacting_path)
+            manifest = self.read_manifest()
+            generation = self._generation_of(manifest, records)
+            if "specs" in manifest:
+                specs = self._load_snapshot(None, manifest)
+                _replay(specs, records)
+                self._write_all(manifest, specs, generation)
+            else:
+                touched = {shard_of(rec["path"]) for rec in records}
+                # A shard file the manifest doesn't know about is a leftover, not data
+                shards = {shard: self._read_shard(shard, manifest["shards"][shard].get("digest")) if shard in manifest["shards"] else {}
+                          for shard in touched}
+                for rec in records:
+                    shard = shards[shard_of(rec["path"])]
+                    _replay(shard, [rec])
+                self._write(manifest, shards, generation)
+            # Records are idempotent, so readers replaying them again meanwhile is harmless
+            try:
+                os.remove(self.compacting_path)
+            except FileNotFoundError:
+                pass
+
+    # --- Reads ---
+
+    def _load_snapshot(self, categories: Optional[set], manifest: dict) -> Dict[str, StorySpec]:
+        if "specs" in manifest:
+            return {path: StorySpec(**spec) for path, spec in manifest["specs"].items()}
+        specs = {}
+        for shard, info in sorted(manifest["shards"].items()):
+            if categories is None or categories.intersection(info.get("categories", [shard])):
+                specs.update(self._read_shard(shard, info.get("digest")))
+        return specs
+
+    def snapshot(self, categories: Optional[Iterable[str]] = None) -> Tuple[int, Dict[str, StorySpec]]:
+        """Like load, but also returns the generation the entries were read at."""
+        if categories is not None:
+            categories = set(categories)
+        for _ in range(3):
+            # Retry if a writer swapped the manifest while we were reading
+            stamp = self._manifest_stamp()
+            manifest = self.read_manifest()
+            specs = self._load_snapshot(categories, manifest)
+            records = self.journal_records()
+            _replay(specs, records)
+            if self._manifest_stamp() == stamp:
+                break
+        if categories is not None:
+            specs = {path: spec for path, spec in specs.items() if spec.category in categories}
+        return self._generation_of(manifest, records), specs
+
+    def load(self, categories: Optional[Iterable[str]] = None) -> Dict[str, StorySpec]:
+        """Loads every shard, or only the entries of the given categories (reading only shards that hold them)."""
+        return self.snapshot(categories)[1]
+
+    def iter_specs(self, categories: Optional[Iterable[str]] = None, shard: Optional[str] = None) -> Iterator[Tuple[str, StorySpec]]:
+        """
+        Yields (path, spec) in path order, holding one shard in memory at a time
+        (shards are folders, so walking them in name order walks the paths in order).
+        Only the shards that can hold the categories (or only `shard`) are read.
+        Each shard is consistent with the journal as read when iteration started.
+        """
+        if categories is not None:
+            categories = set(categories)
+        manifest = self.read_manifest()
+        records = self.journal_records()
+        if "specs" in manifest:
+            specs = self._load_snapshot(None, manifest)
+            _replay(specs, records)
+            for path in sorted(specs):
+                if (categories is None or specs[path].category in categories) and (shard is None or shard_of(path) == shard):
+                    yield path, specs[path]
+            return
+
+        pending = {} # shard -> its journal records
+        for rec in records:
+            pending.setdefault(shard_of(rec["path"]), []).append(rec)
+        shards = manifest["shards"]
+
+        def holds(name: str) -> bool:
+            held = set(shards[name].get("categories", [name])) if name in shards else set()
+            held.update(rec["spec"]["category"] for rec in pending.get(name, ()) if rec["op"] == "upsert")
+            return bool(categories.intersection(held))
+
+        names = [
+            name for name in set(shards) | set(pending)
+            if (shard is None or name == shard) and (categories is None or holds(name))
+        ]
+
+        def read(name: str) -> Iterator[Tuple[str, StorySpec]]:
+            specs = self._read_shard(name, shards[name].get("digest")) if name in shards else {}
+            _replay(specs, pending.get(name, []))
+            for path in sorted(specs):
+                if categories is None or specs[path].category in categories:
+                    yield path, specs[path]
+
+        # "Lore/..." sorts by "Lore/", not "Lore" (e.g. "Lore-old/" comes first)
+        folders = (item for name in sorted((n for n in names if n), key=lambda n: n + "/") for item in read(name))
+        if "" in names:
+            # Root files interleave with the folders
+            yield from heapq.merge(read(""), folders, key=lambda item: item[0])
+        else:
+            yield from folders
+
+    def query(self, category: Optional[str] = None, title_glob: Optional[str] = None, path_prefix: Optional[str] = None,
+              limit: Optional[int] = None, offset: int = 0) -> Iterator[Tuple[str, StorySpec]]:
+        """Yields (path, spec) ordered by path; same filters as SqliteStore.query. Streams shard by shard."""
+        shard = shard_of(path_prefix) if path_prefix and "/" in path_prefix else None
+        matches = (
+            (path, spec) for path, spec in self.iter_specs(None if category is None else [category], shard)
+            if (not title_glob or fnmatchcase(spec.title, title_glob))
+            and (not path_prefix or path.startswith(path_prefix))
+        )
+        yield from islice(matches, offset, None if limit is None else offset + limit)
+
+    def count_by_category(self) -> Dict[str, int]:
+        """
+        Answered from the manifest; only shards with pending journal records are read.
+        """
+        manifest = self.read_manifest()
+        records = self.journal_records()
+        counts = {}
+        def add(specs):
+            for spec in specs.values():
+                counts[spec.category] = counts.get(spec.category, 0) + 1
+
+        if "specs" in manifest:
+            specs = self._load_snapshot(None, manifest)
+            _replay(specs, records)
+            add(specs)
+            return counts
+
+        touched = {shard_of(rec["path"]) for rec in records}
+        for shard, info in manifest["shards"].items():
+            if shard in touched:
+                continue
+            for cat, n in info.get("categories", {}).items():
+                counts[cat] = counts.get(cat, 0) + n
+        specs = {}
+        for shard in touched:
+            if shard in manifest["shards"]:
+                specs.update(self._read_shard(shard, manifest["shards"][shard].get("digest")))
+        _replay(specs, records)
+        add(specs)
+        return counts
+
+    # --- Writes ---
+
+    def _write(self, manifest: dict, shards: Dict[str, Dict[str, StorySpec]], generation: Optional[int] = None) -> None:
+        """Writes the given shards (empty ones are removed), then the manifest (stamped with generation if given)."""
+        manifest_changed = "specs" in manifest or not os.path.exists(self.manifest_path)
+        if "specs" in manifest:
+            manifest = {"format": MANIFEST_FORMAT, "shards": {}}
+        if generation is not None and manifest.get("generation", 0) != generation:
+            manifest["generation"] = generation
+            manifest_changed = True
+        entries = manifest["shards"]
+
+        for shard, specs in shards.items():
+            path = self.shard_path(shard)
+            if not specs:
+                if entries.pop(shard, None) is not None:
+                    manifest_changed = True
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            prefix_len = len(shard) + 1 if shard else 0
+            text = json.dumps({"files": {p[prefix_len:]: _spec_dict(s) for p, s in specs.items()}}, indent=4, sort_keys=True)
+            data = text.encode("utf-8")
+            categories = {}
+            for spec in specs.values():
+                categories[spec.category] = categories.get(spec.category, 0) + 1
+            info = {"count": len(specs), "categories": categories, "digest": _digest(data)}
+            if entries.get(shard) == info and os.path.exists(path):
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Exact bytes, so the digest also holds on Windows
+            atomic_write_text(path, text, newline="\n")
+            entries[shard] = info
+            manifest_changed = True
+
+        if manifest_changed:
+            manifest["format"] = MANIFEST_FORMAT
+            atomic_write_text(self.manifest_path, json.dumps(manifest, indent=4, sort_keys=True))
+
+    def _write_all(self, manifest: dict, specs: Dict[str, StorySpec], generation: Optional[int] = None) -> None:
+        shards = {shard: {} for shard in manifest.get("shards", {})}
+        for path, spec in specs.items():
+            shards.setdefault(shard_of(path), {})[path] = spec
+        self._write(manifest, shards, generation)
+
+    def save_all(self, specs: Dict[str, StorySpec], expected_generation: Optional[int] = None) -> int:
+        """
+        Replaces the whole registry with specs (a fresh snapshot; pending journal records are dropped).
+        Raises RegistryConflict if expected_generation is given and another commit happened since.
+        Returns the new generation.
+        """
+        with file_lock(self.lock_path), _SNAPSHOT_LOCK, _JOURNAL_LOCK:
+            manifest = self.read_manifest()
+            generation = self._generation_of(manifest, self.journal_records())
+            self._check(expected_generation, generation)
+            generation += 1
+            self._write_all(manifest, specs, generation)
+            for path in (self.compacting_path, self.journal_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        return generation
+
+    def apply(self, upserts: Optional[Dict[str, StorySpec]] = None, deletes: Iterable[str] = (),
+              expected_generation: Optional[int] = None) -> int:
+        """
+        Records individual upserts/deletes as one journal append (O(1) in registry size).
+        Triggers a background compaction once the journal passes JOURNAL_COMPACT_BYTES.
+        Raises RegistryConflict if expected_generation is given and another commit happened since.
+        Returns the new generation.
+        """
+        records = [{"op": "delete", "path": path} for path in deletes]
+        records += [{"op": "upsert", "path": path, "spec": _spec_dict(spec)} for path, spec in (upserts or {}).items()]
+        with file_lock(self.lock_path):
+            manifest = self.read_manifest()
+            generation = self._generation_of(manifest, self.journal_records())
+            self._check(expected_generation, generation)
+            if not self.exists():
+                # No snapshot yet: start one so readers (and exists()) see a registry
+                with _SNAPSHOT_LOCK:
+                    self._write(manifest, {}, generation)
+            if not records:
+                return generation
+            generation += 1
+            for rec in records:
+                rec["gen"] = generation
+            size = self._append(records)
+            if "specs" in manifest:
+                # Legacy monolithic registry: migrate to shards right away
+                self.compact()
+        if "specs" not in manifest and size > JOURNAL_COMPACT_BYTES:
+            self.compact(background=True)
+        return generation
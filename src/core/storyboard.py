@@ -0,0 +1,276 @@
+import os
+import sqlite3
+from contextlib import closing
+from typing import Dict, Iterable, List, Optional, Tuple
+from .config import get_schemas_dir
+from .models import StorySpec
+
+STORYBOARD_CATEGORY = "Storyboard"
+
+# Sequence keys are strings compared byte-wise (the digits are in ASCII order):
+# an integer part whose head letter encodes its length ("a0", "a1", ..., "az", "b00", ...)
+# followed by an optional fraction. A key can always be made between any two others,
+# so placing a beat never renumbers its neighbours.
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_SMALLEST_INTEGER = "A" + DIGITS[0] * 26
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS beats (
+    path TEXT PRIMARY KEY,
+    seq TEXT NOT NULL UNIQUE
+);
+"""
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """A fraction strictly between a and b ("" is 0, None is 1); fractions never end in "0"."""
+    if b is not None:
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else DIGITS[0]) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    if b is not None and len(b) > 1:
+        return b[:1]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid sequence key head: {head!r}")
+
+def _split(key: str) -> Tuple[str, str]:
+    length = _integer_length(key[0])
+    if len(key) < length or key[length:].endswith(DIGITS[0]) or key == _SMALLEST_INTEGER:
+        raise ValueError(f"Invalid sequence key: {key!r}")
+    return key[:length], key[length:]
+
+def _increment(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        d = DIGITS.index(digits[i]) + 1
+        if d < len(DIGITS):
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = DIGITS[0]
+    if head == "Z":
+        return "a" + DIGITS[0]
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+def _decrement(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        d = DIGITS.index(digits[i]) - 1
+        if d >= 0:
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+def key_between(a: Optional[str], b: Optional[str]) -> str:
+    """
+    A sequence key sorting strictly between a and b (None: open end).
+    Appending (b=None) or prepending (a=None) steps the integer part, so long
+    runs of appends keep short keys; inserting between two beats adds a fraction.
+    """
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"{a!r} is not before {b!r}")
+    if a is None:
+        if b is None:
+            return "a" + DIGITS[0]
+        int_b, frac_b = _split(b)
+        if int_b == _SMALLEST_INTEGER:
+            return int_b + _midpoint("", frac_b)
+        if int_b < b:
+            return int_b
+        key = _decrement(int_b)
+        if key is None:
+            raise ValueError("Sequence keys exhausted")
+        return key
+    int_a, frac_a = _split(a)
+    if b is None:
+        key = _increment(int_a)
+        return int_a + _midpoint(frac_a, None) if key is None else key
+    int_b, frac_b = _split(b)
+    if int_a == int_b:
+        return int_a + _midpoint(frac_a, frac_b)
+    key = _increment(int_a)
+    if key is None:
+        raise ValueError("Sequence keys exhausted")
+    return key if key < b else int_a + _midpoint(frac_a, None)
+
+def get_storyboard_db():
+    return os.path.join(get_schemas_dir(), "_storyboard.db")
+
+class StoryboardIndex:
+    """
+    Persistent order of the Storyboard beats, kept in a stdlib sqlite3 database
+    next to the registry (_storyboard.db): one (path, seq) row per beat with a
+    unique index on seq, so the timeline is read in order straight off the
+    index and every placement is one O(log n) row update.
+
+    Beats new to the index are appended in path order (the old file-name order).
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or get_storyboard_db()
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def ordered(self) -> List[str]:
+        with closing(self.connect()) as conn:
+            return [path for path, in conn.execute("SELECT path FROM beats ORDER BY seq")]
+
+    def keys(self) -> List[Tuple[str, str]]:
+        """(path, seq) in timeline order."""
+        with closing(self.connect()) as conn:
+            return conn.execute("SELECT path, seq FROM beats ORDER BY seq").fetchall()
+
+    @staticmethod
+    def _seq(conn: sqlite3.Connection, path: str) -> Optional[str]:
+        row = conn.execute("SELECT seq FROM beats WHERE path = ?", (path,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _neighbour(conn: sqlite3.Connection, seq: Optional[str], before: bool, skip: int = 0) -> Optional[str]:
+        """The seq `skip + 1` places before (or after) seq; None past the ends (or from seq=None, the far end)."""
+        if before:
+            sql = "SELECT seq FROM beats" + (" WHERE seq < ?" if seq is not None else "") + " ORDER BY seq DESC LIMIT 1 OFFSET ?"
+        else:
+            sql = "SELECT seq FROM beats" + (" WHERE seq > ?" if seq is not None else "") + " ORDER BY seq LIMIT 1 OFFSET ?"
+        row = conn.execute(sql, ((seq, skip) if seq is not None else (skip,))).fetchone()
+        return row[0] if row else None
+
+    def _place(self, conn: sqlite3.Connection, path: str, low: Optional[str], high: Optional[str]) -> str:
+        seq = key_between(low, high)
+        conn.execute("INSERT INTO beats VALUES (?, ?) ON CONFLICT(path) DO UPDATE SET seq = excluded.seq", (path, seq))
+        return seq
+
+    def insert(self, path: str, after: Optional[str] = None, before: Optional[str] = None) -> str:
+        """
+        Places path right after `after` (or right before `before`); at the end if neither is given
+        or the anchor is not a beat. Placing a beat that is already in the index moves it.
+        Only path's row changes. Returns its new sequence key.
+        """
+        with closing(self.connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            current = self._seq(conn, path)
+            if current is not None and path in (after, before):
+                return current
+            # Take path out first, so its own key is never one of the bounds
+            conn.execute("DELETE FROM beats WHERE path = ?", (path,))
+            anchor = self._seq(conn, after) if after is not None else None
+            if anchor is not None:
+                return self._place(conn, path, anchor, self._neighbour(conn, anchor, before=False))
+            anchor = self._seq(conn, before) if before is not None else None
+            if anchor is not None:
+                return self._place(conn, path, self._neighbour(conn, anchor, before=True), anchor)
+            return self._place(conn, path, self._neighbour(conn, None, before=True), None)
+
+    def move(self, path: str, steps: int) -> bool:
+        """Moves path `steps` places later (negative: earlier), clamped to the ends. False if it did not move."""
+        with closing(self.connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            seq = self._seq(conn, path)
+            if seq is None or steps == 0:
+                return False
+            before = steps < 0
+            far = self._neighbour(conn, seq, before, abs(steps) - 1)
+            if far is None:
+                # Past the end: clamp to the first (or last) place
+                far = self._neighbour(conn, None, not before)
+                if far == seq:
+                    return False
+                low, high = (None, far) if before else (far, None)
+            else:
+                beyond = self._neighbour(conn, far, before)
+                low, high = (beyond, far) if before else (far, beyond)
+            conn.execute("UPDATE beats SET seq = ? WHERE path = ?", (key_between(low, high), path))
+            return True
+
+    def move_up(self, path: str) -> bool:
+        return self.move(path, -1)
+
+    def move_down(self, path: str) -> bool:
+        return self.move(path, 1)
+
+    def rename(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        """Moved beats keep their place."""
+        with closing(self.connect()) as conn, conn:
+            for old_path, new_path in pairs:
+                if self._seq(conn, old_path) is not None:
+                    conn.execute("DELETE FROM beats WHERE path = ?", (new_path,))
+                    conn.execute("UPDATE beats SET path = ? WHERE path = ?", (new_path, old_path))
+
+    def refresh(self, specs: Dict[str, StorySpec], paths: Optional[Iterable[str]] = None) -> int:
+        """
+        Brings the beats in line with the registry for the given paths (every path
+        when None): Storyboard specs missing from the index are appended, entries
+        that are no longer Storyboard specs are dropped. Returns the number of rows changed.
+        """
+        changed = 0
+        with closing(self.connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if paths is None:
+                known = {path for path, in conn.execute("SELECT path FROM beats")}
+                paths = known | set(specs)
+            else:
+                paths = set(paths)
+                known = {path for path in paths if self._seq(conn, path) is not None}
+            last = None
+            for path in sorted(paths):
+                spec = specs.get(path)
+                is_beat = spec is not None and spec.category == STORYBOARD_CATEGORY
+                if is_beat and path not in known:
+                    if last is None:
+                        last = self._neighbour(conn, None, before=True)
+                    last = self._place(conn, path, last, None)
+                    changed += 1
+                elif not is_beat and path in known:
+                    conn.execute("DELETE FROM beats WHERE path = ?", (path,))
+                    changed += 1
+        return changed
+
+def refresh_storyboard_index(specs: Dict[str, StorySpec], paths: Optional[Iterable[str]] = None,
+                             renames: Iterable[Tuple[str, str]] = ()) -> None:
+    """Keeps _storyboard.db current after a sync; failures only warn (timeline_order repairs it)."""
+    try:
+        index = StoryboardIndex()
+        renames = list(renames)
+        if renames:
+            index.rename(renames)
+        index.refresh(specs, paths)
+    except Exception as e:
+        print(f"Warning: Failed to update storyboard index: {e}")
+
+def timeline_order(specs: Dict[str, StorySpec]) -> List[str]:
+    """The Storyboard paths of specs in timeline order (reconciling the index with specs first)."""
+    index = StoryboardIndex()
+    index.refresh(specs)
+    return [path for path in index.ordered() if path in specs]
@@ -1,43 +1,110 @@
-import os
-from .metadata import load_all_metadata, parse_header_from_file, scan_and_sync
-from .config import get_schemas_dir, is_story_set
+from typing import Iterator, List, Optional
+from .metadata import load_all_metadata, parse_header_from_file, sync_paths, read_body_hash, match_renames
+from .fingerprints import FingerprintCache, header_digest
+from .config import get_schemas_dir, get_scan_workers, is_story_set
+from .parallel import parallel_map
+from .walker import iter_spec_files
 
-def check_sync_status():
-    specs_dir = get_schemas_dir()
-    issues = []
-    data = load_all_metadata() # StoryMetadata
-    specs = data.specs # Access Model field
+def _read_file_meta(filepath: str) -> dict:
+    # Module-level so it can run in a process pool
+    return parse_header_from_file(filepath).model_dump()
+
+def _compare(rel_path: str, file_meta: dict, json_meta) -> Optional[dict]:
+    mismatches = []
+    for k in ["title", "version", "category"]:
+        if file_meta.get(k, "") != getattr(json_meta, k, ""):
+            mismatches.append(f"{k} mismatch")
+    if mismatches:
+        return {"file": rel_path, "status": "METADATA_MISMATCH", "details": ", ".join(mismatches)}
+    return None
+
+def iter_sync_issues(workers: Optional[int] = None, use_processes: bool = False) -> Iterator[dict]:
+    """
+    Compares the files on disk with the metadata registry, yielding issues as they are found.
+    A file whose stat matches the fingerprint cache, and whose registry entry still
+    hashes to the header recorded at the last scan, is not opened at all.
+    An unregistered file with the same body as a registered spec that is gone from
+    disk is one RENAMED issue ("from" holds the old path) instead of two.
+    Other headers are parsed on a pool of `workers` (defaults to config SCAN_WORKERS),
+    in small batches so the first issues come out before the walk ends.
+    """
+    specs = load_all_metadata().specs
+    fingerprints = FingerprintCache().load()
+    if workers is None:
+        workers = get_scan_workers()
+    batch_size = 1 if workers <= 1 else workers * 8
+    
+    on_disk = set()
+    pending = [] # (rel_path, full_path) of tracked files whose header must be read
+    # Body hashes of registered specs: a new file matching one may be that spec moved
+    known_bodies = {fingerprints.body_hash(rel_path) for rel_path in specs} - {""}
+    maybe_moved = {} # rel_path -> body hash, held back until we know what vanished
     
-    disk_files = set()
-    for root, dirs, files in os.walk(specs_dir):
-        if root == specs_dir: continue
-        for f in files:
-            if f.endswith(".md"):
-                full_path = os.path.join(root, f)
-                rel_path = os.path.relpath(full_path, specs_dir).replace("\\", "/")
-                disk_files.add(rel_path)
-                
-                if rel_path not in specs:
-                    issues.append({"file": rel_path, "status": "MISSING_IN_JSON", "details": "Not in metadata DB."})
-                else:
-                    file_meta = parse_header_from_file(full_path)
-                    json_meta = specs[rel_path]
-                    mismatches = []
-                    for k in ["title", "version", "category"]:
-                        if getattr(file_meta, k, "") != getattr(json_meta, k, ""):
-                            mismatches.append(f"{k} mismatch")
-                    if mismatches:
-                        issues.append({"file": rel_path, "status": "METADATA_MISMATCH", "details": ", ".join(mismatches)})
+    def flush():
+        parsed = parallel_map(_read_file_meta, [full_path for _, full_path in pending], workers=workers, processes=use_processes)
+        for (rel_path, _), file_meta in zip(pending, parsed):
+            issue = _compare(rel_path, file_meta, specs[rel_path])
+            if issue:
+                yield issue
+        pending.clear()
+    
+    for entry in iter_spec_files(get_schemas_dir()):
+        rel_path = entry.rel_path
+        on_disk.add(rel_path)
+        json_meta = specs.get(rel_path)
+        if json_meta is None:
+            body_hash = read_body_hash(entry.path) if known_bodies else ""
+            if body_hash in known_bodies:
+                maybe_moved[rel_path] = body_hash
+            else:
+                yield {"file": rel_path, "status": "MISSING_IN_JSON", "details": "Not in metadata DB."}
+            continue
+        if fingerprints.matches(rel_path, entry.stat) and json_meta.category == entry.category:
+            if header_digest(json_meta.model_dump()) == fingerprints.get(rel_path)["header_hash"]:
+                continue
+        pending.append((rel_path, entry.path))
+        if len(pending) >= batch_size:
+            yield from flush()
+    yield from flush()
+
+    missing = [rel_path for rel_path in specs if rel_path not in on_disk]
+    renames = match_renames({rel_path: fingerprints.body_hash(rel_path) for rel_path in missing}, maybe_moved)
+    for old_path, new_path in renames:
+        yield {"file": new_path, "status": "RENAMED", "details": f"Moved from {old_path}.", "from": old_path}
+    renamed_from = {old_path for old_path, _ in renames}
+    renamed_to = {new_path for _, new_path in renames}
+    for rel_path in maybe_moved:
+        if rel_path not in renamed_to:
+            yield {"file": rel_path, "status": "MISSING_IN_JSON", "details": "Not in metadata DB."}
+    for rel_path in missing:
+        if rel_path not in renamed_from:
+            yield {"file": rel_path, "status": "MISSING_ON_DISK", "details": "File missing."}
 
-    for rel_path in specs:
-        if rel_path not in disk_files:
-            issues.append({"file": rel_path, "status": "MISSING_ON_DISK", "details": "File missing."})
-            
-    return issues
+def check_sync_status(workers: Optional[int] = None, use_processes: bool = False):
+    """
+    Compares the files on disk with the metadata registry and returns every issue found.
+    See iter_sync_issues for the streaming version.
+    """
+    return list(iter_sync_issues(workers=workers, use_processes=use_processes))
 
-def fix_all_issues():
-    # Calling scan_and_sync handles "missing in json" and "updates matching files to disk"
-    # It basically heals the state.
-    # What about "missing on disk"? scan_and_sync cleans that too.
-    scan_and_sync()
-    return "Rescanned and synchronized."
+def fix_all_issues(issues: Optional[List[dict]] = None, workers: Optional[int] = None) -> str:
+    """
+    Repairs the given issues (as returned by check_sync_status; checked afresh if None)
+    without rescanning the story. Only the listed files are synced (see metadata.sync_paths):
+      MISSING_IN_JSON / METADATA_MISMATCH: the file is re-read (header healed, the
+        folder wins for the category) and its entry upserted.
+      MISSING_ON_DISK: the entry is deleted.
+      RENAMED: both of the above, reported to the rename listeners as a move.
+    All registry changes land in a single update_metadata call.
+    """
+    if issues is None:
+        issues = check_sync_status(workers=workers)
+    paths = []
+    for issue in issues:
+        if issue["status"] in ("MISSING_IN_JSON", "METADATA_MISMATCH", "MISSING_ON_DISK"):
+            paths.append(issue["file"])
+        elif issue["status"] == "RENAMED":
+            paths += [issue["from"], issue["file"]]
+    upserts, deletes = sync_paths(paths, workers=workers)
+    renamed = sum(1 for issue in issues if issue["status"] == "RENAMED")
+    return f"Repaired {len(upserts) + len(deletes) - renamed} issue(s)."
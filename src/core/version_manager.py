@@ -1,8 +1,113 @@
 
 import json
 import os
+import zlib
 import subprocess
-from typing import Optional
+from typing import Dict, Optional, Tuple
+
+def find_git_dir(start: Optional[str] = None) -> Optional[str]:
+    """The .git directory `git` would use from start (the cwd by default), or None outside a repo."""
+    if os.environ.get("GIT_DIR"):
+        return os.path.abspath(os.environ["GIT_DIR"])
+    path = os.path.abspath(start or os.getcwd())
+    while True:
+        dot_git = os.path.join(path, ".git")
+        if os.path.isdir(dot_git):
+            return dot_git
+        if os.path.isfile(dot_git):
+            # Worktree or submodule: ".git" is a file holding "gitdir: <path>"
+            try:
+                with open(dot_git, "r", encoding="utf-8") as f:
+                    line = f.readline().strip()
+            except OSError:
+                return None
+            if line.startswith("gitdir:"):
+                return os.path.normpath(os.path.join(path, line[len("gitdir:"):].strip()))
+            return None
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+def _common_dir(git_dir: str) -> str:
+    # Linked worktrees keep their own HEAD but share refs with the main repository
+    try:
+        with open(os.path.join(git_dir, "commondir"), "r", encoding="utf-8") as f:
+            return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except OSError:
+        return git_dir
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def _tree_mtimes(root: str) -> tuple:
+    """(path, mtime) of root and every directory below it: a file added anywhere changes one of them."""
+    found = []
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames.sort()
+        found.append((dirpath, _mtime(dirpath)))
+    return tuple(found)
+
+def _packed_refs(common_dir: str) -> Tuple[Dict[str, str], Dict[str, str], bool]:
+    """
+    (ref -> sha, ref -> peeled commit sha of annotated tags, fully peeled) from packed-refs.
+    In a fully peeled file a tag without a "^" line is known to point straight at a commit.
+    """
+    refs, peeled = {}, {}
+    text = _read_text(os.path.join(common_dir, "packed-refs")) or ""
+    fully_peeled = False
+    last = None
+    for line in text.splitlines():
+        if line.startswith("#"):
+            fully_peeled = fully_peeled or "fully-peeled" in line.split()
+            continue
+        if not line:
+            continue
+        if line.startswith("^"):
+            if last:
+                peeled[last] = line[1:].strip()
+            continue
+        sha, _, ref = line.partition(" ")
+        refs[ref.strip()] = sha
+        last = ref.strip()
+    return refs, peeled, fully_peeled
+
+def _loose_tags(common_dir: str) -> Dict[str, str]:
+    """Tag name -> sha for the tags under refs/tags (nested names like release/v1 included)."""
+    tags = {}
+    root = os.path.join(common_dir, "refs", "tags")
+    for dirpath, _, files in os.walk(root):
+        for name in files:
+            sha = _read_text(os.path.join(dirpath, name))
+            if sha:
+                tags[os.path.relpath(os.path.join(dirpath, name), root).replace(os.sep, "/")] = sha
+    return tags
+
+def _peel(common_dir: str, sha: str) -> Optional[str]:
+    """
+    The commit an annotated tag object points to, read from its loose object;
+    sha itself if it is not a tag object, None if the object is packed (unreadable here).
+    """
+    try:
+        with open(os.path.join(common_dir, "objects", sha[:2], sha[2:]), "rb") as f:
+            data = zlib.decompress(f.read())
+    except (OSError, zlib.error):
+        return None
+    header, _, body = data.partition(b"\0")
+    if not header.startswith(b"tag "):
+        return sha
+    first = body.split(b"\n", 1)[0]
+    return first[len(b"object "):].decode("ascii") if first.startswith(b"object ") else None
 
 class VersionManager:
     """
@@ -16,6 +121,9 @@ class VersionManager:
     def __init__(self, config_path: str):
         self.config_path = config_path
         self._version: str = self.DEFAULT_VERSION
+        # Last git answer, valid while the ref files it was read from keep their mtimes
+        self._git_key: Optional[tuple] = None
+        self._git_version: Optional[str] = None
         self._ensure_config_exists()
         self.load_version()
 
@@ -31,8 +139,68 @@ class VersionManager:
         if not os.path.exists(self.config_path):
             self.save_version_to_config(self.DEFAULT_VERSION)
 
+    def _git_signature(self, git_dir: str) -> tuple:
+        """What the answer of `git describe` depends on: HEAD, the branch it points at and the tags."""
+        common = _common_dir(git_dir)
+        head = _read_text(os.path.join(git_dir, "HEAD")) or ""
+        branch = head[4:].strip() if head.startswith("ref:") else None
+        return (
+            git_dir,
+            head,
+            _mtime(os.path.join(common, branch)) if branch else None,
+            _mtime(os.path.join(common, "packed-refs")),
+            # Nested tags (refs/tags/release/v1) only touch their own folder
+            _tree_mtimes(os.path.join(common, "refs", "tags")),
+        )
+
+    def read_head_tag(self, git_dir: str) -> Optional[str]:
+        """
+        The tag on the HEAD commit, read straight from the ref files; None when
+        that can't be told without git (no tag or several tags on HEAD, a packed tag object).
+        """
+        common = _common_dir(git_dir)
+        head = _read_text(os.path.join(git_dir, "HEAD")) or ""
+        packed, peeled, fully_peeled = _packed_refs(common)
+        if head.startswith("ref:"):
+            branch = head[4:].strip()
+            commit = _read_text(os.path.join(common, branch)) or packed.get(branch)
+        else:
+            commit = head
+        if not commit:
+            return None
+
+        tags = {ref[len("refs/tags/"):]: sha for ref, sha in packed.items() if ref.startswith("refs/tags/")}
+        tags.update(_loose_tags(common))
+        found = []
+        for name, sha in tags.items():
+            ref = f"refs/tags/{name}"
+            if packed.get(ref) == sha and (ref in peeled or fully_peeled):
+                target = peeled.get(ref, sha)
+            else:
+                target = sha if sha == commit else _peel(common, sha)
+            if target is None:
+                return None # A packed tag object: only git can peel it
+            if target == commit:
+                found.append(name)
+        return found[0] if len(found) == 1 else None
+
     def get_git_version(self) -> Optional[str]:
-        """Tries to get version from git tags."""
+        """
+        Latest tag reachable from HEAD (`git describe --tags --abbrev=0`), cached until
+        HEAD, its branch, packed-refs or refs/tags change. A tag right on HEAD is read from
+        the ref files; anything else asks git once per change.
+        """
+        git_dir = find_git_dir()
+        if git_dir is None:
+            return None
+        key = self._git_signature(git_dir)
+        if key == self._git_key:
+            return self._git_version
+        version = self.read_head_tag(git_dir) or self._describe()
+        self._git_key, self._git_version = key, version
+        return version
+
+    def _describe(self) -> Optional[str]:
         try:
             # git describe --tags --abbrev=0 gets the latest tag name
             version = subprocess.check_output(
@@ -67,7 +235,7 @@ class VersionManager:
 
     def get_version(self) -> str:
         """Returns the current resolved version."""
-        # Reload to ensure freshness if called multiple times or during deploy
+        # Reloaded every call so a new tag (e.g. during deploy) shows up; get_git_version is cached
         return self.load_version()
 
     def bump_minor(self, stage: str = "beta"):
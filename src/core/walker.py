@@ -0,0 +1,169 @@
+import os
+import fnmatch
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from .config import get_schemas_dir
+
+class FileStat(NamedTuple):
+    """The subset of os.stat_result the scanners care about (cheap to cache and compare)."""
+    st_mtime_ns: int
+    st_size: int
+    st_ino: int
+
+class DirListing(NamedTuple):
+    rel_dir: str  # "/"-separated, "" for the root
+    path: str
+    depth: int
+    dirs: List[str]
+    files: List[Tuple[str, FileStat]]
+
+class SpecEntry(NamedTuple):
+    rel_path: str
+    path: str
+    category: str
+    stat: FileStat
+
+def _list_dir(path: str, suffix: Optional[str]) -> Tuple[List[str], List[Tuple[str, FileStat]]]:
+    dirs, files = [], []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.name)
+                elif entry.is_file() and (suffix is None or entry.name.endswith(suffix)):
+                    # DirEntry caches its stat (free on Windows, one lstat-equivalent on POSIX)
+                    st = entry.stat()
+                    files.append((entry.name, FileStat(st.st_mtime_ns, st.st_size, st.st_ino)))
+            except OSError:
+                continue
+    dirs.sort()
+    files.sort()
+    return dirs, files
+
+def walk_tree(root: Optional[str] = None, suffix: Optional[str] = None, max_depth: Optional[int] = None) -> Iterator[DirListing]:
+    """
+    Top-down, sorted walk built on os.scandir. Yields one DirListing per directory.
+
+    Args:
+        root: Directory to walk (defaults to the schemas dir).
+        suffix: Only report files ending with this (e.g. ".md").
+        max_depth: Don't list directories deeper than this (the root is depth 0);
+            the subdirectories of a listing at max_depth are still named in its `dirs`.
+    """
+    root = root or get_schemas_dir()
+    stack = [(root, "", 0)]
+    while stack:
+        path, rel_dir, depth = stack.pop()
+        try:
+            dirs, files = _list_dir(path, suffix)
+        except OSError:
+            continue
+        yield DirListing(rel_dir, path, depth, dirs, files)
+        if max_depth is not None and depth >= max_depth:
+            continue
+        # Reversed so the stack pops subdirectories in sorted order
+        for name in reversed(dirs):
+            stack.append((os.path.join(path, name), f"{rel_dir}/{name}" if rel_dir else name, depth + 1))
+
+def iter_spec_files(root: Optional[str] = None) -> Iterator[SpecEntry]:
+    """
+    Yields every .md spec below the schemas dir, in sorted order.
+    Files directly in the root are not specs; the category is the containing folder's name.
+    """
+    for listing in walk_tree(root, suffix=".md"):
+        if not listing.rel_dir:
+            continue
+        category = os.path.basename(listing.path)
+        for name, st in listing.files:
+            yield SpecEntry(f"{listing.rel_dir}/{name}", os.path.join(listing.path, name), category, st)
+
+def format_size(size: int) -> str:
+    if size < 1024:
+        return f"{size} B"
+    for unit in ("KB", "MB", "GB"):
+        size /= 1024
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
+
+def _count(n: int, noun: str) -> str:
+    return f"{n} {noun}" if n == 1 else f"{n} {noun}s"
+
+class TreeTotals:
+    """Running totals of a tree walk (the root itself is not counted as a directory)."""
+
+    def __init__(self):
+        self.dirs = 0
+        self.files = 0
+        self.bytes = 0
+
+    def add(self, listing: DirListing) -> Tuple[int, int]:
+        """Counts listing in; returns its own (file count, bytes)."""
+        size = sum(st.st_size for _, st in listing.files)
+        self.dirs += 1 if listing.depth else 0
+        self.files += len(listing.files)
+        self.bytes += size
+        return len(listing.files), size
+
+    def summary(self) -> str:
+        return f"{self.dirs} {'directory' if self.dirs == 1 else 'directories'}, {_count(self.files, 'file')}, {format_size(self.bytes)}"
+
+# The registry (_schemas.json and its journal, lock and SQLite variant, the shards'
+# _metadata.json), its caches and the index databases (with their -wal/-shm files)
+REGISTRY_FILES = ("_metadata.json", "_schemas.*", "_fingerprints.json", "_analyze.json", "_*.db", "_*.db-*")
+
+def is_registry_file(name: str) -> bool:
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in REGISTRY_FILES)
+
+def _tree_listings(root: Optional[str], max_depth: Optional[int]) -> Iterator[DirListing]:
+    # The tree shows the specs (and any other file), not the registry kept among them
+    for listing in walk_tree(root, max_depth=max_depth):
+        yield listing._replace(files=[(name, st) for name, st in listing.files if not is_registry_file(name)])
+
+def tree_lines(root: Optional[str] = None, max_depth: Optional[int] = None, dirs_only: bool = False,
+               counts: bool = False) -> Iterator[str]:
+    """
+    The text tree, one line at a time, straight off a single walk: each directory,
+    then its files, then its subdirectories. Memory stays bounded by the walk's stack,
+    so huge trees start printing at once. Directories past max_depth end in "/ ...";
+    with counts, directory lines carry their own file count and size, and a
+    totals line closes the tree.
+    """
+    totals = TreeTotals()
+    for listing in _tree_listings(root, max_depth):
+        indent = "    " * listing.depth
+        file_count, size = totals.add(listing)
+        line = f"{indent}{os.path.basename(listing.path) or listing.path}/"
+        if counts:
+            line += f" ({_count(file_count, 'file')}, {format_size(size)})"
+        yield line + "\n"
+        if not dirs_only:
+            for name, _ in listing.files:
+                yield f"{indent}    {name}\n"
+        if max_depth is not None and listing.depth >= max_depth:
+            for name in listing.dirs:
+                yield f"{indent}    {name}/ ...\n"
+    if counts:
+        yield totals.summary() + "\n"
+
+def tree_dict(root: Optional[str] = None, max_depth: Optional[int] = None, dirs_only: bool = False) -> Dict[str, Optional[dict]]:
+    """Nested dict of the tree: directories map to subtrees (empty past max_depth), files to None."""
+    tree = {}
+    nodes = {"": tree}
+    for listing in _tree_listings(root, max_depth):
+        node = nodes.pop(listing.rel_dir)
+        for name in listing.dirs:
+            node[name] = nodes[f"{listing.rel_dir}/{name}" if listing.rel_dir else name] = {}
+        if not dirs_only:
+            for name, _ in listing.files:
+                node[name] = None
+    return tree
+
+def tree_records(root: Optional[str] = None, max_depth: Optional[int] = None, dirs_only: bool = False) -> Iterator[dict]:
+    """One record per listed directory, in walk order, with its own file count and bytes."""
+    totals = TreeTotals()
+    for listing in _tree_listings(root, max_depth):
+        file_count, size = totals.add(listing)
+        record = {"path": listing.rel_dir, "depth": listing.depth, "dirs": listing.dirs}
+        if not dirs_only:
+            record["files"] = [name for name, _ in listing.files]
+        record.update(file_count=file_count, bytes=size)
+        yield record
@@ -0,0 +1,306 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Set
+from .config import get_schemas_dir
+from .walker import walk_tree, iter_spec_files
+
+# Quiet period after the last event before a batch is applied
+DEBOUNCE_SECONDS = 0.25
+# A batch is applied after this long even if events keep coming
+MAX_DELAY_SECONDS = 2.0
+# Polling fallback: seconds between two walks of the tree
+POLL_INTERVAL = 2.0
+
+class WatchEvent(NamedTuple):
+    kind: str # "created", "modified", "deleted", "moved_from", "moved_to" or "overflow"
+    rel_path: str
+    is_dir: bool
+
+def _join(*parts: str) -> str:
+    return "/".join(p for p in parts if p)
+
+def _is_spec(rel_path: str) -> bool:
+    # Specs are .md files inside a category folder (never in the root)
+    return "/" in rel_path and rel_path.endswith(".md")
+
+# --- inotify (Linux), through ctypes so there is no extra dependency ---
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct("iIII") # wd, mask, cookie, len (then len bytes of name)
+
+def _load_libc():
+    import ctypes
+    import ctypes.util
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    libc.inotify_init1.argtypes = [ctypes.c_int]
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    return libc, ctypes
+
+def inotify_available() -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        libc, _ = _load_libc()
+        return hasattr(libc, "inotify_init1")
+    except (OSError, AttributeError):
+        return False
+
+class InotifySource:
+    """One inotify watch per directory below root; new directories are watched as they appear."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._libc, ctypes = _load_libc()
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1: {os.strerror(err)}")
+        self.wds: Dict[int, str] = {} # wd -> rel_dir
+        self.add_tree("")
+
+    def _abs(self, rel_path: str) -> str:
+        return os.path.join(self.root, *rel_path.split("/")) if rel_path else self.root
+
+    def add_tree(self, rel_dir: str) -> None:
+        for listing in walk_tree(self._abs(rel_dir), suffix=".md"):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(listing.path), _WATCH_MASK)
+            if wd >= 0:
+                self.wds[wd] = _join(rel_dir, listing.rel_dir)
+
+    def drop_tree(self, rel_dir: str) -> None:
+        prefix = rel_dir + "/"
+        for wd, d in list(self.wds.items()):
+            if d == rel_dir or d.startswith(prefix):
+                self._libc.inotify_rm_watch(self.fd, wd)
+                del self.wds[wd]
+
+    def read(self, timeout: float) -> List[WatchEvent]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return []
+            raise
+        events = []
+        offset = 0
+        while offset + _EVENT.size <= len(buf):
+            wd, mask, _cookie, length = _EVENT.unpack_from(buf, offset)
+            name = buf[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                events.append(WatchEvent("overflow", "", False))
+                continue
+            if mask & IN_IGNORED:
+                self.wds.pop(wd, None)
+                continue
+            rel_dir = self.wds.get(wd)
+            if rel_dir is None or not name:
+                continue
+            rel_path = _join(rel_dir, os.fsdecode(name))
+            is_dir = bool(mask & IN_ISDIR)
+            if not is_dir and not _is_spec(rel_path):
+                continue
+            if mask & IN_CREATE:
+                kind = "created"
+            elif mask & IN_MOVED_TO:
+                kind = "moved_to"
+            elif mask & IN_MOVED_FROM:
+                kind = "moved_from"
+            elif mask & IN_DELETE:
+                kind = "deleted"
+            else:
+                kind = "modified"
+            if is_dir:
+                if kind in ("created", "moved_to"):
+                    self.add_tree(rel_path)
+                elif kind == "moved_from":
+                    self.drop_tree(rel_path)
+            events.append(WatchEvent(kind, rel_path, is_dir))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+class PollingSource:
+    """Portable fallback: walks the tree every `interval` seconds and diffs the file stats."""
+
+    def __init__(self, root: str, interval: float = POLL_INTERVAL, stop_event: Optional[threading.Event] = None):
+        self.root = root
+        self.interval = interval
+        self._stop = stop_event or threading.Event()
+        self.snapshot = self._take()
+        self.next_poll = time.monotonic() + interval
+
+    def _take(self) -> dict:
+        return {entry.rel_path: entry.stat for entry in iter_spec_files(self.root)}
+
+    def read(self, timeout: float) -> List[WatchEvent]:
+        wait = self.next_poll - time.monotonic()
+        if wait > 0:
+            self._stop.wait(min(timeout, wait))
+            if self.next_poll > time.monotonic():
+                return []
+        self.next_poll = time.monotonic() + self.interval
+        current = self._take()
+        events = [WatchEvent("deleted", p, False) for p in self.snapshot if p not in current]
+        for rel_path, st in current.items():
+            old = self.snapshot.get(rel_path)
+            if old is None:
+                events.append(WatchEvent("created", rel_path, False))
+            elif old != st:
+                events.append(WatchEvent("modified", rel_path, False))
+        self.snapshot = current
+        return events
+
+    def close(self) -> None:
+        pass
+
+class SpecWatcher:
+    """
+    Keeps the metadata registry in line with the spec files while the app runs.
+
+    A background thread starts listening for changes (inotify on Linux, polling
+    elsewhere or when use_inotify=False), then runs one full scan_and_sync. Events are
+    debounced and applied as one incremental metadata.sync_paths batch; subscribers
+    are then called, on the watcher thread, with the set of registry paths that
+    changed (None after a full rescan).
+    """
+
+    def __init__(self, root: Optional[str] = None, debounce: float = DEBOUNCE_SECONDS,
+                 poll_interval: float = POLL_INTERVAL, use_inotify: Optional[bool] = None):
+        self.root = root or get_schemas_dir()
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = inotify_available() if use_inotify is None else use_inotify
+        self._subscribers: List[Callable[[Optional[Set[str]]], None]] = []
+        self._stop = threading.Event()
+        self._rescan = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Set once the initial scan is done and events are being listened to
+        self.ready = threading.Event()
+
+    def subscribe(self, callback: Callable[[Optional[Set[str]]], None]) -> Callable[[], None]:
+        """Registers callback; returns a function that unsubscribes it."""
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback) if callback in self._subscribers else None
+
+    def start(self) -> "SpecWatcher":
+        self._thread = threading.Thread(target=self._run, name="storylord-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def request_rescan(self) -> None:
+        """Asks for a full scan_and_sync, run on the watcher thread."""
+        self._rescan.set()
+
+    def _notify(self, changed: Optional[Set[str]]) -> None:
+        for callback in list(self._subscribers):
+            try:
+                callback(changed)
+            except Exception as e:
+                print(f"Warning: Watcher subscriber failed: {e}")
+
+    def _full_scan(self) -> None:
+        from .metadata import scan_and_sync
+        self._rescan.clear()
+        scan_and_sync()
+        self._notify(None)
+
+    def _expand(self, pending: Dict[str, bool]) -> Set[str]:
+        """Turns the pending (rel_path -> is_dir) events into the spec paths to sync."""
+        from .metadata import load_all_metadata
+        paths = {rel_path for rel_path, is_dir in pending.items() if not is_dir}
+        dirs = [rel_path for rel_path, is_dir in pending.items() if is_dir]
+        if dirs:
+            # A directory that appeared, vanished or moved: everything known or present under it
+            specs = load_all_metadata().specs
+            for rel_dir in dirs:
+                prefix = rel_dir + "/"
+                paths.update(p for p in specs if p.startswith(prefix))
+                for listing in walk_tree(os.path.join(self.root, *rel_dir.split("/")), suffix=".md"):
+                    paths.update(_join(rel_dir, listing.rel_dir, name) for name, _ in listing.files)
+        return {p for p in paths if _is_spec(p)}
+
+    def _apply(self, pending: Dict[str, bool]) -> None:
+        from .metadata import sync_paths
+        upserts, deletes = sync_paths(self._expand(pending))
+        changed = set(upserts) | set(deletes)
+        if changed:
+            self._notify(changed)
+
+    def _open_source(self):
+        if self.use_inotify:
+            try:
+                return InotifySource(self.root)
+            except OSError as e:
+                print(f"Warning: inotify unavailable ({e}), polling instead")
+        return PollingSource(self.root, self.poll_interval, self._stop)
+
+    def _run(self) -> None:
+        try:
+            # Listen before the initial scan, so a file written while it runs is still reported
+            # (the scan's own header heals come back as events too; syncing them again is a no-op)
+            source = self._open_source()
+        except Exception as e:
+            print(f"Warning: Watcher failed to start: {e}")
+            return
+        try:
+            self._full_scan()
+        except Exception as e:
+            print(f"Warning: Watcher failed to start: {e}")
+            source.close()
+            return
+        self.ready.set()
+
+        pending: Dict[str, bool] = {}
+        first_at = last_at = 0.0
+        try:
+            while not self._stop.is_set():
+                events = source.read(self.debounce if pending else 0.5)
+                now = time.monotonic()
+                for event in events:
+                    if event.kind == "overflow":
+                        # Events were lost: only a full scan can be trusted
+                        self._rescan.set()
+                        continue
+                    if not pending:
+                        first_at = now
+                    last_at = now
+                    pending[event.rel_path] = pending.get(event.rel_path, False) or event.is_dir
+                try:
+                    if self._rescan.is_set():
+                        pending.clear()
+                        self._full_scan()
+                    elif pending and (now - last_at >= self.debounce or now - first_at >= MAX_DELAY_SECONDS):
+                        batch, pending = pending, {}
+                        self._apply(batch)
+                except Exception as e:
+                    print(f"Warning: Watcher update failed: {e}")
+        finally:
+            source.close()
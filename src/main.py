@@ -5,6 +5,17 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 if __name__ == "__main__":
+    if "--startup-profile" in sys.argv:
+        # Installed before anything else is imported, reported however the process exits
+        import atexit
+        from core.startup import ImportProfiler
+        atexit.register(ImportProfiler().install().report)
+
+    # Needed for process-pool scans in the frozen (PyInstaller) build
+    if getattr(sys, 'frozen', False):
+        import multiprocessing
+        multiprocessing.freeze_support()
+
     from cli import main as cli_main
     
     # Attempt to handle as CLI command
@@ -41,8 +41,10 @@ class StoryLordApp:
     
     
     def setup_global_bindings(self):
+        typing = Condition(lambda: state.typing)
+
         @self.kb.add('c-c')
-        @self.kb.add('q')
+        @self.kb.add('q', filter=~typing)
         def exit_(event):
              # Force clean exit
              import sys
@@ -71,11 +73,17 @@ class StoryLordApp:
             
 
 
-        @self.kb.add('w')
+        @self.kb.add('w', filter=~typing)
         def debug_w(event):
              state.set_status("DEBUG: GLOBAL W CAUGHT (NO FOCUS TARGET?)")
 
 
 
     def run(self):
-        self.app.run()
+        # Keeps the registry live in the background; screens never scan on the UI thread
+        from ui import live
+        live.start(self.app)
+        try:
+            self.app.run()
+        finally:
+            live.stop()
@@ -0,0 +1,37 @@
+from ui.state import state
+from core.watcher import SpecWatcher
+
+# The app's single watcher; the screens only ever read the registry it keeps current
+_watcher = None
+
+def start(app):
+    """Starts watching the specs and redrawing the screens of app when they change."""
+    global _watcher
+    _watcher = SpecWatcher()
+    _watcher.subscribe(lambda changed: _on_change(app, changed))
+    _watcher.start()
+
+def stop():
+    if _watcher is not None:
+        _watcher.stop()
+
+def request_rescan() -> bool:
+    """Queues a full rescan on the watcher thread. False if no watcher is running."""
+    if _watcher is None:
+        return False
+    _watcher.request_rescan()
+    return True
+
+def _on_change(app, changed):
+    # Called on the watcher thread: hand the redraw over to the UI loop
+    loop = getattr(app, "loop", None)
+    if loop is not None and loop.is_running():
+        loop.call_soon_threadsafe(_reload_screens, app)
+
+def _reload_screens(app):
+    from ui.screens import explorer, storyboard, sync
+    explorer.refresh()
+    storyboard.refresh_data()
+    if state.active_screen == "SYNC":
+        sync.refresh()
+    app.invalidate()
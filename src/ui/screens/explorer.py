@@ -1,11 +1,32 @@
+import threading
 from prompt_toolkit.layout.containers import HSplit, Window, VSplit
 from prompt_toolkit.layout.controls import FormattedTextControl
 from prompt_toolkit.widgets import Label, Frame
 from prompt_toolkit.key_binding import KeyBindings
+from prompt_toolkit.filters import Condition
+from prompt_toolkit.keys import Keys
+from prompt_toolkit.application.current import get_app
 from ui.state import state
-from core.metadata import scan_and_sync, load_all_metadata
+from core.metadata import load_all_metadata, count_by_category, query_specs
+from core.fuzzy import FuzzyIndex
 
 metadata_cache = {}
+category_counts = {}
+search_hits = {} # path -> SearchHit of the last search
+# Searches run off the UI thread; bumped per search so an older one never publishes
+_search_generation = 0
+_searching = False
+_search_lock = threading.Lock()
+
+# Type-to-filter: keystrokes are applied FILTER_DEBOUNCE seconds after the last one
+FILTER_DEBOUNCE = 0.05
+FILTER_LIMIT = 500
+# Trigram index over the titles, synced with the registry off the UI thread
+_fuzzy = FuzzyIndex()
+_fuzzy_lock = threading.Lock()
+_fuzzy_specs = None # The registry specs the index was last synced with
+_fuzzy_building = False
+_filter_handle = None
 
 # Fixed Order as requested
 FIXED_CATEGORIES = [
@@ -19,10 +40,18 @@ FIXED_CATEGORIES = [
 ]
 
 def refresh():
-    global metadata_cache
-    scan_and_sync()
-    data = load_all_metadata()
-    metadata_cache = data
+    global metadata_cache, category_counts
+    # The registry is kept current by the watcher (ui.live); this only reads it (cached in-process)
+    metadata_cache = load_all_metadata()
+    # Counted by the backend (manifest / SQL), cached here since it is read on every render
+    category_counts = count_by_category()
+    if state.exp_filter:
+        apply_filter()
+    elif state.exp_mode == "FILES" and state.exp_category:
+        state.exp_files = get_files_in_category(state.exp_category)
+        state.exp_selected_idx = min(state.exp_selected_idx, max(0, len(state.exp_files) - 1))
+    elif state.exp_mode == "SEARCH" and state.exp_search_query and not state.exp_search_typing:
+        run_search()
     
     # Reset to categories if we are just opening or refreshing top level
     # But if we are deep, maybe keep context? 
@@ -32,29 +61,106 @@ def refresh():
 def get_category_counts():
     counts = {cat: 0 for cat in FIXED_CATEGORIES}
     
-    # helper
-    all_specs = metadata_cache.specs if metadata_cache else {}
-    
-    # Dynamic categories from FS that aren't fixed?
-    # For now strict adherence to user request "make the explorer have this spec folder structure constant"
-    
-    for path, spec in all_specs.items():
-        cat = spec.category
-        if cat in counts:
-            counts[cat] += 1
-        else:
-            # If we want to show others
-            counts[cat] = counts.get(cat, 0) + 1
-            
+    # Dynamic categories from FS that aren't fixed are appended after the fixed ones
+    counts.update(category_counts)
     return counts
 
 def get_files_in_category(cat):
-    all_specs = metadata_cache.specs if metadata_cache else {}
-    files = []
-    for path, spec in all_specs.items():
-        if spec.category == cat:
-            files.append(path)
-    return sorted(files)
+    # Filtered (and ordered by path) in the backend
+    return [path for path, _ in query_specs(category=cat)]
+
+def _run_search(generation, query):
+    global search_hits, _searching
+    from core.search import search_specs
+    try:
+        hits = search_specs(query, limit=200)
+    except Exception as e:
+        hits = []
+        if generation == _search_generation:
+            state.set_status(f"Search failed: {e}")
+    with _search_lock:
+        if generation != _search_generation:
+            return
+        _searching = False
+        search_hits = {hit.path: hit for hit in hits}
+        state.exp_files = [hit.path for hit in hits]
+        state.exp_selected_idx = min(state.exp_selected_idx, max(0, len(state.exp_files) - 1))
+    _redraw()
+
+def run_search():
+    """Searches on a worker thread; only the newest search publishes its hits."""
+    global _search_generation, _searching
+    with _search_lock:
+        _search_generation += 1
+        generation = _search_generation
+        _searching = True
+    threading.Thread(target=_run_search, args=(generation, state.exp_search_query),
+                     name="storylord-search", daemon=True).start()
+
+def _redraw():
+    try:
+        get_app().invalidate()
+    except Exception:
+        pass
+
+def _sync_fuzzy(specs):
+    global _fuzzy_specs, _fuzzy_building
+    try:
+        with _fuzzy_lock:
+            _fuzzy.sync(specs)
+            _fuzzy_specs = specs
+    finally:
+        _fuzzy_building = False
+    loop = getattr(get_app(), "loop", None)
+    if loop is not None and loop.is_running():
+        loop.call_soon_threadsafe(apply_filter)
+
+def fuzzy_index_ready() -> bool:
+    """True if the filter index matches the registry; otherwise starts syncing it in the background."""
+    global _fuzzy_building
+    specs = getattr(metadata_cache, "specs", {})
+    if specs is _fuzzy_specs:
+        return True
+    if not _fuzzy_building:
+        _fuzzy_building = True
+        threading.Thread(target=_sync_fuzzy, args=(specs,), name="storylord-fuzzy-index", daemon=True).start()
+    return False
+
+def apply_filter():
+    """Narrows the list to the titles matching state.exp_filter (within the open category, if any)."""
+    global _filter_handle
+    _filter_handle = None
+    if state.exp_mode not in ("FILES", "FILTER"):
+        return
+    if not state.exp_filter:
+        state.exp_files = get_files_in_category(state.exp_category) if state.exp_mode == "FILES" else []
+    elif fuzzy_index_ready() and _fuzzy_lock.acquire(blocking=False):
+        # (Otherwise the list is left as is; the index thread re-applies the filter when done)
+        try:
+            prefix = f"{state.exp_category}/" if state.exp_mode == "FILES" else None
+            state.exp_files = [m.path for m in _fuzzy.search(state.exp_filter, limit=FILTER_LIMIT, prefix=prefix)]
+        finally:
+            _fuzzy_lock.release()
+    state.exp_selected_idx = min(state.exp_selected_idx, max(0, len(state.exp_files) - 1))
+    _redraw()
+
+def schedule_filter(app=None):
+    """Debounces apply_filter: typing fast only filters once the keys stop."""
+    global _filter_handle
+    loop = getattr(app, "loop", None)
+    if loop is None:
+        apply_filter()
+        return
+    if _filter_handle is not None:
+        _filter_handle.cancel()
+    _filter_handle = loop.call_later(FILTER_DEBOUNCE, apply_filter)
+
+def _filter_header():
+    if not state.exp_filter_typing and not state.exp_filter:
+        return []
+    cursor = "_" if state.exp_filter_typing else ""
+    note = " (indexing...)" if state.exp_filter and _fuzzy_specs is not getattr(metadata_cache, "specs", {}) else ""
+    return [("class:header", f" Filter: {state.exp_filter}{cursor}{note} \n")]
 
 def get_list_text():
     lines = []
@@ -90,9 +196,31 @@ def get_list_text():
             
             lines.append((style, f" {cat} {count_str} \n"))
 
-    elif state.exp_mode == "FILES":
+    elif state.exp_mode == "SEARCH":
+        cursor = "_" if state.exp_search_typing else ""
+        lines.append(("class:header", f" Search: {state.exp_search_query}{cursor} \n"))
+        if state.exp_search_typing:
+            lines.append(("", " [Enter] Search   [Esc] Cancel \n"))
+            return lines
+        if _searching:
+            lines.append(("", " Searching... "))
+            return lines
+        if not state.exp_files:
+            lines.append(("", " (No matches) "))
+            return lines
+        lines.append(("", f" {len(state.exp_files)} match(es) \n"))
+        start = max(0, state.exp_selected_idx - 10)
+        for i in range(start, min(start + 20, len(state.exp_files))):
+            path = state.exp_files[i]
+            style = "class:menu-selected" if i == state.exp_selected_idx else ""
+            lines.append((style, f" {path} \n"))
+
+    elif state.exp_mode in ("FILES", "FILTER"):
          # state.exp_files should have been set when entering
+         lines.extend(_filter_header())
          if not state.exp_files:
+             if state.exp_filter or state.exp_mode == "FILTER":
+                 return lines + [("", " (No matches) ")]
              return [("", " (Empty Folder) ")]
              
          start = max(0, state.exp_selected_idx - 10)
@@ -109,16 +237,94 @@ def get_meta_text():
     if state.exp_mode == "CATEGORIES":
         return " Select a category... "
         
-    if not state.exp_files: return ""
+    if not state.exp_files or state.exp_search_typing or state.exp_selected_idx >= len(state.exp_files): return ""
     fname = state.exp_files[state.exp_selected_idx]
     meta = metadata_cache.specs.get(fname, None)
     if not meta: return " No Metadata "
-    return f"Title: {meta.title}\nVer: {meta.version}\nDesc: {meta.description}"
+    text = f"Title: {meta.title}\nVer: {meta.version}\nDesc: {meta.description}"
+    hit = search_hits.get(fname) if state.exp_mode == "SEARCH" else None
+    if hit and hit.snippet:
+        text += f"\n\nMatch: {hit.snippet}"
+    return text
 
 kb_exp = KeyBindings()
 
-@kb_exp.add('up')
-@kb_exp.add('w')
+searching = Condition(lambda: state.exp_search_typing)
+filtering = Condition(lambda: state.exp_filter_typing)
+typing = searching | filtering
+
+@kb_exp.add('f', filter=~typing)
+def open_filter(e):
+    if state.exp_mode == "SEARCH":
+        return
+    if state.exp_mode == "CATEGORIES":
+        # Filter across every category
+        state.exp_mode = "FILTER"
+        state.exp_category = None
+        state.exp_files = []
+        state.exp_selected_idx = 0
+    state.exp_filter_typing = True
+    fuzzy_index_ready() # Starts building it while the first keys are typed
+
+def close_filter():
+    state.exp_filter = ""
+    state.exp_filter_typing = False
+    if state.exp_mode == "FILTER":
+        state.exp_mode = "CATEGORIES"
+        state.exp_selected_idx = 0
+    else:
+        apply_filter()
+
+@kb_exp.add('<any>', filter=filtering)
+def filter_input(e):
+    key = e.key_sequence[0].key
+    if key == Keys.Enter:
+        # Keep the narrowed list and navigate it as usual
+        state.exp_filter_typing = False
+        apply_filter()
+        return
+    if key == Keys.Escape:
+        close_filter()
+        return
+    if key == Keys.Up:
+        state.exp_selected_idx = max(0, state.exp_selected_idx - 1)
+        return
+    if key == Keys.Down:
+        state.exp_selected_idx = max(0, min(len(state.exp_files) - 1, state.exp_selected_idx + 1))
+        return
+    if key in (Keys.Backspace, Keys.ControlH):
+        state.exp_filter = state.exp_filter[:-1]
+    elif e.data and len(e.data) == 1 and e.data.isprintable():
+        state.exp_filter += e.data
+    else:
+        return
+    state.exp_selected_idx = 0
+    schedule_filter(e.app)
+
+@kb_exp.add('/', filter=~typing)
+def open_search(e):
+    state.exp_mode = "SEARCH"
+    state.exp_search_typing = True
+    state.exp_selected_idx = 0
+
+@kb_exp.add('<any>', filter=searching)
+def search_input(e):
+    key = e.key_sequence[0].key
+    if key == Keys.Enter:
+        state.exp_search_typing = False
+        state.exp_selected_idx = 0
+        run_search()
+    elif key == Keys.Escape:
+        state.exp_search_typing = False
+        if not state.exp_search_query:
+            state.exp_mode = "CATEGORIES"
+    elif key in (Keys.Backspace, Keys.ControlH):
+        state.exp_search_query = state.exp_search_query[:-1]
+    elif e.data and len(e.data) == 1 and e.data.isprintable():
+        state.exp_search_query += e.data
+
+@kb_exp.add('up', filter=~typing)
+@kb_exp.add('w', filter=~typing)
 def up(e): 
     # Bounds check based on mode
     if state.exp_mode == "CATEGORIES":
@@ -137,8 +343,8 @@ def up(e):
     else:
         state.exp_selected_idx = max(0, state.exp_selected_idx - 1)
 
-@kb_exp.add('down')
-@kb_exp.add('s')
+@kb_exp.add('down', filter=~typing)
+@kb_exp.add('s', filter=~typing)
 def down(e): 
     if state.exp_mode == "CATEGORIES":
         counts = get_category_counts()
@@ -149,10 +355,12 @@ def down(e):
     else:
         state.exp_selected_idx = min(len(state.exp_files)-1, state.exp_selected_idx + 1)
 
-@kb_exp.add('enter')
-@kb_exp.add('right')
-@kb_exp.add('d')
+@kb_exp.add('enter', filter=~typing)
+@kb_exp.add('right', filter=~typing)
+@kb_exp.add('d', filter=~typing)
 def enter(e):
+    if state.exp_mode in ("SEARCH", "FILTER"):
+        return
     if state.exp_mode == "CATEGORIES":
         # Enter Category
         counts = get_category_counts()
@@ -175,10 +383,12 @@ def enter(e):
         state.exp_files = get_files_in_category(selected_cat)
         state.exp_selected_idx = 0
 
-@kb_exp.add('left')
-@kb_exp.add('a')
+@kb_exp.add('left', filter=~typing)
+@kb_exp.add('a', filter=~typing)
 def back(e):
-    if state.exp_mode == "FILES":
+    if state.exp_filter:
+        close_filter()
+    elif state.exp_mode in ("FILES", "SEARCH"):
         state.exp_mode = "CATEGORIES"
         state.exp_category = None
         state.exp_selected_idx = 0 # Or try to remember previous? 0 is fine.
@@ -189,7 +399,7 @@ def back(e):
 
 layout = Frame(
     body=HSplit([
-        Label(" EXPLORER (WASD/Arrows) "),
+        Label(" EXPLORER (WASD/Arrows, F to Filter, / to Search) "),
         VSplit([
             Frame(Window(content=FormattedTextControl(get_list_text, key_bindings=kb_exp, focusable=True, show_cursor=False))),
             Frame(Window(content=FormattedTextControl(get_meta_text, show_cursor=False)))
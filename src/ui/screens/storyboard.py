@@ -3,7 +3,8 @@ from prompt_toolkit.layout.controls import FormattedTextControl
 from prompt_toolkit.widgets import Frame
 from prompt_toolkit.key_binding import KeyBindings
 from ui.state import state
-from core.metadata import load_all_metadata, scan_and_sync
+from core.metadata import load_all_metadata, invalidate_metadata_cache
+from core.storyboard import StoryboardIndex, timeline_order
 
 # Local State
 class StoryboardState:
@@ -15,20 +16,18 @@ class StoryboardState:
 sb_state = StoryboardState()
 
 def refresh_data():
+    # Reads the registry only; the watcher (ui.live) keeps it in line with the files
     try:
-        scan_and_sync()
-        data = load_all_metadata()
+        data = load_all_metadata(categories=["Storyboard"])
         sb_state.metadata_cache = data
         
         # Filter for Storyboard
-        sb_state.nodes = []
+        beats = {}
         if data and data.specs:
-            for path, spec in data.specs.items():
-                if spec.category == "Storyboard":
-                    sb_state.nodes.append((path, spec))
+            beats = {path: spec for path, spec in data.specs.items() if spec.category == "Storyboard"}
         
-        # Sort nodes by filename for now
-        sb_state.nodes.sort(key=lambda x: x[0])
+        # In timeline order, read straight from the storyboard index (no sort)
+        sb_state.nodes = [(path, beats[path]) for path in timeline_order(beats)]
         
         # Bounds check
         if sb_state.selected_idx >= len(sb_state.nodes):
@@ -100,10 +99,40 @@ def move_down(event):
     if sb_state.selected_idx < len(sb_state.nodes) - 1:
         sb_state.selected_idx += 1
 
+def _move_selected(steps):
+    if not sb_state.nodes:
+        return
+    path = sb_state.nodes[sb_state.selected_idx][0]
+    try:
+        moved = StoryboardIndex().move(path, steps)
+    except Exception as e:
+        state.set_status(f"Error reordering storyboard: {e}")
+        return
+    if moved:
+        refresh_data()
+        sb_state.selected_idx = next((i for i, (p, _) in enumerate(sb_state.nodes) if p == path), sb_state.selected_idx)
+
+@kb.add('W')
+@kb.add('c-up')
+def reorder_up(event):
+    # Only the selected beat gets a new sequence key
+    _move_selected(-1)
+
+@kb.add('S')
+@kb.add('c-down')
+def reorder_down(event):
+    _move_selected(1)
+
 @kb.add('r')
 def refresh_binding(event):
+    # Full refresh: drop the in-process registry cache and rescan in the background
+    invalidate_metadata_cache()
     refresh_data()
-    state.set_status("Refreshed Storyboard.")
+    from ui import live
+    if live.request_rescan():
+        state.set_status("Rescanning...")
+    else:
+        state.set_status("Refreshed Storyboard.")
 
 @kb.add('q')
 @kb.add('left')
@@ -125,7 +154,7 @@ layout = Frame(
         Window(width=1, char="|", style="class:line"),
         Window(content=detail_control, style="class:launcher-content")
     ]),
-    title=" Storyboard Timeline ",
+    title=" Storyboard Timeline (Shift+W/S to Reorder) ",
     style="class:gold-frame"
 )
 
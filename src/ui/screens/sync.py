@@ -1,23 +1,70 @@
+import threading
 from prompt_toolkit.layout.containers import HSplit, Window
 from prompt_toolkit.layout.controls import FormattedTextControl
 from prompt_toolkit.widgets import Label, Frame
 from prompt_toolkit.key_binding import KeyBindings
+from prompt_toolkit.application.current import get_app
 from ui.state import state
-from core.sync import check_sync_status, fix_all_issues
+from core.sync import iter_sync_issues, fix_all_issues
+
+# Bumped on every refresh so a check still running from an older refresh stops publishing
+_check_generation = 0
+_checking = False
+# Guards the generation check against a refresh swapping in the next generation
+_check_lock = threading.Lock()
+
+def _redraw():
+    try:
+        get_app().invalidate()
+    except Exception:
+        pass
+
+def _run_check(generation, issues):
+    # issues is this generation's own list: once a refresh has replaced it in state,
+    # whatever a stale check adds is never shown
+    global _checking
+    try:
+        for issue in iter_sync_issues():
+            with _check_lock:
+                if generation != _check_generation:
+                    return
+                issues.append(issue)
+            _redraw()
+    except Exception as e:
+        if generation == _check_generation:
+            state.set_status(f"Sync check failed: {e}")
+    with _check_lock:
+        if generation != _check_generation:
+            return
+        _checking = False
+    _redraw()
 
 def refresh():
-    state.sync_issues = check_sync_status()
+    # Issues stream in from a worker thread; the screen shows them as they arrive
+    global _check_generation, _checking
+    issues = []
+    with _check_lock:
+        _check_generation += 1
+        generation = _check_generation
+        _checking = True
+        state.sync_issues = issues
+    threading.Thread(target=_run_check, args=(generation, issues), name="storylord-sync-check", daemon=True).start()
 
 def fix(e=None):
-    fix_all_issues()
+    # Repair exactly what is listed; if the check is still running, fix_all_issues re-checks
+    message = fix_all_issues(None if _checking else list(state.sync_issues))
     refresh()
-    state.set_status("Fixed all sync issues.")
+    state.set_status(f"Fixed all sync issues. {message}")
 
 def get_sync_text():
-    if not state.sync_issues:
+    issues = list(state.sync_issues)
+    if _checking:
+        lines = [('class:warning', f" Checking... {len(issues)} issue(s) so far \n")]
+    elif not issues:
         return " All Systems Standard. "
-    lines = []
-    for issue in state.sync_issues:
+    else:
+        lines = [('', f" {len(issues)} issue(s) found \n")]
+    for issue in issues:
         lines.append(('class:error', f" {issue['status']} "))
         lines.append(('', f" {issue['file']} : {issue['details']}\n"))
     return lines
@@ -14,6 +14,10 @@ class AppState:
         self.exp_category = None # Current selected category
         self.exp_files = [] # Current list relative to mode
         self.exp_selected_idx = 0
+        self.exp_search_query = "" # Explorer search box ("/" to open)
+        self.exp_search_typing = False
+        self.exp_filter = "" # Type-to-filter ("f" to open)
+        self.exp_filter_typing = False
         
         # Gen State
         self.gen_cat_idx = 0
@@ -21,6 +25,11 @@ class AppState:
         # Debug
         self.show_debug = False
         
+    @property
+    def typing(self):
+        # An Explorer text box has the keyboard: global single-key shortcuts stand down
+        return self.exp_search_typing or self.exp_filter_typing
+
     def set_status(self, msg):
         self.status_message = msg
         
@@ -44,3 +44,24 @@ def mock_specs(monkeypatch, tmp_path):
     monkeypatch.setattr("src.core.metadata.get_metadata_file", lambda: str(meta_file))
     
     return d
+
+@pytest.fixture
+def write_spec(mock_specs):
+    """
+    Writes a spec below mock_specs and returns its path:
+    write_spec("Lore/a.md", "A", "Body.", description="...", version="1.0").
+    Extra headers are written in the order given; the body defaults to "Body of <title>."
+    """
+    def write(rel_path, title, body=None, **headers):
+        path = os.path.join(str(mock_specs), *rel_path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if body is None:
+            body = f"Body of {title}."
+        with open(path, "w") as f:
+            f.write(f"Title: {title}\n")
+            for key, value in headers.items():
+                if value:
+                    f.write(f"{key.capitalize()}: {value}\n")
+            f.write(f"\n{body}" if body.endswith("\n") else f"\n{body}\n")
+        return path
+    return write
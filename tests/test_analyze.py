@@ -0,0 +1,57 @@
+import os
+from src.core import analyze
+from src.core.analyze import StatsCache, analyze_story, collect_stats, sections
+from src.core.metadata import scan_and_sync
+
+def test_sections():
+    body = "\n".join([
+        "## Summary", "(One line explanation)",
+        "## Mechanics", "Dragons hoard gold.",
+        "### Notes", "Not part of Mechanics' heading level, ends the section.",
+        "```", "## Not A Heading", "```",
+    ])
+    assert sections(body, {"(One line explanation)"}) == {"summary": False, "mechanics": True}
+
+def test_analyze_story(mock_specs, write_spec):
+    root = str(mock_specs)
+    write_spec("Lore/dragons.md", "Dragons", "## Summary\nBig lizards.\n\n## Mechanics\n(Rules)\n")
+    write_spec("Lore/magic.md", "Magic", "## Summary\nOld.\n\n## Mechanics\nMana.\n" + "word " * 50, version="1.0")
+    write_spec("Characters/hero.md", "Hero", "## Role\n...\n")
+    scan_and_sync()
+    # After the scan, which may heal (rewrite) the headers
+    os.utime(os.path.join(root, "Characters", "hero.md"), (1_000_000, 1_000_000))
+
+    stats = analyze_story(top=2, by="category")
+
+    assert stats["total_specs"] == 3
+    assert stats["categories"] == {"Characters": 1, "Lore": 2}
+    assert stats["versions"] == {"0.1": 2, "1.0": 1}
+    assert stats["words"] == 5 + 54 + 1
+    assert stats["completeness"] == {"sections_expected": 6, "sections_filled": 3, "ratio": 0.5}
+    assert [s["path"] for s in stats["largest"]] == ["Lore/magic.md", "Lore/dragons.md"]
+    assert stats["stalest"][0] == {"path": "Characters/hero.md", "title": "Hero", "modified": "1970-01-12T13:46:40Z"}
+    assert stats["least_complete"][0] == {"path": "Characters/hero.md", "title": "Hero", "filled": 0, "expected": 2,
+                                         "missing": ["Role", "Background"]}
+    assert stats["by_category"]["Lore"]["completeness"]["ratio"] == 0.75
+    assert stats["cache"] == {"files": 3, "computed": 3}
+
+def test_stats_cached_by_fingerprint(mock_specs, write_spec, monkeypatch):
+    root = str(mock_specs)
+    write_spec("Lore/dragons.md", "Dragons", "## Summary\nBig lizards.\n")
+    write_spec("Lore/magic.md", "Magic", "## Summary\nOld.\n")
+    stats, computed = collect_stats(root, workers=1)
+    assert computed == 2
+
+    opened = []
+    real = analyze.file_stats
+    monkeypatch.setattr(analyze, "file_stats", lambda path: opened.append(path) or real(path))
+    stats, computed = collect_stats(root, workers=1)
+    assert (computed, opened) == (0, [])
+    assert stats["Lore/magic.md"]["words"] == 2
+
+    write_spec("Lore/magic.md", "Magic", "## Summary\nOld and new.\n")
+    os.remove(os.path.join(root, "Lore", "dragons.md"))
+    stats, computed = collect_stats(root, workers=1)
+    assert computed == 1 and [os.path.basename(p) for p in opened] == ["magic.md"]
+    assert stats["Lore/magic.md"]["words"] == 4
+    assert sorted(StatsCache().load().entries) == ["Lore/magic.md"]
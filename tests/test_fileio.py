@@ -0,0 +1,18 @@
+import os
+import stat
+import pytest
+from src.core import fileio
+from src.core.fileio import atomic_write_text
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX permissions")
+def test_atomic_write_permissions(tmp_path, monkeypatch):
+    monkeypatch.setattr(fileio, "_UMASK", 0o022)
+    new = tmp_path / "new.json"
+    atomic_write_text(str(new), "{}")
+    assert stat.S_IMODE(os.stat(new).st_mode) == 0o644
+
+    # An existing file keeps its mode
+    os.chmod(new, 0o640)
+    atomic_write_text(str(new), "[]")
+    assert stat.S_IMODE(os.stat(new).st_mode) == 0o640
+    assert new.read_text() == "[]"
@@ -0,0 +1,73 @@
+from src.core.fuzzy import FuzzyIndex, normalize
+from src.core.models import StorySpec
+
+def _specs(**titles):
+    return {path.replace("__", "/") + ".md": StorySpec(title=title, category=path.split("__")[0])
+            for path, title in titles.items()}
+
+SPECS = _specs(
+    Lore__dragons="Dragons of the North",
+    Lore__history="History of the Realm",
+    Characters__hero="The Dragon Slayer",
+    Characters__villain="Morgath the Cruel",
+    Rules__magic_system="Magic System",
+)
+
+def test_normalize_folds_separators():
+    assert normalize("  Magic_System.md ") == "magic system md"
+
+def test_ranking_and_prefix():
+    index = FuzzyIndex(SPECS)
+    assert [m.path for m in index.search("drag")] == ["Lore/dragons.md", "Characters/hero.md"]
+    assert [m.path for m in index.search("drag", prefix="Characters/")] == ["Characters/hero.md"]
+    # Mid-word and file name matches
+    assert [m.path for m in index.search("orga")] == ["Characters/villain.md"]
+    assert [m.path for m in index.search("magic system")] == ["Rules/magic_system.md"]
+    # Short queries match word starts
+    assert [m.path for m in index.search("m")] == ["Rules/magic_system.md", "Characters/villain.md"]
+    assert index.search("") == []
+
+def test_typos_still_match():
+    index = FuzzyIndex(SPECS)
+    assert index.search("hystory")[0].path == "Lore/history.md"
+    assert index.search("morgatx")[0].path == "Characters/villain.md"
+
+def test_sync_only_touches_changes():
+    index = FuzzyIndex(SPECS)
+    assert index.sync(SPECS) == 0
+    specs = dict(SPECS)
+    specs["Lore/dragons.md"] = StorySpec(title="Wyrms", category="Lore")
+    del specs["Characters/villain.md"]
+    assert index.sync(specs) == 2
+    assert len(index) == 4
+    assert index.search("north") == []
+    assert [m.path for m in index.search("wyrm")] == ["Lore/dragons.md"]
+    assert index.search("morgath") == []
+
+def test_common_queries_do_bounded_work(monkeypatch):
+    from src.core import fuzzy
+    specs = _specs(**{f"Episodes__ep{n}": f"Episode {n}" for n in range(200)})
+    index = FuzzyIndex(specs)
+    # A shorter title added later still ranks first (postings stay sorted by title length)
+    index.sync({**specs, "Episodes/pilot.md": StorySpec(title="Episode", category="Episodes")})
+    
+    scored = []
+    real_score = FuzzyIndex._score
+    monkeypatch.setattr(FuzzyIndex, "_score", lambda self, i, q: scored.append(i) or real_score(self, i, q))
+    matches = index.search("episode", limit=5)
+    assert [m.title for m in matches][:2] == ["Episode", "Episode 0"]
+    assert len(scored) == 5 # Every hit starts a title, so the walk stops at the limit
+    
+    # A query matching mid-word everywhere scores at most MAX_CANDIDATES docs
+    monkeypatch.setattr(fuzzy, "MAX_CANDIDATES", 20)
+    scored.clear()
+    assert len(index.search("pisode", limit=50)) == 20
+    assert len(scored) == 20
+
+def test_folder_prefix_and_typos():
+    specs = dict(SPECS, **_specs(**{f"Episodes__ep{n}": f"Dragon episode {n}" for n in range(100)}))
+    index = FuzzyIndex(specs)
+    assert [m.path for m in index.search("drag", prefix="Characters/")] == ["Characters/hero.md"]
+    assert [m.path for m in index.search("d", prefix="Lore/")] == ["Lore/dragons.md"]
+    assert index.search("hystory", prefix="Lore/")[0].path == "Lore/history.md"
+    assert index.search("drag", prefix="Canon/") == []
@@ -26,3 +26,47 @@ def test_generate_spec_no_overwrite(mock_specs):
     # Assert
     assert not success
     assert "already exists" in msg
+
+def test_generate_spec_registers_metadata(mock_specs):
+    from src.core.metadata import load_all_metadata
+    
+    generator.generate_spec("Lore", "Registered", "0.3")
+    
+    spec = load_all_metadata().specs["Lore/registered.md"]
+    assert spec.title == "Registered"
+    assert spec.version == "0.3"
+
+def test_bulk_create_from_manifest(mock_specs, tmp_path):
+    import json
+    from src.core.metadata import load_all_metadata
+    from src.core.fingerprints import FingerprintCache
+    generator.generate_spec("Lore", "Dragons")
+    manifest = tmp_path / "seed.jsonl"
+    rows = [
+        {"title": "Dragons", "category": "Lore", "body": "## Summary\nFire.\n"},
+        {"title": "Dragons", "category": "Lore"},
+        {"title": "Hero", "category": "Characters", "version": "1.0", "description": "Lead"},
+    ]
+    manifest.write_text("\n".join(json.dumps(r) for r in rows) + "\n")
+    
+    result = generator.create_specs_bulk(generator.read_manifest(str(manifest)))
+    
+    assert result.errors == []
+    assert result.created == ["Lore/dragons_2.md", "Lore/dragons_3.md", "Characters/hero.md"]
+    assert result.renamed == 2
+    with open(os.path.join(mock_specs, "Lore", "dragons_2.md")) as f:
+        assert f.read() == "Title: Dragons\nDescription: \nCategory: Lore\nVersion: 0.1\n\n## Summary\nFire.\n"
+    specs = load_all_metadata().specs
+    assert specs["Characters/hero.md"].version == "1.0"
+    # Registered with fingerprints, so the next scan does not re-read them
+    assert set(result.created) <= set(FingerprintCache().load().entries)
+
+def test_bulk_create_validates_everything_first(mock_specs, tmp_path):
+    manifest = tmp_path / "seed.csv"
+    manifest.write_text("title,category\nGood,Lore\n,Lore\n!!!,Lore\nBad,Nowhere\n")
+    
+    result = generator.create_specs_bulk(generator.read_manifest(str(manifest)), categories=["Lore"])
+    
+    assert result.created == []
+    assert [e.split(":")[0] for e in result.errors] == ["line 3", "line 4", "line 5"]
+    assert not os.path.exists(os.path.join(mock_specs, "Lore", "good.md"))
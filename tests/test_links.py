@@ -0,0 +1,73 @@
+import os
+from src.core.links import LinkIndex, backlinks, dangling_links, extract_links, outgoing_links
+from src.core.metadata import scan_and_sync, sync_paths
+
+def test_extract_links():
+    body = "\n".join([
+        "Meets [[The Hero|our hero]] and [[Lore/dragons]].",
+        "See [the rules](../Rules/magic.md#casting) or [site](https://example.com/a.md).",
+        "```",
+        "[[Not A Link]]",
+        "```",
+        "![map](map.md)",
+    ])
+    refs = extract_links(body, "Storyboard/ep1.md")
+    assert [(r.kind, r.target, r.text, r.line) for r in refs] == [
+        ("title", "the hero", "our hero", 1),
+        ("path", "Lore/dragons.md", "Lore/dragons", 1),
+        ("path", "Rules/magic.md", "the rules", 2),
+    ]
+
+def test_links_backlinks_and_dangling(mock_specs, write_spec):
+    root = str(mock_specs)
+    write_spec("Characters/hero.md", "The Hero", "Fights [[Smaug]].")
+    write_spec("Characters/smaug.md", "Smaug", "Lives under the mountain.")
+    write_spec("Storyboard/ep1.md", "Episode 1", "[[the hero]] meets [the dragon](../Characters/smaug.md) and [[Gandalf]].")
+    scan_and_sync()
+
+    assert [(l.target, l.resolved) for l in outgoing_links("Storyboard/ep1.md")] == [
+        ("the hero", ["Characters/hero.md"]),
+        ("Characters/smaug.md", ["Characters/smaug.md"]),
+        ("gandalf", []),
+    ]
+    assert [l.source for l in backlinks("Characters/smaug.md")] == ["Characters/hero.md", "Storyboard/ep1.md"]
+    assert [(l.source, l.target) for l in dangling_links()] == [("Storyboard/ep1.md", "gandalf")]
+
+    # Only the changed spec is re-extracted; the new spec fixes the dangling link
+    write_spec("Characters/hero.md", "The Hero", "Retired.")
+    write_spec("Characters/gandalf.md", "Gandalf", "A wizard.")
+    sync_paths(["Characters/hero.md", "Characters/gandalf.md"])
+    assert [l.source for l in backlinks("Characters/smaug.md")] == ["Storyboard/ep1.md"]
+    assert dangling_links() == []
+
+    # Deleting a spec drops its links and leaves the links to it dangling
+    os.remove(os.path.join(root, "Storyboard", "ep1.md"))
+    os.remove(os.path.join(root, "Characters", "gandalf.md"))
+    sync_paths(["Storyboard/ep1.md", "Characters/gandalf.md"])
+    assert backlinks("Characters/smaug.md") == []
+    assert outgoing_links("Storyboard/ep1.md") == []
+
+def test_queries_only_read(mock_specs, write_spec):
+    root = str(mock_specs)
+    write_spec("Lore/dragons.md", "Dragons", "Big.")
+    write_spec("Lore/hoard.md", "Hoard", "Gold.")
+    scan_and_sync()
+    assert backlinks("Lore/dragons.md") == []
+
+    # An edit made outside a sync shows up after the next one; the query itself touches no file
+    hoard = os.path.join(root, "Lore", "hoard.md")
+    with open(hoard, "a") as f:
+        f.write("Guarded by [[Dragons]].\n")
+    before = os.stat(hoard).st_mtime_ns
+    assert backlinks("Lore/dragons.md") == []
+    assert os.stat(hoard).st_mtime_ns == before
+    scan_and_sync()
+    assert [l.source for l in backlinks("Lore/dragons.md")] == ["Lore/hoard.md"]
+
+def test_refresh_skips_unchanged_bodies(mock_specs, write_spec):
+    write_spec("Lore/a.md", "A", "[[B]]")
+    write_spec("Lore/b.md", "B", "[[A]]")
+    scan_and_sync()
+    from src.core.metadata import load_all_metadata
+    from src.core.fingerprints import FingerprintCache
+    assert LinkIndex().refresh(load_all_metadata().specs, FingerprintCache().load().entries) == 0
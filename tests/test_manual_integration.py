@@ -1,10 +1,22 @@
 import sys
 import os
 import json
+import types
 import pytest
 from core.version_manager import VersionManager
 from ui.screens.settings import SettingsState
 
+# The version src/core/_version.py ships with
+RELEASE_VERSION = "v0.1.0_beta"
+
+@pytest.fixture(autouse=True)
+def release_version(monkeypatch):
+    # The VersionManager is built lazily now, so core._version may first be imported after
+    # test_deploy rewrote the real file on disk: pin the fallback it reads instead
+    module = types.ModuleType("core._version")
+    module.__version__ = RELEASE_VERSION
+    monkeypatch.setitem(sys.modules, "core._version", module)
+
 @pytest.fixture
 def config_path(tmp_path):
     # Use Pytest's tmp_path fixture for isolated config
@@ -1,5 +1,5 @@
 import os
-from src.core.metadata import parse_header_from_file, update_file_header, load_all_metadata, scan_and_sync
+from src.core.metadata import parse_header_from_file, read_header, update_file_header, load_all_metadata, scan_and_sync
 from src.core.models import StorySpec
 
 def test_scan_creates_metadata(mock_specs):
@@ -35,3 +35,139 @@ def test_update_header(mock_specs):
         content = f.read()
     assert "Title: New" in content
     assert "Version: 2.0" in content
+
+def test_scan_skips_unchanged_files(mock_specs, monkeypatch):
+    from src.core import metadata
+    cat_dir = os.path.join(mock_specs, "Lore")
+    os.makedirs(cat_dir)
+    fpath = os.path.join(cat_dir, "test.md")
+    with open(fpath, "w") as f:
+        f.write("Title: Test\nCategory: Lore\nVersion: 1.0\n\nContent")
+    scan_and_sync()
+    
+    parsed = []
+    real_sync_one = metadata._sync_one
+    monkeypatch.setattr(metadata, "_sync_one", lambda job: parsed.append(job[0]) or real_sync_one(job))
+    
+    # Unchanged: nothing is opened
+    scan_and_sync()
+    assert parsed == []
+    
+    # No-op scans don't reload the registry or open (let alone create) the indexes
+    for name in ("_search.db", "_links.db", "_storyboard.db"):
+        if os.path.exists(os.path.join(mock_specs, name)):
+            os.remove(os.path.join(mock_specs, name))
+    loads = []
+    real_load = metadata.load_all_metadata
+    monkeypatch.setattr(metadata, "load_all_metadata", lambda: loads.append(1) or real_load())
+    scan_and_sync()
+    monkeypatch.setattr(metadata, "load_all_metadata", real_load)
+    assert parsed == [] and len(loads) == 1 # The scan's own read only
+    assert not any(os.path.exists(os.path.join(mock_specs, name)) for name in ("_search.db", "_links.db", "_storyboard.db"))
+    
+    # Modified: only that file is re-parsed
+    with open(fpath, "w") as f:
+        f.write("Title: Renamed\nCategory: Lore\nVersion: 1.1\n\nLonger content")
+    data = scan_and_sync()
+    assert parsed == [fpath]
+    assert data.specs["Lore/test.md"].title == "Renamed"
+    
+    # Deleted: dropped from registry
+    os.remove(fpath)
+    data = scan_and_sync()
+    assert "Lore/test.md" not in data.specs
+
+def test_scan_survives_a_non_utf8_header(mock_specs):
+    cat_dir = os.path.join(mock_specs, "Lore")
+    os.makedirs(cat_dir)
+    with open(os.path.join(cat_dir, "bad.md"), "wb") as f:
+        f.write(b"Title: Caf\xe9\nCategory: Lore\nVersion: 1.0\n\nBody")
+    with open(os.path.join(cat_dir, "good.md"), "w") as f:
+        f.write("Title: Good\nCategory: Lore\nVersion: 1.0\n\nBody")
+    
+    data = scan_and_sync()
+    
+    assert data.specs["Lore/good.md"].title == "Good"
+    assert data.specs["Lore/bad.md"].title == "Caf\ufffd"
+    # The header isn't rewritten from the lossy decode
+    with open(os.path.join(cat_dir, "bad.md"), "rb") as f:
+        assert f.read().startswith(b"Title: Caf\xe9\n")
+
+def test_sync_one_reads_the_file_once(mock_specs, monkeypatch):
+    from src.core import metadata
+    fpath = os.path.join(mock_specs, "heal.md")
+    with open(fpath, "w", newline="") as f:
+        f.write("Title: Heal\r\n\r\nBody line\r\n")
+    
+    reads = []
+    real_read = metadata.read_header
+    monkeypatch.setattr(metadata, "read_header", lambda p: reads.append(p) or real_read(p))
+    meta, st, body_hash = metadata._sync_one((fpath, "Lore"))
+    monkeypatch.setattr(metadata, "read_header", real_read)
+    
+    assert reads == [fpath]
+    assert meta["category"] == "Lore" and st.st_size == os.stat(fpath).st_size
+    # Healed, and the hash is the one the healed file gives
+    assert parse_header_from_file(fpath).category == "Lore"
+    assert body_hash == metadata.read_body_hash(fpath) != ""
+
+def test_update_header_skips_identical_header(mock_specs):
+    cat_dir = os.path.join(mock_specs, "Lore")
+    os.makedirs(cat_dir)
+    fpath = os.path.join(cat_dir, "test.md")
+    meta = {"title": "Same", "description": "", "category": "Lore", "version": "1.0"}
+    open(fpath, "w").close()
+    update_file_header(fpath, meta)
+    os.utime(fpath, ns=(1, 1))
+    
+    # Act: same header again
+    assert update_file_header(fpath, meta)
+    
+    # Assert: file untouched, no temp files left behind
+    assert os.stat(fpath).st_mtime_ns == 1
+    assert os.listdir(cat_dir) == ["test.md"]
+
+def test_read_header_stops_at_body(mock_specs):
+    fpath = os.path.join(mock_specs, "big.md")
+    header = "Title: Big\r\nversion: 2.0\r\n\r\n"
+    with open(fpath, "wb") as f:
+        f.write(header.encode("utf-8"))
+        f.write(b"Title: Not A Header\n" + b"x" * (4 * 1024 * 1024))
+        
+    fields, offset = read_header(fpath)
+    
+    assert fields == {"title": "Big", "version": "2.0"}
+    assert offset == len(header)
+    assert parse_header_from_file(fpath).title == "Big"
+
+def test_metadata_cache(mock_specs, monkeypatch):
+    from src.core.metadata import save_all_metadata, update_metadata, invalidate_metadata_cache
+    from src.core.models import StoryMetadata
+    from src.core.store import JsonShardStore
+    
+    loads = []
+    original = JsonShardStore.snapshot
+    monkeypatch.setattr(JsonShardStore, "snapshot", lambda self, categories=None: loads.append(categories) or original(self, categories))
+    
+    save_all_metadata(StoryMetadata(specs={"Lore/a.md": StorySpec(title="A", category="Lore")}))
+    update_metadata({"Characters/b.md": StorySpec(title="B", category="Characters")})
+    
+    # Save and update keep the cache current: nothing is re-read
+    assert set(load_all_metadata().specs) == {"Lore/a.md", "Characters/b.md"}
+    assert list(load_all_metadata(categories=["Lore"]).specs) == ["Lore/a.md"]
+    assert loads == []
+    
+    # Callers get their own copy of the registry
+    load_all_metadata().specs.clear()
+    assert len(load_all_metadata().specs) == 2
+    
+    # A change on disk (different size) is picked up
+    shard = os.path.join(mock_specs, "Lore", "_metadata.json")
+    with open(shard, "w") as f:
+        f.write('{"files": {"a.md": {"title": "Edited", "category": "Lore"}}}')
+    assert load_all_metadata().specs["Lore/a.md"].title == "Edited"
+    assert len(loads) == 1
+    
+    invalidate_metadata_cache()
+    load_all_metadata()
+    assert len(loads) == 2
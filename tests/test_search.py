@@ -0,0 +1,56 @@
+import os
+import shutil
+import pytest
+from src.core.metadata import scan_and_sync, sync_paths
+from src.core.search import SearchIndex, build_match_query, fts5_available, search_specs
+
+pytestmark = pytest.mark.skipif(not fts5_available(), reason="SQLite built without FTS5")
+
+def test_build_match_query_quotes_terms():
+    assert build_match_query('dragon "OR" fire*') == '"dragon" "or" "fire"*'
+    assert build_match_query("  ") == ""
+
+def test_search_ranks_and_follows_syncs(mock_specs, write_spec):
+    root = str(mock_specs)
+    write_spec("Lore/dragons.md", "Dragons", "Old wyrms of the north.")
+    write_spec("Lore/history.md", "History", "The war began when a dragon burned the capital.")
+    write_spec("Characters/hero.md", "Hero", "A farmer who hates dragons.", description="Dragon slayer")
+    scan_and_sync()
+
+    hits = search_specs("dragons")
+    assert hits[0].path == "Lore/dragons.md"
+    assert {h.path for h in hits} == {"Lore/dragons.md", "Characters/hero.md"}
+    assert hits[0].score >= hits[1].score
+    assert [h.path for h in search_specs("drag*", category="Characters")] == ["Characters/hero.md"]
+    assert search_specs("capital")[0].snippet
+
+    # A body edit is picked up by the incremental sync
+    write_spec("Lore/history.md", "History", "Nothing about reptiles any more.")
+    sync_paths(["Lore/history.md"])
+    assert search_specs("capital") == []
+    assert [h.path for h in search_specs("reptiles")] == ["Lore/history.md"]
+
+    # One made outside a sync waits for the next sync; a query never touches the files
+    write_spec("Lore/history.md", "History", "Basilisks everywhere.")
+    with open(os.path.join(root, "Lore", "history.md")) as f:
+        before = f.read()
+    assert search_specs("basilisks") == []
+    with open(os.path.join(root, "Lore", "history.md")) as f:
+        assert f.read() == before
+    scan_and_sync()
+    assert [h.path for h in search_specs("basilisks")] == ["Lore/history.md"]
+
+    # A move keeps the doc (re-keyed, not re-read)
+    os.makedirs(os.path.join(root, "Archive"))
+    shutil.move(os.path.join(root, "Lore", "dragons.md"), os.path.join(root, "Archive", "dragons.md"))
+    sync_paths(["Lore/dragons.md", "Archive/dragons.md"])
+    assert [h.path for h in search_specs("wyrms")] == ["Archive/dragons.md"]
+    assert search_specs("wyrms")[0].category == "Archive"
+
+    # Full scans leave unchanged docs alone
+    assert SearchIndex().refresh(*_registry()) == 0
+
+def _registry():
+    from src.core.metadata import load_all_metadata
+    from src.core.fingerprints import FingerprintCache
+    return load_all_metadata().specs, FingerprintCache().load().entries
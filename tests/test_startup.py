@@ -0,0 +1,75 @@
+import io
+import importlib
+import os
+import sys
+import subprocess
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from src.core.startup import ImportProfiler
+
+def _run(args, home, **kwargs):
+    env = dict(os.environ, HOME=str(home), PYTHONPATH=SRC)
+    return subprocess.run([sys.executable, *args], env=env, capture_output=True, text=True, timeout=60, **kwargs)
+
+def test_cli_import_is_light(tmp_path):
+    # Parsing arguments must not pull in the registry, pydantic or the version lookup
+    code = ("import sys, cli; "
+            "print(','.join(m for m in ('pydantic', 'core.models', 'core.metadata', 'core.version_manager') if m in sys.modules))")
+    result = _run(["-c", code], tmp_path, cwd=SRC)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+def test_registry_import_skips_the_index_modules(tmp_path):
+    code = ("import sys, core.metadata; "
+            "print(','.join(m for m in ('core.search', 'core.links', 'core.storyboard') if m in sys.modules))")
+    result = _run(["-c", code], tmp_path, cwd=SRC)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+def test_version_manager_is_built_on_first_use(tmp_path):
+    code = ("import sys; from core import config; before = 'core.version_manager' in sys.modules; "
+            "config.get_version_manager(); print(before, config.get_version_manager() is config.get_version_manager())")
+    result = _run(["-c", code], tmp_path, cwd=SRC)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["False", "True"]
+
+def test_profiler_times_imports(tmp_path, monkeypatch):
+    (tmp_path / "startup_probe_outer.py").write_text("import startup_probe_inner\n")
+    (tmp_path / "startup_probe_inner.py").write_text("VALUE = sum(range(1000))\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    profiler = ImportProfiler().install()
+    try:
+        importlib.import_module("startup_probe_outer")
+    finally:
+        profiler.uninstall()
+        sys.modules.pop("startup_probe_outer", None)
+        sys.modules.pop("startup_probe_inner", None)
+
+    timings = {t.module: t for t in profiler.timings}
+    outer, inner = timings["startup_probe_outer"], timings["startup_probe_inner"]
+    assert (outer.depth, inner.depth) == (0, 1)
+    assert outer.cumulative_ms >= inner.cumulative_ms
+    assert outer.self_ms <= outer.cumulative_ms
+    assert profiler.total_ms() == outer.cumulative_ms
+
+    out = io.StringIO()
+    profiler.report(out)
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("Startup profile: 2 modules imported")
+    assert lines[2].endswith("startup_probe_outer")
+
+def test_startup_profile_flag(tmp_path):
+    result = _run([os.path.join(SRC, "main.py"), "--startup-profile", "story", "list"], tmp_path, cwd=str(tmp_path))
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.startswith("Stories in")
+    assert "Startup profile:" in result.stderr
+    assert any(line.endswith("  cli") for line in result.stderr.splitlines())
+
+def test_bad_scan_workers_falls_back_to_serial(tmp_path):
+    code = "from core import config; print(config.get_scan_workers())"
+    for value, expected in (("4", "4"), ("four", "1"), ("0", "1"), ("", "1")):
+        env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=SRC, STORYLORD_SCAN_WORKERS=value)
+        result = subprocess.run([sys.executable, "-c", code], env=env, cwd=SRC, capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == expected
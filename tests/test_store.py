@@ -0,0 +1,212 @@
+import os
+import json
+import threading
+import pytest
+from src.core.models import StorySpec
+from src.core.metadata import load_all_metadata, save_all_metadata, update_metadata
+from src.core.models import StoryMetadata
+
+def _spec(title, cat):
+    return StorySpec(title=title, category=cat)
+
+def test_save_writes_one_shard_per_category(mock_specs):
+    data = StoryMetadata(specs={
+        "Lore/a.md": _spec("A", "Lore"),
+        "Characters/b.md": _spec("B", "Characters"),
+    })
+    save_all_metadata(data)
+    
+    with open(os.path.join(mock_specs, "_schemas.json")) as f:
+        manifest = json.load(f)
+    assert sorted(manifest["shards"]) == ["Characters", "Lore"]
+    with open(os.path.join(mock_specs, "Lore", "_metadata.json")) as f:
+        assert list(json.load(f)["files"]) == ["a.md"]
+    
+    assert load_all_metadata().specs == data.specs
+    assert list(load_all_metadata(categories=["Lore"]).specs) == ["Lore/a.md"]
+
+def test_update_rewrites_only_its_shard(mock_specs):
+    save_all_metadata(StoryMetadata(specs={
+        "Lore/a.md": _spec("A", "Lore"),
+        "Characters/b.md": _spec("B", "Characters"),
+    }))
+    chars_shard = os.path.join(mock_specs, "Characters", "_metadata.json")
+    os.utime(chars_shard, ns=(1, 1))
+    
+    update_metadata({"Lore/c.md": _spec("C", "Lore")}, deletes=["Lore/a.md"])
+    
+    assert os.stat(chars_shard).st_mtime_ns == 1
+    assert sorted(load_all_metadata().specs) == ["Characters/b.md", "Lore/c.md"]
+
+def test_legacy_registry_is_migrated(mock_specs):
+    with open(os.path.join(mock_specs, "_schemas.json"), "w") as f:
+        json.dump({"specs": {"Lore/a.md": {"title": "A", "category": "Lore", "version": "0.1", "description": ""}}}, f)
+    assert "Lore/a.md" in load_all_metadata().specs
+    
+    update_metadata({"Lore/b.md": _spec("B", "Lore")})
+    
+    with open(os.path.join(mock_specs, "_schemas.json")) as f:
+        assert "specs" not in json.load(f)
+    assert sorted(load_all_metadata().specs) == ["Lore/a.md", "Lore/b.md"]
+
+def test_sqlite_backend_queries(mock_specs, monkeypatch):
+    from src.core import metadata
+    # Start from a JSON registry so the first SQLite use imports it
+    save_all_metadata(StoryMetadata(specs={"Lore/a.md": _spec("Alpha", "Lore")}))
+    monkeypatch.setattr(metadata, "get_metadata_backend", lambda: "sqlite")
+    
+    update_metadata({
+        "Lore/b.md": _spec("Beta", "Lore"),
+        "Characters/c.md": _spec("Gamma", "Characters"),
+    })
+    
+    assert os.path.exists(os.path.join(mock_specs, "_schemas.db"))
+    assert metadata.count_by_category() == {"Lore": 2, "Characters": 1}
+    assert [p for p, _ in metadata.query_specs(category="Lore")] == ["Lore/a.md", "Lore/b.md"]
+    assert [p for p, _ in metadata.query_specs(title_glob="G*")] == ["Characters/c.md"]
+    assert [p for p, _ in metadata.query_specs(limit=1, offset=1)] == ["Lore/a.md"]
+    assert metadata.get_store().get("Lore/b.md").title == "Beta"
+    assert json.loads(metadata.export_metadata_json())["specs"]["Lore/b.md"]["title"] == "Beta"
+
+def test_json_backend_queries_match(mock_specs):
+    from src.core import metadata
+    update_metadata({
+        "Lore/a.md": _spec("Alpha", "Lore"),
+        "Lore/Deep/b.md": _spec("Beta", "Deep"),
+    })
+    
+    assert metadata.count_by_category() == {"Lore": 1, "Deep": 1}
+    assert [p for p, _ in metadata.query_specs(category="Deep")] == ["Lore/Deep/b.md"]
+    assert list(load_all_metadata(categories=["Deep"]).specs) == ["Lore/Deep/b.md"]
+
+def test_json_query_streams_in_path_order(mock_specs, monkeypatch):
+    from src.core import metadata, store
+    save_all_metadata(StoryMetadata(specs={
+        "Lore/b.md": _spec("B", "Lore"),
+        "Lore-old/a.md": _spec("A", "Lore-old"),
+        "Characters/c.md": _spec("C", "Characters"),
+        "Lore.md": _spec("Root", ""),
+    }))
+    # Journaled changes are replayed into their shard as it streams
+    update_metadata({"Lore/a.md": _spec("A2", "Lore")}, deletes=["Characters/c.md"])
+    expected = ["Lore-old/a.md", "Lore.md", "Lore/a.md", "Lore/b.md"]
+    assert [p for p, _ in metadata.query_specs()] == sorted(expected) == expected
+    assert [p for p, _ in metadata.query_specs(path_prefix="Lore/", limit=1)] == ["Lore/a.md"]
+    
+    read = []
+    original = store.JsonShardStore._read_shard
+    monkeypatch.setattr(store.JsonShardStore, "_read_shard", lambda self, shard, digest=None: read.append(shard) or original(self, shard, digest))
+    stream = metadata.query_specs(category="Lore")
+    assert next(stream)[0] == "Lore/a.md"
+    assert read == ["Lore"]
+
+def test_update_is_journaled_and_compacted(mock_specs, monkeypatch):
+    from src.core import store
+    save_all_metadata(StoryMetadata(specs={"Lore/a.md": _spec("A", "Lore")}))
+    lore_shard = os.path.join(mock_specs, "Lore", "_metadata.json")
+    os.utime(lore_shard, ns=(1, 1))
+    journal = os.path.join(mock_specs, "_schemas.journal")
+    
+    update_metadata({"Lore/b.md": _spec("B", "Lore")})
+    update_metadata(deletes=["Lore/a.md"])
+    
+    # Appended, not rewritten; replayed on load
+    assert os.path.exists(journal)
+    assert os.stat(lore_shard).st_mtime_ns == 1
+    assert sorted(load_all_metadata().specs) == ["Lore/b.md"]
+    from src.core.metadata import count_by_category
+    assert count_by_category() == {"Lore": 1}
+    
+    # Past the threshold the journal is folded into the shards in the background
+    monkeypatch.setattr(store, "JOURNAL_COMPACT_BYTES", 0)
+    update_metadata({"Lore/c.md": _spec("C", "Lore")})
+    for thread in threading.enumerate():
+        if thread.name == "storylord-compact":
+            thread.join()
+    
+    assert not os.path.exists(journal)
+    with open(lore_shard) as f:
+        assert sorted(json.load(f)["files"]) == ["b.md", "c.md"]
+    assert sorted(load_all_metadata().specs) == ["Lore/b.md", "Lore/c.md"]
+
+def test_torn_journal_line_loses_only_itself(mock_specs):
+    save_all_metadata(StoryMetadata(specs={"Lore/a.md": _spec("A", "Lore")}))
+    journal = os.path.join(mock_specs, "_schemas.journal")
+    update_metadata({"Lore/b.md": _spec("B", "Lore")})
+    # An append interrupted halfway through its line
+    with open(journal, "a") as f:
+        f.write('{"op":"upsert","path":"Lore/torn.md","sp')
+    
+    update_metadata({"Lore/c.md": _spec("C", "Lore")})
+    update_metadata({"Lore/d.md": _spec("D", "Lore")})
+    
+    assert sorted(load_all_metadata().specs) == ["Lore/a.md", "Lore/b.md", "Lore/c.md", "Lore/d.md"]
+    with open(journal) as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 3 and all(json.loads(line) for line in lines)
+    
+    # A bad line in the middle only costs that line, not the records after it
+    with open(journal, "w") as f:
+        f.write(lines[0] + "\n{garbage\n" + "\n".join(lines[1:]) + "\n")
+    from src.core.metadata import invalidate_metadata_cache
+    invalidate_metadata_cache()
+    assert sorted(load_all_metadata().specs) == ["Lore/a.md", "Lore/b.md", "Lore/c.md", "Lore/d.md"]
+
+def test_hand_edited_shard_is_validated(mock_specs):
+    save_all_metadata(StoryMetadata(specs={"Lore/a.md": _spec("A", "Lore")}))
+    shard = os.path.join(mock_specs, "Lore", "_metadata.json")
+    
+    # Valid hand edit: digest no longer matches, entry is validated and read
+    with open(shard, "w") as f:
+        json.dump({"files": {"a.md": {"title": "Edited", "category": "Lore"}}}, f)
+    assert load_all_metadata().specs["Lore/a.md"].title == "Edited"
+    
+    # Invalid hand edit: rejected like any unreadable registry
+    with open(shard, "w") as f:
+        json.dump({"files": {"a.md": {"category": "Lore"}}}, f)
+    assert load_all_metadata().specs == {}
+
+def _concurrent_writer(root, worker):
+    from src.core.store import JsonShardStore
+    store = JsonShardStore(root, os.path.join(root, "_schemas.json"))
+    for i in range(10):
+        store.apply({f"W{worker}/{i}.md": _spec(f"{worker}-{i}", f"W{worker}")})
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_generation_detects_concurrent_commits(mock_specs, monkeypatch, backend):
+    from src.core.store import RegistryConflict
+    monkeypatch.setattr("src.core.metadata.get_metadata_backend", lambda: backend)
+    
+    data = load_all_metadata()
+    data.specs["Lore/a.md"] = _spec("A", "Lore")
+    save_all_metadata(data)
+    stale = load_all_metadata()
+    
+    # Another writer commits meanwhile
+    generation = update_metadata({"Canon/b.md": _spec("B", "Canon")})
+    with pytest.raises(RegistryConflict):
+        update_metadata({"Canon/c.md": _spec("C", "Canon")}, expected_generation=generation - 1)
+    
+    # A full save from the stale copy merges instead of dropping Canon/b.md
+    stale.specs["Lore/a.md"] = _spec("A2", "Lore")
+    stale.specs["Rules/d.md"] = _spec("D", "Rules")
+    save_all_metadata(stale)
+    specs = load_all_metadata().specs
+    assert set(specs) == {"Lore/a.md", "Canon/b.md", "Rules/d.md"}
+    assert specs["Lore/a.md"].title == "A2"
+    assert set(stale.specs) == set(specs)
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_concurrent_processes_do_not_lose_writes(mock_specs):
+    import multiprocessing
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_concurrent_writer, args=(str(mock_specs), w)) for w in range(4)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(30)
+    assert all(p.exitcode == 0 for p in workers)
+    from src.core.store import JsonShardStore
+    store = JsonShardStore(str(mock_specs), os.path.join(mock_specs, "_schemas.json"))
+    assert len(store.load()) == 40
+    assert store.generation() == 40
@@ -0,0 +1,60 @@
+import os
+import random
+import pytest
+from src.core.metadata import scan_and_sync, sync_paths, load_all_metadata
+from src.core.storyboard import StoryboardIndex, key_between, timeline_order
+
+def test_key_between_orders_and_stays_short():
+    keys = [key_between(None, None)]
+    for _ in range(1000):
+        keys.append(key_between(keys[-1], None))
+    assert keys == sorted(keys)
+    assert max(len(k) for k in keys) <= 3
+    assert key_between(None, keys[0]) < keys[0]
+    random.seed(7)
+    for _ in range(500):
+        i = random.randrange(len(keys) - 1)
+        key = key_between(keys[i], keys[i + 1])
+        assert keys[i] < key < keys[i + 1]
+        keys.insert(i + 1, key)
+    with pytest.raises(ValueError):
+        key_between("a1", "a0")
+
+def test_reorder_touches_one_entry(mock_specs):
+    index = StoryboardIndex()
+    for name in ["b1", "b2", "b3", "b4"]:
+        index.insert(f"Storyboard/{name}.md")
+    before = dict(index.keys())
+
+    assert index.move_up("Storyboard/b3.md")
+    assert index.ordered() == ["Storyboard/b1.md", "Storyboard/b3.md", "Storyboard/b2.md", "Storyboard/b4.md"]
+    after = dict(index.keys())
+    assert [p for p in before if before[p] != after[p]] == ["Storyboard/b3.md"]
+
+    assert index.move("Storyboard/b1.md", 10)
+    assert not index.move_down("Storyboard/b1.md")
+    assert index.move("Storyboard/b4.md", -10)
+    assert index.ordered() == ["Storyboard/b4.md", "Storyboard/b3.md", "Storyboard/b2.md", "Storyboard/b1.md"]
+
+    index.insert("Storyboard/new.md", after="Storyboard/b3.md")
+    index.insert("Storyboard/first.md", before="Storyboard/b4.md")
+    assert index.ordered() == ["Storyboard/first.md", "Storyboard/b4.md", "Storyboard/b3.md",
+                               "Storyboard/new.md", "Storyboard/b2.md", "Storyboard/b1.md"]
+
+def test_index_follows_sync(mock_specs, write_spec):
+    root = str(mock_specs)
+    for name in ["ep2", "ep1", "ep3"]:
+        write_spec(f"Storyboard/{name}.md", name.upper())
+    write_spec("Lore/world.md", "World")
+    scan_and_sync()
+    specs = load_all_metadata().specs
+    # New beats start in file-name order
+    assert timeline_order(specs) == ["Storyboard/ep1.md", "Storyboard/ep2.md", "Storyboard/ep3.md"]
+
+    StoryboardIndex().move_up("Storyboard/ep3.md")
+    # Renamed beats keep their place, new ones go last, deleted ones drop out
+    os.rename(os.path.join(root, "Storyboard", "ep3.md"), os.path.join(root, "Storyboard", "finale.md"))
+    write_spec("Storyboard/ep0.md", "EP0")
+    os.remove(os.path.join(root, "Storyboard", "ep1.md"))
+    sync_paths(["Storyboard/ep3.md", "Storyboard/finale.md", "Storyboard/ep0.md", "Storyboard/ep1.md"])
+    assert StoryboardIndex().ordered() == ["Storyboard/finale.md", "Storyboard/ep2.md", "Storyboard/ep0.md"]
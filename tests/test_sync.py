@@ -39,3 +39,107 @@ def test_fix_issues(mock_specs):
     
     # Assert
     assert len(issues) == 0
+
+def test_parallel_check_matches_serial(mock_specs):
+    from src.core.metadata import scan_and_sync
+    cat_dir = os.path.join(mock_specs, "Lore")
+    os.makedirs(cat_dir)
+    for i in range(12):
+        with open(os.path.join(cat_dir, f"spec_{i}.md"), "w") as f:
+            f.write(f"Title: Spec {i}\n\n")
+    
+    serial = scan_and_sync(workers=1)
+    parallel = scan_and_sync(workers=4, use_processes=True)
+    assert serial.specs == parallel.specs
+    
+    # Break a few headers behind the registry's back
+    for i in (3, 7):
+        with open(os.path.join(cat_dir, f"spec_{i}.md"), "w") as f:
+            f.write(f"Title: Changed {i}\n\n")
+    
+    assert check_sync_status(workers=4) == check_sync_status(workers=1)
+    assert sorted(i["file"] for i in check_sync_status(workers=4)) == ["Lore/spec_3.md", "Lore/spec_7.md"]
+
+def test_iter_sync_issues_skips_unchanged_files(mock_specs, monkeypatch):
+    from src.core import sync
+    from src.core.metadata import scan_and_sync
+    cat_dir = os.path.join(mock_specs, "Lore")
+    os.makedirs(cat_dir)
+    for i in range(5):
+        with open(os.path.join(cat_dir, f"spec_{i}.md"), "w") as f:
+            f.write(f"Title: Spec {i}\n\n")
+    scan_and_sync()
+    
+    parsed = []
+    original = sync._read_file_meta
+    monkeypatch.setattr(sync, "_read_file_meta", lambda path: parsed.append(path) or original(path))
+    
+    with open(os.path.join(cat_dir, "spec_2.md"), "w") as f:
+        f.write("Title: Changed\n\n")
+    with open(os.path.join(cat_dir, "new.md"), "w") as f:
+        f.write("Title: New\n\n")
+    
+    issues = sync.iter_sync_issues(workers=1)
+    # Streams: the first issue comes out without consuming the whole walk
+    assert next(issues) == {"file": "Lore/new.md", "status": "MISSING_IN_JSON", "details": "Not in metadata DB."}
+    assert [i["file"] for i in issues] == ["Lore/spec_2.md"]
+    # Only the file edited since the scan had its header read
+    assert [os.path.basename(p) for p in parsed] == ["spec_2.md"]
+
+def test_fix_touches_only_listed_files(mock_specs, monkeypatch):
+    from src.core import metadata
+    from src.core.metadata import scan_and_sync, load_all_metadata
+    cat_dir = os.path.join(mock_specs, "Lore")
+    os.makedirs(cat_dir)
+    for i in range(6):
+        with open(os.path.join(cat_dir, f"spec_{i}.md"), "w") as f:
+            f.write(f"Title: Spec {i}\n\n")
+    scan_and_sync()
+    
+    with open(os.path.join(cat_dir, "spec_1.md"), "w") as f:
+        f.write("Title: Renamed\n\n")
+    with open(os.path.join(cat_dir, "extra.md"), "w") as f:
+        f.write("Title: Extra\n\n")
+    os.remove(os.path.join(cat_dir, "spec_4.md"))
+    issues = check_sync_status()
+    assert len(issues) == 3
+    
+    synced, commits = [], []
+    original_sync, original_update = metadata._sync_one, metadata.update_metadata
+    monkeypatch.setattr(metadata, "_sync_one", lambda job: synced.append(os.path.basename(job[0])) or original_sync(job))
+    monkeypatch.setattr(metadata, "update_metadata", lambda *a: commits.append(a) or original_update(*a))
+    
+    assert fix_all_issues(issues) == "Repaired 3 issue(s)."
+    assert sorted(synced) == ["extra.md", "spec_1.md"]
+    assert len(commits) == 1
+    assert check_sync_status() == []
+    specs = load_all_metadata().specs
+    assert specs["Lore/spec_1.md"].title == "Renamed"
+    assert "Lore/spec_4.md" not in specs
+
+def test_moved_spec_is_one_rename(mock_specs):
+    from src.core.metadata import scan_and_sync, load_all_metadata, add_rename_listener, remove_rename_listener
+    for cat in ("Lore", "Canon"):
+        os.makedirs(os.path.join(mock_specs, cat))
+    with open(os.path.join(mock_specs, "Lore", "dragon.md"), "w") as f:
+        f.write("Title: Dragon\n\nThe dragon sleeps under the mountain.\n")
+    with open(os.path.join(mock_specs, "Lore", "empty.md"), "w") as f:
+        f.write("Title: Empty\n\n")
+    scan_and_sync()
+    
+    os.rename(os.path.join(mock_specs, "Lore", "dragon.md"), os.path.join(mock_specs, "Canon", "wyrm.md"))
+    # Empty bodies are never matched
+    os.rename(os.path.join(mock_specs, "Lore", "empty.md"), os.path.join(mock_specs, "Canon", "blank.md"))
+    issues = check_sync_status()
+    assert {"file": "Canon/wyrm.md", "status": "RENAMED", "details": "Moved from Lore/dragon.md.", "from": "Lore/dragon.md"} in issues
+    assert sorted(i["status"] for i in issues) == ["MISSING_IN_JSON", "MISSING_ON_DISK", "RENAMED"]
+    
+    seen = []
+    add_rename_listener(seen.extend)
+    try:
+        scan_and_sync()
+    finally:
+        remove_rename_listener(seen.extend)
+    assert seen == [("Lore/dragon.md", "Canon/wyrm.md")]
+    assert load_all_metadata().specs["Canon/wyrm.md"].category == "Canon"
+    assert check_sync_status() == []
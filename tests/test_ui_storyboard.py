@@ -23,9 +23,9 @@ from src.core.models import StoryMetadata, StorySpec
 
 class TestStoryboardUI(unittest.TestCase):
     
-    @patch('src.ui.screens.storyboard.scan_and_sync')
+    @patch('src.ui.screens.storyboard.timeline_order', side_effect=lambda beats: sorted(beats, reverse=True))
     @patch('src.ui.screens.storyboard.load_all_metadata')
-    def test_storyboard_refresh_data(self, mock_load, mock_scan):
+    def test_storyboard_refresh_data(self, mock_load, mock_order):
         # Mock metadata loading
         m = StoryMetadata()
         m.specs = {} # Initialize because mock Field returns string
@@ -34,15 +34,15 @@ class TestStoryboardUI(unittest.TestCase):
         m.specs["story_2.md"] = StorySpec(title="S2", category="Storyboard")
         
         mock_load.return_value = m
-        mock_scan.return_value = None
         
         storyboard.refresh_data()
         
-        # Check nodes
+        # Only Storyboard specs reach the index; the nodes follow its order
+        self.assertEqual(sorted(mock_order.call_args[0][0]), ["story_1.md", "story_2.md"])
         nodes = storyboard.sb_state.nodes
         self.assertEqual(len(nodes), 2)
-        self.assertEqual(nodes[0][0], "story_1.md")
-        self.assertEqual(nodes[1][0], "story_2.md")
+        self.assertEqual(nodes[0][0], "story_2.md")
+        self.assertEqual(nodes[1][0], "story_1.md")
         
     def test_storyboard_render_empty(self):
         storyboard.sb_state.nodes = []
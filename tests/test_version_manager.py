@@ -0,0 +1,114 @@
+import os
+import zlib
+import pytest
+from core import version_manager
+from core.version_manager import VersionManager, find_git_dir
+
+HEAD_SHA = "a" * 40
+OLD_SHA = "b" * 40
+TAG_OBJECT_SHA = "c" * 40
+
+def _write(path, text, mtime_ns=None):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    git = tmp_path / ".git"
+    _write(str(git / "HEAD"), "ref: refs/heads/main\n")
+    _write(str(git / "refs" / "heads" / "main"), HEAD_SHA + "\n")
+    os.makedirs(git / "refs" / "tags")
+    (tmp_path / "sub").mkdir()
+    monkeypatch.chdir(tmp_path / "sub")
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    return git
+
+@pytest.fixture
+def describe(monkeypatch):
+    calls = []
+    def fake_describe(self):
+        calls.append(1)
+        return "v0.9.0"
+    monkeypatch.setattr(VersionManager, "_describe", fake_describe)
+    return calls
+
+def test_find_git_dir(repo, tmp_path):
+    assert find_git_dir() == str(repo)
+    assert find_git_dir(str(tmp_path.parent)) is None
+
+def test_tag_on_head_is_read_from_files(repo, tmp_path, describe):
+    _write(str(repo / "refs" / "tags" / "v1.0.0"), HEAD_SHA + "\n")
+    _write(str(repo / "packed-refs"), "# pack-refs with: peeled fully-peeled sorted \n" f"{OLD_SHA} refs/tags/v0.5.0\n")
+    vm = VersionManager(str(tmp_path / "config" / "config.json"))
+    assert vm.get_version() == "v1.0.0"
+    assert describe == []
+
+def test_result_is_cached_until_refs_change(repo, tmp_path, describe):
+    vm = VersionManager(str(tmp_path / "config" / "config.json"))
+    assert vm.get_git_version() == "v0.9.0"
+    assert vm.get_git_version() == "v0.9.0"
+    assert len(describe) == 1
+
+    # Moving the branch invalidates it
+    _write(str(repo / "refs" / "heads" / "main"), OLD_SHA + "\n", mtime_ns=10**18)
+    assert vm.get_git_version() == "v0.9.0"
+    assert len(describe) == 2
+
+    # So does a new tag (which now sits on HEAD)
+    _write(str(repo / "refs" / "tags" / "v1.1.0"), OLD_SHA + "\n")
+    os.utime(repo / "refs" / "tags", ns=(10**18, 10**18))
+    assert vm.get_git_version() == "v1.1.0"
+    assert len(describe) == 2
+
+def test_nested_tag_invalidates_the_cache(repo, tmp_path, describe):
+    os.makedirs(repo / "refs" / "tags" / "release")
+    os.utime(repo / "refs" / "tags", ns=(10**18, 10**18))
+    vm = VersionManager(str(tmp_path / "config" / "config.json"))
+    assert vm.get_git_version() == "v0.9.0"
+
+    _write(str(repo / "refs" / "tags" / "release" / "v2.0.0"), HEAD_SHA + "\n")
+    assert os.stat(repo / "refs" / "tags").st_mtime_ns == 10**18
+    assert vm.get_git_version() == "release/v2.0.0"
+    assert len(describe) == 1
+
+def test_packed_annotated_tag(repo, tmp_path, describe):
+    _write(str(repo / "packed-refs"),
+           "# pack-refs with: peeled fully-peeled sorted \n"
+           f"{OLD_SHA} refs/tags/v0.1.0\n"
+           f"{TAG_OBJECT_SHA} refs/tags/v2.0.0\n"
+           f"^{HEAD_SHA}\n")
+    vm = VersionManager(str(tmp_path / "config" / "config.json"))
+    assert vm.get_git_version() == "v2.0.0"
+    assert describe == []
+
+def test_loose_annotated_tag_is_peeled(repo, tmp_path, describe):
+    body = f"object {HEAD_SHA}\ntype commit\ntag v3.0.0\n\nRelease\n".encode()
+    obj = repo / "objects" / TAG_OBJECT_SHA[:2] / TAG_OBJECT_SHA[2:]
+    os.makedirs(obj.parent)
+    obj.write_bytes(zlib.compress(b"tag %d\0" % len(body) + body))
+    _write(str(repo / "refs" / "tags" / "v3.0.0"), TAG_OBJECT_SHA + "\n")
+    vm = VersionManager(str(tmp_path / "config" / "config.json"))
+    assert vm.get_git_version() == "v3.0.0"
+    assert describe == []
+
+@pytest.mark.parametrize("tags", [
+    {"v1.0.0": HEAD_SHA, "v1.0.0-rc": HEAD_SHA}, # Several tags on HEAD: git picks
+    {"v1.0.0": HEAD_SHA, "v0.5.0": OLD_SHA}, # An object that isn't loose could be a tag peeling to HEAD
+])
+def test_ambiguous_or_unreadable_tags_ask_git(repo, tmp_path, describe, tags):
+    for name, sha in tags.items():
+        _write(str(repo / "refs" / "tags" / name), sha + "\n")
+    vm = VersionManager(str(tmp_path / "config" / "config.json"))
+    assert vm.get_git_version() == "v0.9.0"
+    assert len(describe) == 1
+
+def test_outside_a_repo_skips_git(tmp_path, monkeypatch, describe):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    monkeypatch.setattr(version_manager, "find_git_dir", lambda start=None: None)
+    vm = VersionManager(str(tmp_path / "config" / "config.json"))
+    assert vm.get_git_version() is None
+    assert describe == []
@@ -0,0 +1,66 @@
+import os
+from src.core.walker import iter_spec_files, walk_tree, tree_lines, tree_dict, tree_records
+
+def _touch(path, content="Title: X\n\n"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+def test_iter_spec_files_sorted_and_filtered(mock_specs):
+    _touch(os.path.join(mock_specs, "root.md"))
+    _touch(os.path.join(mock_specs, "Lore", "b.md"))
+    _touch(os.path.join(mock_specs, "Lore", "a.md"))
+    _touch(os.path.join(mock_specs, "Lore", "notes.txt"))
+    _touch(os.path.join(mock_specs, "Lore", "Deep", "c.md"))
+    
+    entries = list(iter_spec_files(str(mock_specs)))
+    
+    assert [e.rel_path for e in entries] == ["Lore/a.md", "Lore/b.md", "Lore/Deep/c.md"]
+    assert entries[2].category == "Deep"
+    assert entries[0].stat.st_size == os.stat(entries[0].path).st_size
+
+def test_walk_tree_depths(mock_specs):
+    _touch(os.path.join(mock_specs, "Lore", "Deep", "c.md"))
+    
+    listings = list(walk_tree(str(mock_specs)))
+    
+    assert [(l.rel_dir, l.depth) for l in listings] == [("", 0), ("Lore", 1), ("Lore/Deep", 2)]
+
+def test_walk_tree_max_depth(mock_specs):
+    _touch(os.path.join(mock_specs, "Lore", "Deep", "c.md"))
+
+    listings = list(walk_tree(str(mock_specs), max_depth=1))
+
+    assert [l.rel_dir for l in listings] == ["", "Lore"]
+    assert listings[-1].dirs == ["Deep"]
+
+def test_tree_lines(mock_specs):
+    _touch(os.path.join(mock_specs, "Lore", "a.md"), "x" * 10)
+    _touch(os.path.join(mock_specs, "Lore", "Deep", "c.md"), "x" * 2000)
+    root = os.path.basename(str(mock_specs))
+
+    assert list(tree_lines(str(mock_specs))) == [
+        f"{root}/\n", "    Lore/\n", "        a.md\n", "        Deep/\n", "            c.md\n",
+    ]
+    assert list(tree_lines(str(mock_specs), max_depth=1, dirs_only=True, counts=True)) == [
+        f"{root}/ (0 files, 0 B)\n", "    Lore/ (1 file, 10 B)\n", "        Deep/ ...\n",
+        "1 directory, 1 file, 10 B\n",
+    ]
+    assert list(tree_lines(str(mock_specs), counts=True))[-1] == "2 directories, 2 files, 2.0 KB\n"
+
+def test_tree_dict_and_records(mock_specs):
+    _touch(os.path.join(mock_specs, "Lore", "a.md"), "x" * 10)
+    # Registry files and sidecars stay out of the tree
+    _touch(os.path.join(mock_specs, "_schemas.json"), "{}")
+    _touch(os.path.join(mock_specs, "Lore", "_metadata.json"), "{}")
+    for name in ("_schemas.journal", "_fingerprints.json", "_search.db", "_search.db-wal"):
+        _touch(os.path.join(mock_specs, name))
+    _touch(os.path.join(mock_specs, "Lore", "Deep", "c.md"))
+    # ...but a spec whose name starts with "_" is a spec like any other
+    _touch(os.path.join(mock_specs, "Lore", "_intro.md"))
+
+    assert tree_dict(str(mock_specs)) == {"Lore": {"Deep": {"c.md": None}, "_intro.md": None, "a.md": None}}
+    assert tree_dict(str(mock_specs), max_depth=1, dirs_only=True) == {"Lore": {"Deep": {}}}
+    records = list(tree_records(str(mock_specs), dirs_only=True))
+    assert [(r["path"], r["file_count"], r["bytes"]) for r in records] == [("", 0, 0), ("Lore", 2, 20), ("Lore/Deep", 1, 10)]
+    assert "files" not in records[0]
@@ -0,0 +1,94 @@
+import os
+import time
+import pytest
+from src.core.metadata import load_all_metadata
+from src.core.watcher import SpecWatcher, PollingSource, inotify_available
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+def test_polling_source_reports_changes(mock_specs):
+    cat_dir = os.path.join(mock_specs, "Lore")
+    os.makedirs(cat_dir)
+    with open(os.path.join(cat_dir, "a.md"), "w") as f:
+        f.write("Title: A\n\n")
+    source = PollingSource(str(mock_specs), interval=0)
+    
+    with open(os.path.join(cat_dir, "a.md"), "w") as f:
+        f.write("Title: A changed\n\n")
+    with open(os.path.join(cat_dir, "b.md"), "w") as f:
+        f.write("Title: B\n\n")
+    events = source.read(0)
+    assert sorted((e.kind, e.rel_path) for e in events) == [("created", "Lore/b.md"), ("modified", "Lore/a.md")]
+    
+    os.remove(os.path.join(cat_dir, "b.md"))
+    assert [(e.kind, e.rel_path) for e in source.read(0)] == [("deleted", "Lore/b.md")]
+
+@pytest.mark.parametrize("use_inotify", [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(not inotify_available(), reason="inotify is Linux-only")),
+])
+def test_watcher_keeps_registry_live(mock_specs, use_inotify):
+    cat_dir = os.path.join(mock_specs, "Lore")
+    os.makedirs(cat_dir)
+    with open(os.path.join(cat_dir, "a.md"), "w") as f:
+        f.write("Title: A\n\n")
+    
+    batches = []
+    watcher = SpecWatcher(str(mock_specs), debounce=0.05, poll_interval=0.05, use_inotify=use_inotify)
+    watcher.subscribe(batches.append)
+    watcher.start()
+    try:
+        assert watcher.ready.wait(5)
+        assert batches == [None] # The initial full scan
+        assert load_all_metadata().specs["Lore/a.md"].title == "A"
+        
+        with open(os.path.join(cat_dir, "b.md"), "w") as f:
+            f.write("Title: B\n\n")
+        os.rename(os.path.join(cat_dir, "a.md"), os.path.join(cat_dir, "c.md"))
+        assert _wait_for(lambda: set(load_all_metadata().specs) == {"Lore/b.md", "Lore/c.md"})
+        
+        # A whole folder moved in at once
+        chars = os.path.join(str(mock_specs), "incoming")
+        os.makedirs(chars)
+        with open(os.path.join(chars, "hero.md"), "w") as f:
+            f.write("Title: Hero\n\n")
+        os.rename(chars, os.path.join(str(mock_specs), "Characters"))
+        assert _wait_for(lambda: "Characters/hero.md" in load_all_metadata().specs)
+        assert load_all_metadata().specs["Characters/hero.md"].category == "Characters"
+        assert all(batch for batch in batches[1:])
+    finally:
+        watcher.stop()
+
+@pytest.mark.parametrize("use_inotify", [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(not inotify_available(), reason="inotify is Linux-only")),
+])
+def test_file_written_during_the_initial_scan_is_picked_up(mock_specs, monkeypatch, use_inotify):
+    from src.core import metadata
+    cat_dir = os.path.join(mock_specs, "Lore")
+    os.makedirs(cat_dir)
+    with open(os.path.join(cat_dir, "a.md"), "w") as f:
+        f.write("Title: A\n\n")
+    
+    real_scan = metadata.scan_and_sync
+    def scan_then_write():
+        # The walk has already passed by the time this file appears
+        data = real_scan()
+        with open(os.path.join(cat_dir, "late.md"), "w") as f:
+            f.write("Title: Late\n\n")
+        return data
+    monkeypatch.setattr(metadata, "scan_and_sync", scan_then_write)
+    
+    watcher = SpecWatcher(str(mock_specs), debounce=0.05, poll_interval=0.05, use_inotify=use_inotify)
+    watcher.start()
+    try:
+        assert watcher.ready.wait(5)
+        assert _wait_for(lambda: "Lore/late.md" in load_all_metadata().specs)
+    finally:
+        watcher.stop()